@@ -15,18 +15,34 @@
 # along with this program.  
 # If not, see https://github.com/KrisNumber24/KanbanTxt/blob/main/LICENSE.
 
+import time
+# taken before the other imports, for --startup-timing
+STARTUP_TIME = time.perf_counter()
+
 import os
 import pathlib
 import re
-from datetime import date
+import tempfile
+import threading
+import bisect
+import collections
+import contextlib
+import functools
+import itertools
+import gc
+import hashlib
+import marshal
+import operator
+from array import array
+from datetime import date, datetime, timedelta
 import tkinter as tk
-from tkinter import filedialog
-from tkinter import simpledialog
+import tkinter.messagebox
 import tkinter.font as tkFont
 import argparse
-from idlelib.tooltip import Hovertip
-import ctypes
+import sys
 import json
+# filedialog, simpledialog, idlelib, ctypes, tracemalloc, cProfile, csv, html
+# and numpy (optional) are only imported when needed, to start faster
 
 
 def f_sort_column_by_prio(d):
@@ -66,6 +82,14 @@ def f_sort_column_by_context(d):
     return f_sort_column_by_tag(d, 'context', '@')
 
 
+def f_sort_column_by_creation_date(d):
+    return (d['start_ordinal'] is None, d['start_ordinal'] or 0, d['index'])
+
+
+def f_sort_column_by_completion_date(d):
+    return (d['end_ordinal'] is None, d['end_ordinal'] or 0, d['index'])
+
+
 SORT_METHODS = [
     {
         'text': "Task priority",
@@ -128,9 +152,1792 @@ SORT_METHODS = [
         'f': f_sort_column_by_context,
         'rev': False
     },
+    {
+        'text': "Creation date",
+        'tooltip': "Tasks are ordered by their creation date, the oldest first.\n"
+                   "Tasks without creation date will be put last.",
+        'f': f_sort_column_by_creation_date,
+        'rev': False
+    },
+    {
+        'text': "Completion date",
+        'tooltip': "Tasks are ordered by their completion date, the oldest first.\n"
+                   "Tasks without completion date will be put last.",
+        'f': f_sort_column_by_completion_date,
+        'rev': False
+    },
 ]
 
-class CustomizeViewDialog(simpledialog.Dialog):
+
+def f_sort_criterion_priority(d):
+    return (d['priority'] is None, d['priority'] or '')
+
+
+def f_sort_criterion_creation_date(d):
+    return (d['start_ordinal'] is None, d['start_ordinal'] or 0)
+
+
+def f_sort_criterion_completion_date(d):
+    return (d['end_ordinal'] is None, d['end_ordinal'] or 0)
+
+
+def f_sort_criterion_project(d):
+    return (len(d['project']) < 1, f_sort_column_by_project(d))
+
+
+def f_sort_criterion_context(d):
+    return (len(d['context']) < 1, f_sort_column_by_context(d))
+
+
+def f_sort_criterion_subject(d):
+    return (False, d['subject'])
+
+
+def f_sort_criterion_order(d):
+    return (False, d['index'])
+
+
+# criteria of the custom sort. Their functions return (is missing, value): the
+# tasks missing a criterion go after the others, in both directions
+SORT_CRITERIA = {
+    'priority': {'text': "Priority", 'f': f_sort_criterion_priority},
+    'creation_date': {'text': "Creation date", 'f': f_sort_criterion_creation_date},
+    'completion_date': {'text': "Completion date", 'f': f_sort_criterion_completion_date},
+    'project': {'text': "Project", 'f': f_sort_criterion_project},
+    'context': {'text': "Context", 'f': f_sort_criterion_context},
+    'subject': {'text': "Subject", 'f': f_sort_criterion_subject},
+    'order': {'text': "Order in txt file", 'f': f_sort_criterion_order},
+}
+
+# index of the custom sort, after the SORT_METHODS
+CUSTOM_SORT_METHOD = len(SORT_METHODS)
+
+
+def get_descending_key(value):
+    """Key sorting values in the reverse order: numbers are negated, and
+    strings become their negated code points followed by 1, so that a
+    string goes after the longer ones it starts"""
+    if isinstance(value, str):
+        return tuple(-ord(c) for c in value) + (1,)
+    return -value
+
+
+def compile_custom_sort(criteria):
+    """The key function of a sort by several criteria, given as a list of
+    [criterion name, descending]. The key is one flat tuple, ending with the
+    line index so that the tasks equal on all the criteria keep the order
+    of the file"""
+    functions = [(SORT_CRITERIA[name]['f'], descending) for name, descending in criteria if name in SORT_CRITERIA]
+
+    def f_sort_column_by_criteria(d):
+        key = []
+        for f, descending in functions:
+            is_missing, value = f(d)
+            key.append(is_missing)
+            key.append(get_descending_key(value) if descending else value)
+        key.append(d['index'])
+        return tuple(key)
+
+    return f_sort_column_by_criteria
+
+
+# the sort key of a card, computed once when the card is created or the sort changes
+get_card_sort_key = operator.itemgetter('sort_key')
+
+
+# gwyrdh edit to minimal text
+KANBAN_KEY = "k"
+
+KANBAN_VAL_IN_PROGRESS = "do"
+
+KANBAN_VAL_VALIDATION = "wt"
+
+# column index of the tasks by their kanban value, the others are in the
+# first column and done tasks in the last one
+KANBAN_VAL_COLUMNS = {
+    KANBAN_VAL_IN_PROGRESS: 1,
+    KANBAN_VAL_VALIDATION: 2,
+}
+DONE_COLUMN = 3
+
+TASK_R = re.compile(
+    r'^(?P<isDone>x )? '
+    r'?(?P<priority>\([A-Z]\))? '
+    r'?(?P<dates>\d\d\d\d-\d\d-\d\d( \d\d\d\d-\d\d-\d\d)?)? '
+    r'?(?P<subject>.+)')
+# special key-vals, context or project tags may occur basically everywhere in the line,
+# so don't try to fit it into the structured regex above, just make a new search
+SPECIAL_KV_R = re.compile(r'(?P<key>[^:\s]+):(?P<val>[^:\s]+)')
+PROJECT_R = re.compile(r' (?P<project>\+\S+)')
+CONTEXT_R = re.compile(r' (?P<context>@\S+)')
+
+
+# tasks of the opened file parsed in a previous run, by line (see TaskParseCache)
+PREPARSED_TASKS = {}
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_task_line(task_txt):
+    """Parse a non empty line of a todo.txt. The results are cached by line
+    so that an unchanged task is only parsed once: they must not be modified.
+    Dates are given as ordinals (see date.toordinal)"""
+    preparsed_task = PREPARSED_TASKS.get(task_txt)
+    if preparsed_task is not None:
+        return preparsed_task
+
+    task = TASK_R.match(task_txt).groupdict()
+
+    special_kv_data = [m.groupdict() for m in SPECIAL_KV_R.finditer(task_txt)]
+    project_data = [m.groupdict() for m in PROJECT_R.finditer(task_txt)]
+    context_data = [m.groupdict() for m in CONTEXT_R.finditer(task_txt)]
+
+    # remove any special key-val strings, project and context tags from the subject text for clarity
+    subject = task.get('subject', '???')
+    subject = SPECIAL_KV_R.sub("", subject)
+    subject = PROJECT_R.sub("", subject)
+    subject = CONTEXT_R.sub("", subject)
+
+    column = 0
+    for kv in special_kv_data:
+        if kv['key'] == KANBAN_KEY and kv['val'] in KANBAN_VAL_COLUMNS:
+            column = KANBAN_VAL_COLUMNS[kv['val']]
+            break
+    if task.get("isDone"):
+        column = DONE_COLUMN
+
+    priority = None
+    if task.get("priority"):
+        priority = task['priority'][1]  # get only letter without parenthesis
+
+    start_ordinal = None
+    end_ordinal = None
+    if task.get('dates'):
+        dates = task.get('dates').split(' ')
+        if len(dates) == 1:
+            start_ordinal = date.fromisoformat(dates[0]).toordinal()
+        elif len(dates) == 2:
+            start_ordinal = date.fromisoformat(dates[1]).toordinal()
+            end_ordinal = date.fromisoformat(dates[0]).toordinal()
+
+    return {
+        'subject': subject,
+        'column': column,
+        'priority': priority,
+        'project': project_data,
+        'context': context_data,
+        'special_kv_data': special_kv_data,
+        'start_ordinal': start_ordinal,
+        'end_ordinal': end_ordinal,
+    }
+
+
+@functools.lru_cache(maxsize=65536)
+def tokenize_task_line(task_txt):
+    """Spans of the elements of a task line, found with the regexes of
+    parse_task_line so that the editor colors what the cards show: a tuple of
+    (kind, start, end), kind being one of TASK_TOKEN_KINDS"""
+    task = TASK_R.match(task_txt)
+    if task is None:
+        return ()
+    tokens = []
+    for kind, group in (('done', 'isDone'), ('priority', 'priority'), ('date', 'dates')):
+        if task.group(group):
+            tokens.append((kind, *task.span(group)))
+    for match in SPECIAL_KV_R.finditer(task_txt):
+        tokens.append(('kv', *match.span()))
+    for match in PROJECT_R.finditer(task_txt):
+        tokens.append(('project', *match.span('project')))
+    for match in CONTEXT_R.finditer(task_txt):
+        tokens.append(('context', *match.span('context')))
+    return tuple(tokens)
+
+
+TASK_TOKEN_KINDS = ('done', 'priority', 'date', 'kv', 'project', 'context')
+
+
+class TaskDateIndex:
+    """Line indexes of the dated tasks sorted by creation and by completion
+    date ordinal, to query tasks by date without parsing them again"""
+
+    def __init__(self):
+        # sorted lists of (ordinal, line index)
+        self.creation = []
+        self.completion = []
+
+    def build(self, cards):
+        self.creation = sorted((card['start_ordinal'], card['index']) for card in cards if card['start_ordinal'] is not None)
+        self.completion = sorted((card['end_ordinal'], card['index']) for card in cards if card['end_ordinal'] is not None)
+
+    def add(self, card):
+        if card['start_ordinal'] is not None:
+            bisect.insort(self.creation, (card['start_ordinal'], card['index']))
+        if card['end_ordinal'] is not None:
+            bisect.insort(self.completion, (card['end_ordinal'], card['index']))
+
+    def remove(self, card):
+        for entries, ordinal in ((self.creation, card['start_ordinal']), (self.completion, card['end_ordinal'])):
+            if ordinal is not None:
+                position = bisect.bisect_left(entries, (ordinal, card['index']))
+                if position < len(entries) and entries[position] == (ordinal, card['index']):
+                    del entries[position]
+
+    @staticmethod
+    def between(entries, first_ordinal, last_ordinal):
+        start = bisect.bisect_left(entries, (first_ordinal,))
+        end = bisect.bisect_left(entries, (last_ordinal + 1,))
+        return [index for ordinal, index in entries[start:end]]
+
+    def created_between(self, first_ordinal, last_ordinal):
+        """Line indexes of the tasks created between the two dates included"""
+        return self.between(self.creation, first_ordinal, last_ordinal)
+
+    def completed_between(self, first_ordinal, last_ordinal):
+        """Line indexes of the tasks completed between the two dates included"""
+        return self.between(self.completion, first_ordinal, last_ordinal)
+
+
+class BoardStats:
+    """Number of cards by column, and of open and done cards by project and
+    context tag, kept up to date as cards are added and removed"""
+
+    def __init__(self):
+        self.columns = {}
+        # tag: [open, done]
+        self.projects = {}
+        self.contexts = {}
+        # key of the key:value pairs: number of tasks
+        self.keys = {}
+        self.done_column = None
+
+    def build(self, cards, column_names):
+        self.columns = {name: 0 for name in column_names}
+        self.projects = {}
+        self.contexts = {}
+        self.keys = {}
+        self.done_column = column_names[DONE_COLUMN]
+        for card in cards:
+            self.add(card)
+
+    def add(self, card, count=1):
+        self.columns[card['state']] += count
+        is_done = int(card['state'] == self.done_column)
+        for field, tags_counts in (('project', self.projects), ('context', self.contexts)):
+            # a task counts once for a tag, even if written twice
+            for tag in {tag[field] for tag in card[field]}:
+                counts = tags_counts.setdefault(tag, [0, 0])
+                counts[is_done] += count
+                if counts == [0, 0]:
+                    del tags_counts[tag]
+        for key in {kv['key'] for kv in card['special_kv_data']}:
+            key_count = self.keys.get(key, 0) + count
+            if key_count == 0:
+                del self.keys[key]
+            else:
+                self.keys[key] = key_count
+
+    def remove(self, card):
+        self.add(card, -1)
+
+    def rename_columns(self, renaming):
+        self.columns = {renaming[name]: count for name, count in self.columns.items()}
+        self.done_column = renaming.get(self.done_column, self.done_column)
+
+    def get_completion_counts(self):
+        """Number of tasks of each tag and key, the keys ending with their colon"""
+        counts = {tag: sum(tag_counts) for tag, tag_counts in itertools.chain(self.projects.items(), self.contexts.items())}
+        counts.update((key + ':', count) for key, count in self.keys.items())
+        return counts
+
+    def get_tag_text(self, tag):
+        """Tooltip text of a tag, like: +backend: 12 open / 40 done"""
+        open_number, done_number = (self.projects if tag.startswith('+') else self.contexts).get(tag, (0, 0))
+        return f"{tag}: {open_number} open / {done_number} done"
+
+
+class TagTrieNode:
+    __slots__ = ('children', 'count', 'top')
+
+    def __init__(self):
+        self.children = {}
+        # number of tasks using the word ending at this node
+        self.count = 0
+        # most used words below this node, None until asked again after a change
+        self.top = None
+
+
+class TagTrie:
+    """Prefix tree of the projects, contexts and keys of the tasks, with the
+    number of tasks using each of them, to complete them while typing. The
+    most used words below a node are kept in the node until a word below it
+    changes, so completing is fast even with thousands of tags."""
+
+    COMPLETIONS_NUMBER = 8
+
+    def __init__(self):
+        self.root = TagTrieNode()
+        # {word: number of tasks}, as stored in the nodes
+        self.counts = collections.Counter()
+
+    def build(self, counts):
+        """counts: {word: number of tasks}"""
+        self.root = TagTrieNode()
+        self.counts = collections.Counter()
+        for word, count in counts.items():
+            self.add(word, count)
+        # fill the caches at once, the next completions only refresh the changed nodes
+        self.get_top(self.root, '')
+
+    def update(self, counts):
+        """Set the counts of all the words, only the words whose count
+        changed are updated"""
+        for word in set(self.counts).union(counts):
+            delta = counts.get(word, 0) - self.counts[word]
+            if delta != 0:
+                self.add(word, delta)
+
+    def add(self, word, count=1):
+        self.counts[word] += count
+        node = self.root
+        node.top = None
+        for char in word:
+            node = node.children.setdefault(char, TagTrieNode())
+            node.top = None
+        node.count += count
+
+    @staticmethod
+    def get_card_words(card):
+        words = {tag['project'] for tag in card['project']}
+        words.update(tag['context'] for tag in card['context'])
+        words.update(kv['key'] + ':' for kv in card['special_kv_data'])
+        return words
+
+    def add_card(self, card, count=1):
+        for word in self.get_card_words(card):
+            self.add(word, count)
+
+    def remove_card(self, card):
+        self.add_card(card, -1)
+
+    def complete(self, prefix):
+        """The most used words starting with prefix, most used first"""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [word for count, word in self.get_top(node, prefix)]
+
+    def get_top(self, node, prefix):
+        if node.top is None:
+            candidates = [(node.count, prefix)] if node.count > 0 else []
+            for char, child in node.children.items():
+                candidates += self.get_top(child, prefix + char)
+            candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+            node.top = candidates[:self.COMPLETIONS_NUMBER]
+        return node.top
+
+
+class GroupingIndex:
+    """Cards grouped by their first project or context tag, then by column,
+    for the swimlanes. The cards of a group and column are kept in the order
+    they are given, cards are added and removed one by one as they change."""
+
+    NO_GROUP = ''
+
+    def __init__(self, field=None):
+        # 'project' or 'context'
+        self.field = field
+        self.column_names = []
+        # group: {column name: [cards]}
+        self.groups = {}
+
+    def get_key(self, card):
+        tags = card[self.field]
+        return tags[0][self.field] if tags else self.NO_GROUP
+
+    def build(self, cards, column_names):
+        self.column_names = list(column_names)
+        self.groups = {}
+        for card in cards:
+            self.get_cards(self.get_key(card), card['state']).append(card)
+
+    def get_cards(self, key, column_name):
+        """The cards of a group in a column, the group is created if missing"""
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = {name: [] for name in self.column_names}
+        return group[column_name]
+
+    def remove(self, card):
+        """Remove a card, its group is kept even if it gets empty"""
+        self.groups[self.get_key(card)][card['state']].remove(card)
+
+    def count(self, key):
+        return sum(len(cards) for cards in self.groups.get(key, {}).values())
+
+    def discard(self, key):
+        del self.groups[key]
+
+    def get_sorted_keys(self):
+        """The groups by name, the cards without tag last"""
+        return sorted(self.groups, key=lambda key: (key == self.NO_GROUP, key.casefold()))
+
+    def rename_columns(self, renaming):
+        self.column_names = [renaming[name] for name in self.column_names]
+        for key, group in self.groups.items():
+            self.groups[key] = {renaming[name]: cards for name, cards in group.items()}
+
+
+class TaskIdIndex:
+    """Identifiers of the task lines that don't change when other lines are
+    added, removed or moved: the value of the id: key/value pair of a task, or
+    else a short hash of the line as it was first seen. The identifiers follow
+    their lines as the text is edited."""
+
+    ID_KEY = 'id'
+
+    def __init__(self):
+        self.texts = []
+        # identifier of each line, None for the blank lines
+        self.ids = []
+        # identifier: line index
+        self.lines = {}
+
+    def get_id(self, line):
+        if 0 <= line < len(self.ids):
+            return self.ids[line]
+        return None
+
+    def get_line(self, task_id):
+        return self.lines.get(task_id)
+
+    def get_explicit_id(self, text):
+        for kv in parse_task_line(text)['special_kv_data']:
+            if kv['key'] == self.ID_KEY:
+                return kv['val']
+        return None
+
+    def get_new_id(self, text, taken):
+        task_id = self.get_explicit_id(text)
+        if task_id is None:
+            task_id = hashlib.blake2b(text.encode('utf-8'), digest_size=3).hexdigest()
+        unique_id = task_id
+        number = 2
+        while unique_id in self.lines or unique_id in taken:
+            unique_id = f"{task_id}-{number}"
+            number += 1
+        return unique_id
+
+    def update(self, texts):
+        """Give identifiers to new lines of text, the lines before and after
+        the changed part keep theirs"""
+        old_texts = self.texts
+        start = 0
+        end = min(len(old_texts), len(texts))
+        while start < end and old_texts[start] == texts[start]:
+            start += 1
+        old_end, new_end = len(old_texts), len(texts)
+        while old_end > start and new_end > start and old_texts[old_end - 1] == texts[new_end - 1]:
+            old_end -= 1
+            new_end -= 1
+        if start < old_end or start < new_end:
+            self.splice(start, old_end, texts[start:new_end])
+
+    def replace(self, line, text):
+        self.splice(line, line + 1, [text])
+
+    def splice(self, start, end, texts):
+        """Replace the lines start to end (excluded) by texts. A moved line
+        keeps its identifier, then the edited lines take the identifiers of
+        the replaced lines in order, unless they have an id: value."""
+        old_ids = self.ids[start:end]
+        ids_by_text = {}
+        for old_text, task_id in zip(self.texts[start:end], old_ids):
+            if task_id is not None:
+                ids_by_text.setdefault(old_text, []).append(task_id)
+                del self.lines[task_id]
+
+        new_ids = [None] * len(texts)
+        for i, text in enumerate(texts):
+            if text.strip() and ids_by_text.get(text):
+                new_ids[i] = ids_by_text[text].pop(0)
+        taken = set(new_ids)
+        free_ids = [task_id for task_id in old_ids if task_id is not None and task_id not in taken]
+        free_ids.reverse()
+        for i, text in enumerate(texts):
+            if new_ids[i] is not None or not text.strip():
+                continue
+            explicit_id = self.get_explicit_id(text)
+            # a replaced identifier may have been taken again by an id: value
+            while free_ids and free_ids[-1] in taken:
+                free_ids.pop()
+            if explicit_id is not None and explicit_id not in taken and explicit_id not in self.lines:
+                new_ids[i] = explicit_id
+            elif explicit_id is None and free_ids:
+                new_ids[i] = free_ids.pop()
+            else:
+                new_ids[i] = self.get_new_id(text, taken)
+            taken.add(new_ids[i])
+
+        self.texts[start:end] = texts
+        self.ids[start:end] = new_ids
+        # the lines after the change moved if the number of lines changed
+        last = len(self.ids) if len(texts) != end - start else start + len(texts)
+        for line in range(start, last):
+            task_id = self.ids[line]
+            if task_id is not None:
+                self.lines[task_id] = line
+
+
+def get_user_config_dir():
+    """Return the per-user directory where KanbanTxt keeps its settings"""
+    if os.name == 'nt':
+        base_dir = os.environ.get('APPDATA') or os.path.expanduser('~')
+    else:
+        base_dir = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(base_dir, 'KanbanTxt')
+
+
+class ConfigStore:
+    """Settings persisted as a json file. The file is read once, on the first
+    access, and changes are written back in a background thread a little
+    while after the last modification, by atomically replacing the file."""
+
+    def __init__(self, path, legacy_path=None, flush_delay=1.0):
+        self.path = path
+        # file read when there is no config at path yet, to keep older settings
+        self.legacy_path = legacy_path
+        self.flush_delay = flush_delay
+        self.values = None
+        self.lock = threading.Lock()
+        # held through a whole write, so that the files are written in the order of their content
+        self.write_lock = threading.Lock()
+        self.flush_timer = None
+        self.dirty = False
+        # error of the last background write, reported by the caller
+        self.error = None
+
+    def load(self):
+        with self.lock:
+            if self.values is None:
+                self.values = {}
+                for path in (self.path, self.legacy_path):
+                    if path is None or not os.path.exists(path):
+                        continue
+                    try:
+                        with open(path, "r") as config_file:
+                            self.values = json.load(config_file)
+                    except (OSError, ValueError):
+                        continue
+                    break
+            return self.values
+
+    def get(self, key, default=None):
+        return self.load().get(key, default)
+
+    def set(self, key, value):
+        """Change a value, return whether it was different from the stored one"""
+        values = self.load()
+        with self.lock:
+            if key in values and values[key] == value:
+                return False
+            values[key] = value
+            self.dirty = True
+            return True
+
+    def schedule_flush(self):
+        """Write the changes in the background once no change happened for
+            flush_delay seconds"""
+        with self.lock:
+            if not self.dirty:
+                return
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+            self.flush_timer = threading.Timer(self.flush_delay, self.flush)
+            self.flush_timer.daemon = True
+            self.flush_timer.start()
+
+    def flush(self):
+        """Write the pending changes now, once a background write in progress
+            is over"""
+        with self.lock:
+            flush_timer = self.flush_timer
+            self.flush_timer = None
+        if flush_timer is not None and flush_timer is not threading.current_thread():
+            flush_timer.cancel()
+            flush_timer.join()
+
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                content = json.dumps(self.values, sort_keys=True, indent=4)
+                self.dirty = False
+            self.write(content)
+
+    def write(self, content):
+        temp_path = None
+        try:
+            config_dir = os.path.dirname(self.path) or '.'
+            os.makedirs(config_dir, exist_ok=True)
+            file_descriptor, temp_path = tempfile.mkstemp(dir=config_dir, prefix='.config-', suffix='.tmp')
+            with os.fdopen(file_descriptor, "w") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError as error:
+            self.error = error
+            with self.lock:
+                self.dirty = True
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def get_user_cache_dir():
+    """Return the per-user directory where KanbanTxt keeps data it can rebuild"""
+    if os.name == 'nt':
+        base_dir = os.environ.get('LOCALAPPDATA') or os.environ.get('APPDATA') or os.path.expanduser('~')
+        return os.path.join(base_dir, 'KanbanTxt', 'Cache')
+    base_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base_dir, 'KanbanTxt')
+
+
+class TaskParseCache:
+    """Parsed lines of a todo.txt kept on disk between runs, as marshal data
+    in the user cache directory. If the file is unchanged since the cache was
+    written its lines are taken in order, otherwise they are looked up by
+    hash so that only the new or edited lines are parsed again."""
+
+    VERSION = 1
+    HASH_SIZE = 8
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        # (size, mtime) of the file when the cache was read or written, None if the cache is outdated
+        self.cached_stat = None
+        # error of the last write, shown in the diagnostics panel
+        self.error = None
+
+    def get_path(self, file):
+        key = hashlib.blake2b(os.path.abspath(file).encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, key + '.parse')
+
+    @staticmethod
+    def get_stat(file):
+        stat = os.stat(file)
+        return stat.st_size, stat.st_mtime_ns
+
+    def get_hash(self, line):
+        return hashlib.blake2b(line.encode('utf-8'), digest_size=self.HASH_SIZE).digest()
+
+    @staticmethod
+    def to_record(task):
+        return (
+            task['subject'],
+            task['column'],
+            task['priority'],
+            tuple(tag['project'] for tag in task['project']),
+            tuple(tag['context'] for tag in task['context']),
+            tuple((kv['key'], kv['val']) for kv in task['special_kv_data']),
+            task['start_ordinal'],
+            task['end_ordinal'],
+        )
+
+    @staticmethod
+    def from_record(record):
+        subject, column, priority, projects, contexts, special_kv_data, start_ordinal, end_ordinal = record
+        return {
+            'subject': subject,
+            'column': column,
+            'priority': priority,
+            'project': [{'project': project} for project in projects],
+            'context': [{'context': context} for context in contexts],
+            'special_kv_data': [{'key': key, 'val': val} for key, val in special_kv_data],
+            'start_ordinal': start_ordinal,
+            'end_ordinal': end_ordinal,
+        }
+
+    def load(self, file, text):
+        """Parsed tasks of the lines of text found in the cache, by line"""
+        # the garbage collector would run many times while the records are
+        # created, for nothing as they have no reference cycles
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self.load_records(file, text)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def load_records(self, file, text):
+        self.cached_stat = None
+        try:
+            with open(self.get_path(file), 'rb') as cache_file:
+                # much faster than marshal.load on the file object
+                data = marshal.loads(cache_file.read())
+            stat = self.get_stat(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != self.VERSION or data.get('path') != os.path.abspath(file):
+            return {}
+
+        lines = [line for line in text.split('\n') if line]
+        records = data['records']
+        if tuple(data['stat']) == stat and len(records) == len(lines):
+            self.cached_stat = stat
+            return {line: self.from_record(record) for line, record in zip(lines, records) if record is not None}
+
+        hashes = data['hashes']
+        records_by_hash = {hashes[i * self.HASH_SIZE:(i + 1) * self.HASH_SIZE]: record for i, record in enumerate(records)}
+        tasks = {}
+        for line in lines:
+            record = records_by_hash.get(self.get_hash(line))
+            if record is not None:
+                tasks[line] = self.from_record(record)
+        return tasks
+
+    def save(self, file):
+        """Write the parsed lines of the file, unless the cache is up to date"""
+        temp_path = None
+        try:
+            stat = self.get_stat(file)
+            if stat == self.cached_stat:
+                return
+            with open(file, 'r', encoding='utf-8') as todo_file:
+                lines = [line for line in todo_file.read().split('\n') if line]
+            records = []
+            for line in lines:
+                try:
+                    records.append(self.to_record(parse_task_line(line)))
+                except ValueError:
+                    # like an invalid date, parsed again next time to show the error
+                    records.append(None)
+            data = {
+                'version': self.VERSION,
+                'path': os.path.abspath(file),
+                'stat': stat,
+                'hashes': b''.join(self.get_hash(line) for line in lines),
+                'records': records,
+            }
+            os.makedirs(self.cache_dir, exist_ok=True)
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.parse-', suffix='.tmp')
+            with os.fdopen(file_descriptor, 'wb') as cache_file:
+                cache_file.write(marshal.dumps(data))
+            os.replace(temp_path, self.get_path(file))
+            self.cached_stat = stat
+            self.error = None
+        except (OSError, UnicodeDecodeError) as error:
+            self.error = error
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+class TodoFileWriter:
+    """Writes texts to a file, only writing what changed when the file is
+    still as it was last read or written: lines replaced by lines of the same
+    size in bytes are written over in place, and text added at the end is
+    appended. Otherwise, the file is replaced at once by a new one. The bytes
+    of the file and the offset of its lines are kept for this."""
+
+    ENCODING = 'utf-8'
+    # the files are read and written in text mode before, with the newlines of the platform
+    NEWLINE = os.linesep.encode(ENCODING)
+    # size of the blocks compared to find the changed lines
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self):
+        self.path = None
+        self.data = b''
+        # offset of the start of each line in data, and of the end of data
+        # with a newline, None until needed
+        self.offsets = None
+        self.stat = None
+
+    @staticmethod
+    def get_stat(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def encode(self, text):
+        if self.NEWLINE != b'\n':
+            text = text.replace('\n', os.linesep)
+        return text.encode(self.ENCODING)
+
+    def remember(self, path, text):
+        """Take the text just read from the file. The newlines translated when
+        reading change the size of the file, its bytes are only assumed to be
+        the ones of the text if it has the same size"""
+        data = self.encode(text)
+        stat = self.get_stat(path)
+        if stat is None or stat[0] != len(data):
+            self.path = None
+            return
+        self.set_data(path, data)
+
+    def set_data(self, path, data, offsets=None):
+        self.path = path
+        self.data = data
+        self.offsets = offsets
+        self.stat = self.get_stat(path)
+
+    def get_offsets(self):
+        if self.offsets is None:
+            newline_size = len(self.NEWLINE)
+            line_sizes = (len(line) + newline_size for line in self.data.split(self.NEWLINE))
+            self.offsets = array('q', itertools.accumulate(line_sizes, initial=0))
+        return self.offsets
+
+    def write(self, path, text):
+        data = self.encode(text)
+        if path != self.path or self.get_stat(path) != self.stat:
+            self.write_all(path, data)
+        elif data == self.data:
+            return
+        elif data.startswith(self.data):
+            self.append(path, data)
+        elif len(data) != len(self.data) or not self.patch(path, data):
+            self.write_all(path, data)
+
+    def append(self, path, data):
+        with open(path, 'ab') as f:
+            f.write(data[len(self.data):])
+        offsets = None
+        if self.offsets is not None:
+            # the last line goes on, the next ones are new
+            newline_size = len(self.NEWLINE)
+            last_line_offset = self.offsets[-2]
+            new_lines = data[last_line_offset:].split(self.NEWLINE)
+            offsets = self.offsets[:-2] + array('q', itertools.accumulate(
+                (len(line) + newline_size for line in new_lines), initial=last_line_offset))
+        self.set_data(path, data, offsets)
+
+    def get_changed_range(self, data):
+        """First and last changed lines, data having the size of the file"""
+        size = len(data)
+        changed_chunks = [start for start in range(0, size, self.CHUNK_SIZE)
+                          if data[start:start + self.CHUNK_SIZE] != self.data[start:start + self.CHUNK_SIZE]]
+        offsets = self.get_offsets()
+        first_line = bisect.bisect_right(offsets, changed_chunks[0]) - 1
+        last_line = bisect.bisect_right(offsets, min(changed_chunks[-1] + self.CHUNK_SIZE, size) - 1) - 1
+        return first_line, last_line
+
+    def patch(self, path, data):
+        """Write the changed lines in place, False if a line changed of size"""
+        first_line, last_line = self.get_changed_range(data)
+        offsets = self.get_offsets()
+        start = offsets[first_line]
+        end = offsets[last_line + 1] - len(self.NEWLINE)
+        old_lines = self.data[start:end].split(self.NEWLINE)
+        new_lines = data[start:end].split(self.NEWLINE)
+        if len(old_lines) != len(new_lines):
+            return False
+        changed_lines = [index for index, (old_line, new_line) in enumerate(zip(old_lines, new_lines)) if old_line != new_line]
+        if any(len(old_lines[index]) != len(new_lines[index]) for index in changed_lines):
+            return False
+        with open(path, 'r+b') as f:
+            for index in changed_lines:
+                f.seek(offsets[first_line + index])
+                f.write(new_lines[index])
+        self.set_data(path, data, offsets)
+        return True
+
+    def write_all(self, path, data):
+        """Replace the file by a new one, so that it is never left half written"""
+        # replace the file a link points to, not the link
+        real_path = os.path.realpath(path)
+        temp_path = None
+        try:
+            file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(real_path), prefix='.todo-', suffix='.tmp')
+            with os.fdopen(file_descriptor, 'wb') as f:
+                f.write(data)
+            if os.path.exists(real_path):
+                os.chmod(temp_path, os.stat(real_path).st_mode & 0o7777)
+            else:
+                # mkstemp creates the file readable by its owner only, a new
+                # file gets the usual mode of the files created by open
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(temp_path, 0o666 & ~umask)
+            os.replace(temp_path, real_path)
+        except OSError:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.set_data(path, data)
+
+
+def iter_file_tasks(file):
+    """(line index, parsed task) of each task of a todo.txt, read line by
+    line so that the file is never loaded as a whole. Invalid tasks, like
+    tasks with an invalid date, are reported on stderr and skipped"""
+    # each line is parsed once, filling the cache of parse_task_line would
+    # only take memory
+    parse = parse_task_line.__wrapped__
+    with open(file, 'r', encoding='utf-8') as todo_file:
+        for index, line in enumerate(todo_file):
+            line = line.rstrip('\n')
+            if len(line) != 0:
+                try:
+                    task = parse(line)
+                except ValueError as error:
+                    print(f"Line {index + 1} skipped: {error}", file=sys.stderr)
+                    continue
+                yield index, task
+
+
+class BoardExporter:
+    """Export a board as a static HTML page or as JSON lines. The output is
+    generated one task at a time from an iterator of (line index, task), like
+    iter_file_tasks, so the memory used doesn't depend on the number of tasks.
+    The HTML cards come in the order of the file: they are placed in their
+    column by a CSS grid with a dense flow."""
+
+    def __init__(self, column_names, colors, today_ordinal, title='KanbanTxt'):
+        self.column_names = column_names
+        self.colors = colors
+        self.today_ordinal = today_ordinal
+        self.title = title
+
+    @staticmethod
+    def write(outputs):
+        """Write each output, a (path, chunks) pair, the path being '-' for
+        the standard output. The outputs are written side by side so that
+        chunks made from the same tasks can share one pass over them."""
+        with contextlib.ExitStack() as stack:
+            files = []
+            for path, chunks in outputs:
+                if path == '-':
+                    files.append(sys.stdout)
+                else:
+                    files.append(stack.enter_context(open(path, 'w', encoding='utf-8')))
+            for chunks in itertools.zip_longest(*(chunks for path, chunks in outputs)):
+                for export_file, chunk in zip(files, chunks):
+                    if chunk is not None:
+                        export_file.write(chunk)
+
+    def get_days(self, task):
+        if task['start_ordinal'] is None:
+            return None
+        end_ordinal = task['end_ordinal'] if task['end_ordinal'] is not None else self.today_ordinal
+        return end_ordinal - task['start_ordinal']
+
+    def get_task_record(self, index, task):
+        return {
+            'line': index + 1,
+            'column': self.column_names[task['column']],
+            'done': task['column'] == DONE_COLUMN,
+            'priority': task['priority'],
+            'subject': task['subject'].strip(),
+            'projects': [tag['project'] for tag in task['project']],
+            'contexts': [tag['context'] for tag in task['context']],
+            'data': {kv['key']: kv['val'] for kv in task['special_kv_data']},
+            'created': date.fromordinal(task['start_ordinal']).isoformat() if task['start_ordinal'] is not None else None,
+            'completed': date.fromordinal(task['end_ordinal']).isoformat() if task['end_ordinal'] is not None else None,
+            'days': self.get_days(task),
+        }
+
+    def iter_jsonl(self, tasks):
+        for index, task in tasks:
+            yield json.dumps(self.get_task_record(index, task), ensure_ascii=False) + '\n'
+
+    def get_priority_color(self, priority):
+        scale = self.colors['priority_color_scale']
+        index = ord(priority) - ord('A')
+        if index >= len(scale) or index < 0:
+            index = -1
+        return scale[index]
+
+    def get_style(self):
+        colors = self.colors
+        rules = [
+            f"body {{ margin: 0; padding: 10px; background: {colors['main-background']}; color: {colors['main-text']}; font-family: Ubuntu, sans-serif; }}",
+            "h1 { font-size: 20px; margin: 0 0 10px 10px; }",
+            "main { display: grid; grid-template-columns: repeat(4, minmax(0, 1fr)); grid-auto-flow: row dense; gap: 10px; align-items: start; }",
+            "h2 { grid-row: 1; margin: 0; padding: 3px 10px 10px; font-size: 16px; font-weight: normal; border-top: 8px solid; }",
+            f".card {{ display: flex; background: {colors['card-background']}; padding: 5px 10px; border-left: 3px solid transparent; }}",
+            f".card.done {{ background: {colors['done-card-background']}; }}",
+            ".card .priority { font-weight: bold; margin-right: 8px; }",
+            ".card .content { flex: 1; min-width: 0; overflow-wrap: anywhere; }",
+            f".card .tags {{ text-align: right; font-size: 12px; }}",
+            f".card .project {{ color: {colors['project']}; }}",
+            f".card .context {{ color: {colors['context']}; }}",
+            f".card .data, .card .index {{ color: {colors['kv-data']}; font-size: 11px; }}",
+            ".card .days { font-size: 11px; }",
+        ]
+        for column in range(len(self.column_names)):
+            rules.append(f".column{column} {{ grid-column: {column + 1}; }}")
+            rules.append(f"h2.column{column} {{ border-color: {colors[f'column{column}']}; background: {colors[f'column{column}-column']}; }}")
+            rules.append(f".column{column} .days {{ color: {colors[f'column{column}']}; }}")
+        return '\n'.join(rules)
+
+    def iter_html(self, tasks):
+        import html
+        escape = html.escape
+        yield (
+            '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+            f'<title>{escape(self.title)}</title>\n<style>\n{self.get_style()}\n</style>\n'
+            f'</head>\n<body>\n<h1>{escape(self.title)}</h1>\n<main>\n'
+        )
+        for column, name in enumerate(self.column_names):
+            yield f'<h2 class="column{column}">{escape(name)}</h2>\n'
+
+        for index, task in tasks:
+            column = task['column']
+            classes = f"card column{column}" + (" done" if column == DONE_COLUMN else "")
+            parts = [f'<div class="{classes}"']
+            if task['priority']:
+                color = self.get_priority_color(task['priority'])
+                parts.append(f' style="border-left-color: {color}"><span class="priority" style="color: {color}">{task["priority"]}</span>')
+            else:
+                parts.append('>')
+            parts.append(f'<div class="content"><div class="index">#{index}</div><div>{escape(task["subject"].strip())}</div>')
+            days = self.get_days(task)
+            if days is not None:
+                parts.append(f'<div class="days">{days} days</div>')
+            if task['project'] or task['context']:
+                parts.append('<div class="tags">')
+                parts.append(''.join(f'<span class="project">{escape(tag["project"])}</span> ' for tag in task['project']))
+                parts.append(''.join(f'<span class="context">{escape(tag["context"])}</span> ' for tag in task['context']))
+                parts.append('</div>')
+            if task['special_kv_data']:
+                data = ', '.join(f"{kv['key']}:{kv['val']}" for kv in task['special_kv_data'])
+                parts.append(f'<div class="data">{escape(data)}</div>')
+            parts.append('</div></div>\n')
+            yield ''.join(parts)
+
+        yield '</main>\n</body>\n</html>\n'
+
+
+def get_numpy():
+    """numpy if it is installed, None otherwise"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class TaskHistory:
+    """Columnar table of the tasks of a todo.txt and its done files, for the
+    analytics: one array per attribute, dates as ordinals (0 when missing),
+    project and context as codes of their first tag (-1 when missing)."""
+
+    HISTORY_R = re.compile(r'(x )?(?:\([A-Z]\) )?(?:(\d\d\d\d-\d\d-\d\d)(?: (\d\d\d\d-\d\d-\d\d))?)?')
+
+    # lower bounds of the cycle time histogram buckets, in days
+    CYCLE_TIME_BUCKETS = [0, 1, 2, 4, 8, 15, 31, 91]
+    ROLLING_WEEKS = 4
+
+    def __init__(self):
+        self.created = array('q')
+        self.completed = array('q')
+        self.done = array('b')
+        self.project = array('q')
+        self.context = array('q')
+        self.project_names = []
+        self.context_names = []
+        self.project_codes = {}
+        self.context_codes = {}
+        self.ordinals = {}
+
+    def __len__(self):
+        return len(self.done)
+
+    def get_ordinal(self, iso_date):
+        ordinal = self.ordinals.get(iso_date)
+        if ordinal is None:
+            try:
+                ordinal = date.fromisoformat(iso_date).toordinal()
+            except ValueError:
+                ordinal = 0
+            self.ordinals[iso_date] = ordinal
+        return ordinal
+
+    @staticmethod
+    def get_code(name, codes, names):
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def add_text(self, text):
+        """Add every task of a todo.txt content, scanned as a whole with numpy
+        when it is available"""
+        numpy = get_numpy()
+        if numpy is None or not self.add_text_with_numpy(numpy, text):
+            self.add_lines(text.split('\n'))
+
+    def add_lines(self, lines):
+        # local names, this loop runs for every task of the history
+        match = self.HISTORY_R.match
+        search_project = PROJECT_R.search
+        search_context = CONTEXT_R.search
+        get_ordinal = self.get_ordinal
+        get_code = self.get_code
+        created, completed, done = self.created.append, self.completed.append, self.done.append
+        project, context = self.project.append, self.context.append
+        for line in lines:
+            if not line or line.isspace():
+                continue
+            is_done, first_date, second_date = match(line).groups()
+            if second_date:
+                created(get_ordinal(second_date))
+                completed(get_ordinal(first_date))
+            else:
+                created(get_ordinal(first_date) if first_date else 0)
+                completed(0)
+            done(1 if is_done else 0)
+            tag = search_project(line)
+            project(get_code(tag.group(1), self.project_codes, self.project_names) if tag else -1)
+            tag = search_context(line)
+            context(get_code(tag.group(1), self.context_codes, self.context_names) if tag else -1)
+
+    # days before the first day of each month, in a non leap year
+    MONTH_OFFSETS = [0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334]
+    MONTH_LENGTHS = [0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    MAX_TAG_LENGTH = 64
+
+    def add_text_with_numpy(self, numpy, text):
+        """Same as add_lines, on the bytes of the whole text at once. Returns
+        False, having added nothing, if a tag is too long for this scan."""
+        data = text.encode('utf-8')
+        # padding so that reading a few bytes after a line end stays in bounds
+        buffer = numpy.frombuffer(data + b'\n' + b' ' * self.MAX_TAG_LENGTH, dtype=numpy.uint8)
+        ends = numpy.flatnonzero(buffer[:len(data) + 1] == 10)
+        starts = numpy.concatenate(([0], ends[:-1] + 1))
+        # skip the blank lines, few lines start with a space so check those one by one
+        is_task = buffer[starts] > 32
+        for line in numpy.flatnonzero(~is_task).tolist():
+            is_task[line] = bool(data[starts[line]:ends[line]].strip())
+        starts = starts[is_task]
+        if not len(starts):
+            return True
+
+        done = (buffer[starts] == ord('x')) & (buffer[starts + 1] == 32)
+        position = starts + 2 * done
+        letter = buffer[position + 1]
+        has_priority = ((buffer[position] == ord('(')) & (letter >= ord('A')) & (letter <= ord('Z'))
+                        & (buffer[position + 2] == ord(')')) & (buffer[position + 3] == 32))
+        position = position + 4 * has_priority
+        first_date = self.get_ordinals_with_numpy(numpy, buffer, position)
+        second_date = self.get_ordinals_with_numpy(numpy, buffer, position + 11)
+        second_date[(first_date == 0) | (buffer[position + 10] != 32)] = 0
+        has_two_dates = second_date > 0
+
+        projects = self.get_tag_codes_with_numpy(numpy, buffer, starts, ord('+'),
+                                                 self.project_codes, self.project_names)
+        contexts = self.get_tag_codes_with_numpy(numpy, buffer, starts, ord('@'),
+                                                 self.context_codes, self.context_names)
+        if projects is None or contexts is None:
+            return False
+
+        int64 = numpy.int64
+        self.created.frombytes(numpy.where(has_two_dates, second_date, first_date).astype(int64).tobytes())
+        self.completed.frombytes(numpy.where(has_two_dates, first_date, 0).astype(int64).tobytes())
+        self.done.frombytes(done.astype(numpy.int8).tobytes())
+        self.project.frombytes(projects.astype(int64).tobytes())
+        self.context.frombytes(contexts.astype(int64).tobytes())
+        return True
+
+    def get_ordinals_with_numpy(self, numpy, buffer, positions):
+        """Ordinals of the YYYY-MM-DD dates at the given positions, 0 where
+        there is no valid date"""
+        digits = [buffer[positions + i].astype(numpy.int64) - ord('0') for i in range(10)]
+        is_date = (buffer[positions + 4] == ord('-')) & (buffer[positions + 7] == ord('-'))
+        for i in (0, 1, 2, 3, 5, 6, 8, 9):
+            is_date &= (digits[i] >= 0) & (digits[i] <= 9)
+        year = digits[0] * 1000 + digits[1] * 100 + digits[2] * 10 + digits[3]
+        month = numpy.clip(digits[5] * 10 + digits[6], 0, 12)
+        day = digits[8] * 10 + digits[9]
+        is_leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        is_date &= ((year > 0) & (month > 0) & (day > 0)
+                    & (day <= numpy.array(self.MONTH_LENGTHS)[month])
+                    & ((month != 2) | (day < 29) | is_leap))
+        years = year - 1
+        ordinals = (365 * years + years // 4 - years // 100 + years // 400
+                    + numpy.array(self.MONTH_OFFSETS)[month] + ((month > 2) & is_leap) + day)
+        return numpy.where(is_date, ordinals, 0)
+
+    def get_tag_codes_with_numpy(self, numpy, buffer, starts, sign, codes, names):
+        """Code of the first tag starting by sign in each line, -1 for none"""
+        result = numpy.full(len(starts), -1, dtype=numpy.int64)
+        tags = numpy.flatnonzero(buffer[:-1] == sign)
+        tags = tags[(tags > 0) & (buffer[tags - 1] == 32) & (buffer[tags + 1] > 32)]
+        lines = numpy.searchsorted(starts, tags, side='right') - 1
+        # keep the first tag of each task line
+        tags = tags[lines >= 0]
+        lines = lines[lines >= 0]
+        if not len(tags):
+            return result
+        first = numpy.concatenate(([True], lines[1:] != lines[:-1]))
+        tags, lines = tags[first], lines[first]
+
+        # read the tags as fixed width byte strings, zero filled after the tag
+        for width in (16, self.MAX_TAG_LENGTH):
+            offsets = numpy.arange(width)
+            windows = buffer[tags[:, None] + offsets]
+            is_end = windows <= 32
+            has_end = is_end.any(axis=1)
+            if has_end.all():
+                break
+        else:
+            return None
+        lengths = is_end.argmax(axis=1)
+        width = int(lengths.max())
+        windows = windows[:, :width]
+        windows[offsets[:width] >= lengths[:, None]] = 0
+        # group them by a 64 bits FNV-1a hash of their bytes, faster to sort than the bytes
+        hashes = numpy.full(len(tags), 0xcbf29ce484222325, dtype=numpy.uint64)
+        prime = numpy.uint64(0x100000001b3)
+        with numpy.errstate(over='ignore'):
+            for column in windows.T:
+                hashes = (hashes ^ column) * prime
+        values, first, inverse = numpy.unique(hashes, return_index=True, return_inverse=True)
+        value_codes = numpy.array([self.get_code(windows[row].tobytes().rstrip(b'\0').decode('utf-8', 'replace'),
+                                                 codes, names) for row in first.tolist()], dtype=numpy.int64)
+        result[lines] = value_codes[inverse.ravel()]
+        return result
+
+    def compute(self, today_ordinal):
+        """Aggregate the table, with numpy when it is available"""
+        numpy = get_numpy()
+        if numpy is not None:
+            return self.compute_with_numpy(numpy, today_ordinal)
+        return self.compute_with_arrays(today_ordinal)
+
+    def get_day_range(self, today_ordinal):
+        """First day of the week of the oldest date, and today"""
+        dates = [ordinal for ordinal in (min((o for o in self.created if o), default=0),
+                                         min((o for o in self.completed if o), default=0)) if ordinal]
+        first_day = min(dates, default=today_ordinal)
+        first_day = min(first_day, today_ordinal)
+        return first_day - (first_day - 1) % 7, today_ordinal
+
+    def make_results(self, cycle_counts, cycle_sums, histogram, throughput, wip, first_day):
+        cycle_times = []
+        for code, count in enumerate(cycle_counts):
+            if count:
+                name = self.project_names[code] if code < len(self.project_names) else '(no project)'
+                cycle_times.append((name, int(count), float(cycle_sums[code]) / count))
+        cycle_times.sort(key=lambda entry: -entry[1])
+
+        labels = []
+        for i, bucket in enumerate(self.CYCLE_TIME_BUCKETS):
+            if i + 1 < len(self.CYCLE_TIME_BUCKETS):
+                last = self.CYCLE_TIME_BUCKETS[i + 1] - 1
+                labels.append(f"{bucket} days" if last == bucket else f"{bucket}-{last} days")
+            else:
+                labels.append(f"{bucket}+ days")
+
+        weeks = []
+        total = 0
+        for week, count in enumerate(throughput):
+            total += count
+            if week >= self.ROLLING_WEEKS:
+                total -= throughput[week - self.ROLLING_WEEKS]
+            weeks.append((first_day + 7 * week, int(count), total / self.ROLLING_WEEKS, int(wip[week])))
+
+        return {
+            'tasks': len(self),
+            'done': sum(self.done),
+            'cycle_times': cycle_times,
+            'cycle_time_histogram': list(zip(labels, (int(count) for count in histogram))),
+            'weeks': weeks,
+        }
+
+    def compute_with_numpy(self, numpy, today_ordinal):
+        created = numpy.frombuffer(self.created, dtype=numpy.int64)
+        completed = numpy.frombuffer(self.completed, dtype=numpy.int64)
+        done = numpy.frombuffer(self.done, dtype=numpy.int8).astype(bool)
+        project = numpy.frombuffer(self.project, dtype=numpy.int64)
+        first_day, last_day = self.get_day_range(today_ordinal)
+        days_number = last_day - first_day + 1
+        weeks_number = (days_number + 6) // 7
+
+        # cycle time of the done tasks with both dates, the tasks without project get the last code
+        is_cycle = done & (created > 0) & (completed >= created)
+        durations = completed[is_cycle] - created[is_cycle]
+        codes = numpy.where(project[is_cycle] < 0, len(self.project_names), project[is_cycle])
+        cycle_counts = numpy.bincount(codes, minlength=len(self.project_names) + 1)
+        cycle_sums = numpy.bincount(codes, weights=durations, minlength=len(self.project_names) + 1)
+        buckets = numpy.searchsorted(numpy.array(self.CYCLE_TIME_BUCKETS), durations, side='right') - 1
+        histogram = numpy.bincount(buckets, minlength=len(self.CYCLE_TIME_BUCKETS))
+
+        # throughput: done tasks by week of completion
+        is_completed = done & (completed >= first_day) & (completed <= last_day)
+        throughput = numpy.bincount((completed[is_completed] - first_day) // 7, minlength=weeks_number)
+
+        # work in progress: +1 the day a task is created, -1 the day it is completed
+        is_started = (created >= first_day) & (created <= last_day) & (~done | (completed > 0))
+        ends = numpy.where(done, completed, last_day + 1)[is_started]
+        difference = numpy.zeros(days_number + 1, dtype=numpy.int64)
+        numpy.add.at(difference, created[is_started] - first_day, 1)
+        numpy.add.at(difference, numpy.clip(ends, first_day, last_day + 1) - first_day, -1)
+        wip_by_day = numpy.cumsum(difference)
+        week_ends = numpy.minimum(numpy.arange(weeks_number) * 7 + 6, days_number - 1)
+        wip = wip_by_day[week_ends]
+
+        return self.make_results(cycle_counts.tolist(), cycle_sums.tolist(), histogram.tolist(),
+                                 throughput.tolist(), wip.tolist(), first_day)
+
+    def compute_with_arrays(self, today_ordinal):
+        first_day, last_day = self.get_day_range(today_ordinal)
+        days_number = last_day - first_day + 1
+        weeks_number = (days_number + 6) // 7
+        no_project_code = len(self.project_names)
+
+        cycle_counts = array('q', bytes(8 * (no_project_code + 1)))
+        cycle_sums = array('q', bytes(8 * (no_project_code + 1)))
+        histogram = array('q', bytes(8 * len(self.CYCLE_TIME_BUCKETS)))
+        throughput = array('q', bytes(8 * weeks_number))
+        difference = array('q', bytes(8 * (days_number + 1)))
+        buckets = self.CYCLE_TIME_BUCKETS
+
+        # the tasks are first counted by distinct values, in C, there are
+        # much fewer of them than tasks: the loops below run on those counts
+        durations = map(operator.sub, self.completed, self.created)
+        cycles = collections.Counter(itertools.compress(zip(self.project, durations, map(bool, self.created)), self.done))
+        for (project, duration, has_created), count in cycles.items():
+            if has_created and duration >= 0:
+                code = no_project_code if project < 0 else project
+                cycle_counts[code] += count
+                cycle_sums[code] += duration * count
+                histogram[bisect.bisect_right(buckets, duration) - 1] += count
+
+        rows = collections.Counter(zip(self.created, self.completed, self.done))
+        for (created, completed, is_done), count in rows.items():
+            if is_done and first_day <= completed <= last_day:
+                throughput[(completed - first_day) // 7] += count
+            if first_day <= created <= last_day and (not is_done or completed):
+                end = completed if is_done else last_day + 1
+                difference[created - first_day] += count
+                difference[min(max(end, first_day), last_day + 1) - first_day] -= count
+
+        wip = []
+        running = 0
+        wip_by_day = array('q', bytes(8 * days_number))
+        for day in range(days_number):
+            running += difference[day]
+            wip_by_day[day] = running
+        for week in range(weeks_number):
+            wip.append(wip_by_day[min(week * 7 + 6, days_number - 1)])
+
+        return self.make_results(cycle_counts, cycle_sums, histogram, throughput, wip, first_day)
+
+
+class Profiler:
+    """Times the board refreshes. An action (a reload, a filter...) is split in
+    phases with lap(), and counters can be attached to it with count(). Each
+    finished action is appended as a json line to the log file, and the next
+    one can optionally be recorded with cProfile."""
+
+    def __init__(self, log_path, enabled=False):
+        self.log_path = log_path
+        self.enabled = enabled
+        # record the next action with cProfile
+        self.capture_next = False
+        # action being measured, None outside of an action
+        self.record = None
+        self.last_record = None
+        # called with each finished record
+        self.on_record = None
+        # error of the last write in the log, reported by the caller
+        self.log_error = None
+        self.phase_name = None
+        self.phase_start = 0
+
+    @contextlib.contextmanager
+    def action(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        if self.record is not None:
+            # nested action: its phases belong to the outer one
+            try:
+                yield
+            finally:
+                self.lap(None)
+            return
+
+        record = {
+            'action': name,
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'phases': {},
+            'counts': {},
+        }
+        self.record = record
+
+        profile = None
+        if self.capture_next:
+            self.capture_next = False
+            import cProfile
+            profile = cProfile.Profile()
+            profile.enable()
+
+        start = time.perf_counter()
+        self.phase_name = None
+        self.phase_start = start
+        try:
+            yield
+        finally:
+            self.lap(None)
+            if profile is not None:
+                profile.disable()
+            record['total_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            self.record = None
+
+            if profile is not None:
+                stats_path = os.path.splitext(self.log_path)[0] + datetime.now().strftime('-%Y%m%d-%H%M%S.prof')
+                try:
+                    profile.dump_stats(stats_path)
+                    record['cprofile'] = stats_path
+                except OSError as error:
+                    self.log_error = error
+
+            self.last_record = record
+            self.write(record)
+            if self.on_record is not None:
+                self.on_record(record)
+
+    def lap(self, name):
+        """End the current phase and start the one called name, if any"""
+        if self.record is None:
+            return
+        now = time.perf_counter()
+        if self.phase_name is not None:
+            phases = self.record['phases']
+            elapsed = (now - self.phase_start) * 1000
+            phases[self.phase_name] = round(phases.get(self.phase_name, 0) + elapsed, 2)
+        self.phase_name = name
+        self.phase_start = now
+
+    def count(self, name, number=1):
+        if self.record is not None:
+            counts = self.record['counts']
+            counts[name] = counts.get(name, 0) + number
+
+    def is_recording(self):
+        return self.record is not None
+
+    def write(self, record):
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+            with open(self.log_path, "a") as log_file:
+                log_file.write(json.dumps(record) + "\n")
+        except OSError as error:
+            self.log_error = error
+
+
+def format_size(size):
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024 or unit == 'MiB':
+            break
+        size /= 1024
+    return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+
+
+class Diagnostics:
+    """Snapshots of the live Tk widgets, named fonts and python allocations
+    of the application, to check that they stay flat across reloads and theme
+    switches. tracemalloc is only started by the first snapshot, since it slows
+    down everything."""
+
+    TOP_ALLOCATIONS = 10
+
+    def __init__(self):
+        self.last_snapshot = None
+
+    def count_widget_classes(self, widget, counter):
+        counter[widget.winfo_class()] += 1
+        for child in widget.winfo_children():
+            self.count_widget_classes(child, counter)
+
+    def take_snapshot(self, root, tasks_number):
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        widgets = collections.Counter()
+        self.count_widget_classes(root, widgets)
+        memory, peak = tracemalloc.get_traced_memory()
+        traces = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+        return {
+            'tasks': tasks_number,
+            'widgets': widgets,
+            'fonts': len(tkFont.names(root)),
+            'memory': memory,
+            'peak': peak,
+            'traces': traces,
+        }
+
+    def report(self, snapshot):
+        lines = [f"Tasks: {snapshot['tasks']}"]
+        lines.append(f"Widgets: {sum(snapshot['widgets'].values())}")
+        for widget_class, number in snapshot['widgets'].most_common():
+            lines.append(f"    {widget_class}: {number}")
+        lines.append(f"Named fonts: {snapshot['fonts']}")
+        lines.append(f"Traced memory: {format_size(snapshot['memory'])} (peak {format_size(snapshot['peak'])})")
+        if snapshot['tasks'] > 0:
+            lines.append(f"Traced memory per task: {format_size(snapshot['memory'] // snapshot['tasks'])}")
+        return "\n".join(lines)
+
+    def diff_report(self, snapshot, previous):
+        widgets = snapshot['widgets'] - previous['widgets']
+        widgets.subtract(previous['widgets'] - snapshot['widgets'])
+        lines = [f"Tasks: {snapshot['tasks'] - previous['tasks']:+}"]
+        lines.append(f"Widgets: {sum(snapshot['widgets'].values()) - sum(previous['widgets'].values()):+}")
+        for widget_class, number in widgets.most_common():
+            lines.append(f"    {widget_class}: {number:+}")
+        lines.append(f"Named fonts: {snapshot['fonts'] - previous['fonts']:+}")
+        memory = snapshot['memory'] - previous['memory']
+        lines.append(f"Traced memory: {'+' if memory >= 0 else '-'}{format_size(abs(memory))}")
+        lines.append("Top allocation changes:")
+        for stat in snapshot['traces'].compare_to(previous['traces'], 'lineno')[:self.TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            size = f"{'+' if stat.size_diff >= 0 else '-'}{format_size(abs(stat.size_diff))}"
+            lines.append(f"    {frame.filename}:{frame.lineno}: {size} ({stat.count_diff:+} blocks)")
+        return "\n".join(lines)
+
+
+def profiled(action_name):
+    """Measure a KanbanTxtViewer method as an action of its profiler"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.profiler.action(action_name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class EditTransaction:
+    """Line edits of the text editor of a KanbanTxtViewer, applied all at once
+    on commit as a single undo step, followed by one refresh of the kanban and
+    one save (unless reload is False). Line numbers start at 1 and are the ones
+    of the text when the transaction began. Used as a context manager, it is
+    committed at the end of the block unless an exception was raised."""
+
+    def __init__(self, viewer, reload=True):
+        self.viewer = viewer
+        self.reload = reload
+        self.replaced_lines = {}
+        self.deleted_lines = set()
+        # line number: texts to insert before it, in order
+        self.inserted_lines = {}
+        self.appended_lines = []
+        self.committed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+
+    def get_line(self, line):
+        """Text of a line, with the replacement made in this transaction if any"""
+        if line in self.replaced_lines:
+            return self.replaced_lines[line]
+        return self.viewer.text_editor.get(f"{line}.0", f"{line}.end")
+
+    def get_lines_number(self):
+        return int(self.viewer.text_editor.index('end-1c').split('.')[0])
+
+    def replace_line(self, line, text):
+        self.replaced_lines[line] = text
+
+    def insert_line(self, line, text):
+        """Insert a new line before the given one"""
+        if line > self.get_lines_number():
+            self.append_line(text)
+        else:
+            self.inserted_lines.setdefault(line, []).append(text)
+
+    def delete_line(self, line):
+        self.deleted_lines.add(line)
+
+    def append_line(self, text):
+        self.appended_lines.append(text)
+
+    def is_empty(self):
+        return not (self.replaced_lines or self.deleted_lines or self.inserted_lines or self.appended_lines)
+
+    def commit(self):
+        if self.committed:
+            return
+        self.committed = True
+        if self.is_empty():
+            return
+
+        editor = self.viewer.text_editor
+        editor.configure(autoseparators=False)
+        editor.edit_separator()
+        try:
+            if self.appended_lines:
+                text = '\n'.join(self.appended_lines)
+                if editor.get('1.0', 'end-1c') != '' and editor.get('end-2c', 'end-1c') != '\n':
+                    text = '\n' + text
+                editor.insert('end-1c', text)
+
+            # from the bottom, so that the edits don't shift the lines left to edit
+            last_line = self.get_lines_number()
+            lines = set(self.replaced_lines) | self.deleted_lines | set(self.inserted_lines)
+            for line in sorted(lines, reverse=True):
+                if line in self.deleted_lines:
+                    if line == last_line and line > 1:
+                        editor.delete(f"{line - 1}.end", f"{line}.end")
+                    else:
+                        editor.delete(f"{line}.0", f"{line}.end + 1c")
+                elif line in self.replaced_lines:
+                    text = self.replaced_lines[line]
+                    if text != editor.get(f"{line}.0", f"{line}.end"):
+                        # keep the tags of the line, like the selection of tasks
+                        tags = tuple(tag for tag in editor.tag_names(f"{line}.0")
+                                     if tag != tk.SEL and not tag.startswith(EditorHighlighter.TAG_PREFIX))
+                        editor.delete(f"{line}.0", f"{line}.end")
+                        editor.insert(f"{line}.0", text, tags)
+                for text in reversed(self.inserted_lines.get(line, [])):
+                    editor.insert(f"{line}.0", text + '\n')
+        finally:
+            editor.edit_separator()
+            editor.configure(autoseparators=True)
+
+        if self.reload:
+            self.viewer.refresh_after_edit(self)
+
+
+class EditorHighlighter:
+    """Colors the elements of the task lines in a text widget. The inserts
+    and deletes of the widget are intercepted to tag the lines they change
+    as dirty, and only the dirty lines are tokenized again, some lines at a
+    time between the events so that a large file doesn't freeze the editor.
+    The tags move with the text, so the lines left to color don't need to be
+    renumbered as the text is edited."""
+
+    TAG_PREFIX = 'syntax-'
+    DIRTY_TAG = TAG_PREFIX + 'dirty'
+    TAGS = {kind: 'syntax-' + kind for kind in TASK_TOKEN_KINDS}
+    # lines colored before giving the hand back to the event loop
+    CHUNK_LINES = 500
+
+    def __init__(self, text_widget):
+        from idlelib.redirector import WidgetRedirector
+        self.text = text_widget
+        self.redirector = WidgetRedirector(text_widget)
+        self.original_insert = self.redirector.register('insert', self.on_insert)
+        self.original_delete = self.redirector.register('delete', self.on_delete)
+        self.original_edit = self.redirector.register('edit', self.on_edit)
+        self.after_id = None
+
+    def configure_tags(self, colors):
+        """colors: the foreground color of each kind of token"""
+        for kind, tag in self.TAGS.items():
+            self.text.tag_configure(tag, foreground=colors[kind])
+            self.text.tag_lower(tag)
+
+    def on_insert(self, index, chars, *args):
+        line = int(self.text.index(index).split('.')[0])
+        self.original_insert(index, chars, *args)
+        self.mark_dirty(line, line + chars.count('\n'))
+
+    def on_delete(self, index1, index2=None):
+        line = int(self.text.index(index1).split('.')[0])
+        self.original_delete(index1, index2)
+        self.mark_dirty(line, line)
+
+    def on_edit(self, *args):
+        result = self.original_edit(*args)
+        if args and args[0] in ('undo', 'redo'):
+            # the lines changed by an undo are not known
+            self.mark_dirty(1, int(self.text.index('end-1c').split('.')[0]))
+        return result
+
+    def mark_dirty(self, first_line, last_line):
+        self.text.tag_add(self.DIRTY_TAG, f"{first_line}.0", f"{last_line}.0 lineend +1c")
+        if self.after_id is None:
+            self.after_id = self.text.after_idle(self.color_dirty_lines)
+
+    def color_dirty_lines(self):
+        """Color the next dirty lines, and come back later for the others"""
+        self.after_id = None
+        dirty_range = self.text.tag_nextrange(self.DIRTY_TAG, '1.0')
+        if not dirty_range:
+            return
+        first_line = int(dirty_range[0].split('.')[0])
+        last_line = min(int(self.text.index(f"{dirty_range[1]} -1c").split('.')[0]), first_line + self.CHUNK_LINES - 1)
+        start, end = f"{first_line}.0", f"{last_line}.0 lineend +1c"
+        self.text.tag_remove(self.DIRTY_TAG, start, end)
+        for tag in self.TAGS.values():
+            self.text.tag_remove(tag, start, end)
+
+        # one call by tag with all its ranges
+        ranges = {kind: [] for kind in self.TAGS}
+        lines = self.text.get(start, f"{last_line}.0 lineend").split('\n')
+        for line, task_txt in enumerate(lines, first_line):
+            if task_txt:
+                for kind, token_start, token_end in tokenize_task_line(task_txt):
+                    ranges[kind] += (f"{line}.{token_start}", f"{line}.{token_end}")
+        for kind, indexes in ranges.items():
+            if indexes:
+                self.text.tag_add(self.TAGS[kind], *indexes)
+
+        self.after_id = self.text.after(1, self.color_dirty_lines)
+
+
+class LazyTooltip:
+    """Tooltip of a widget, the idlelib Hovertip showing it is only created
+    when the mouse first enters the widget"""
+
+    def __init__(self, widget, text):
+        """text can be a function returning the text, called each time the
+        tooltip shows"""
+        self.widget = widget
+        self._text = text
+        self.hovertip = None
+        self.enter_binding = widget.bind('<Enter>', self.on_first_enter, add='+')
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        self._text = text
+        if self.hovertip is not None:
+            self.hovertip.text = text
+
+    def on_first_enter(self, event=None):
+        from idlelib.tooltip import Hovertip
+        self.widget.unbind('<Enter>', self.enter_binding)
+        if callable(self._text):
+            self.hovertip = Hovertip(self.widget, self._text())
+            self.hovertip.showcontents = self.show_current_text
+        else:
+            self.hovertip = Hovertip(self.widget, self._text)
+        self.hovertip.schedule()
+
+    def show_current_text(self):
+        self.hovertip.text = self._text()
+        type(self.hovertip).showcontents(self.hovertip)
+
+
+@functools.lru_cache(maxsize=None)
+def get_customize_view_dialog_class():
+    """Build the dialog class on its first use, to only import simpledialog then"""
+    from tkinter import simpledialog
+    return type('CustomizeViewDialog', (CustomizeViewDialogContent, simpledialog.Dialog), {})
+
+
+class CustomizeViewDialogContent:
+    """Content of the customize view dialog, see get_customize_view_dialog_class"""
+
     def __init__(self, parent, title,
                  out_show_project,
                  out_show_context,
@@ -140,6 +1947,7 @@ class CustomizeViewDialog(simpledialog.Dialog):
                  out_show_date,
                  out_show_content,
                  out_sort_method,
+                 out_custom_sort,
                  out_col0_name,
                  out_col1_name,
                  out_col2_name,
@@ -153,6 +1961,10 @@ class CustomizeViewDialog(simpledialog.Dialog):
                  out_hide_buttons_assign_priority,
                  out_hide_buttons_move_to_column,
                  out_hide_buttons_move_line_up_down,
+                 out_stable_ids,
+                 out_windowed_editor,
+                 out_card_limits,
+                 out_swimlanes,
                  ):
         self.show_project = out_show_project
         self.show_context = out_show_context
@@ -162,6 +1974,7 @@ class CustomizeViewDialog(simpledialog.Dialog):
         self.show_date = out_show_date
         self.show_content = out_show_content
         self.sort_method = out_sort_method
+        self.custom_sort = out_custom_sort
         self.ask_for_add = out_ask_for_add
         self.ask_for_delete = out_ask_for_delete
         self.col_names = [
@@ -177,21 +1990,28 @@ class CustomizeViewDialog(simpledialog.Dialog):
         self.hide_buttons_assign_priority = out_hide_buttons_assign_priority
         self.hide_buttons_move_to_column = out_hide_buttons_move_to_column
         self.hide_buttons_move_line_up_down = out_hide_buttons_move_line_up_down
+        self.stable_ids = out_stable_ids
+        self.windowed_editor = out_windowed_editor
+        self.card_limits = out_card_limits
+        self.swimlanes = out_swimlanes
         super().__init__(parent, title)
 
+    # text of the empty choices of the custom sort
+    NO_SORT_CRITERION = "-"
+
     def create_checkbox(self, text, tooltip, variable, frame):
         checkbox = tk.Checkbutton(frame, text=text, variable=variable)
-        Hovertip(checkbox, tooltip)
+        LazyTooltip(checkbox, tooltip)
         checkbox.pack(anchor=tk.W)
 
     def create_radiobuttion(self, text, tooltip, variable, value, frame):
         radiobutton = tk.Radiobutton(frame, text=text, variable=variable, value=value)
-        Hovertip(radiobutton, tooltip)
+        LazyTooltip(radiobutton, tooltip)
         radiobutton.pack(anchor=tk.W)
 
     def create_text_entry(self, tooltip, variable, frame, col, row):
         entry = tk.Entry(frame, textvariable=variable)
-        Hovertip(entry, tooltip)
+        LazyTooltip(entry, tooltip)
         entry.grid(row=row, column=col, padx=10, pady=10, sticky=tk.NW)
 
     def body(self, frame):
@@ -210,9 +2030,33 @@ class CustomizeViewDialog(simpledialog.Dialog):
         first_column_frame.grid(row=row, column=0, padx=10, pady=10, sticky=tk.NW)
         frame_sorting = tk.LabelFrame(first_column_frame, text="Sort tasks in columns by: ")
         frame_sorting.pack()
+
+        frame_card_limits = tk.LabelFrame(first_column_frame, text="Cards shown per column: ")
+        frame_card_limits.pack(fill='x', pady=10)
+        for i, v in enumerate(self.card_limits):
+            tk.Label(frame_card_limits, textvariable=self.col_names[i]).grid(row=i, column=0, padx=10, sticky=tk.W)
+            limit_spinbox = tk.Spinbox(frame_card_limits, from_=0, to=100000, increment=50, width=7, textvariable=v)
+            LazyTooltip(limit_spinbox, "Number of cards shown before the 'Show more' button, 0 to show all the cards.")
+            limit_spinbox.grid(row=i, column=1, padx=10, pady=2, sticky=tk.W)
         for i in range(len(SORT_METHODS)):
             m = SORT_METHODS[i]
             self.create_radiobuttion(m['text'], m['tooltip'], self.sort_method, i, frame_sorting)
+        self.create_radiobuttion("Custom:", "Tasks are ordered by the first criterion below, then by the next ones when it is equal,\n"
+                                 "and lastly by their order in the txt file.\n"
+                                 "Tasks missing a criterion, like a priority, are put after the others.",
+                                 self.sort_method, CUSTOM_SORT_METHOD, frame_sorting)
+        frame_custom_sort = tk.Frame(frame_sorting)
+        frame_custom_sort.pack(anchor=tk.W, padx=(20, 0))
+        criteria_texts = [self.NO_SORT_CRITERION] + [criterion['text'] for criterion in SORT_CRITERIA.values()]
+        for i, (criterion_var, descending_var) in enumerate(self.custom_sort):
+            tk.OptionMenu(frame_custom_sort, criterion_var, *criteria_texts).grid(row=i, column=0, sticky=tk.EW)
+            tk.Checkbutton(frame_custom_sort, text="Descending", variable=descending_var).grid(row=i, column=1, sticky=tk.W)
+
+        frame_swimlanes = tk.LabelFrame(first_column_frame, text="Swimlanes: ")
+        frame_swimlanes.pack(fill='x')
+        self.create_radiobuttion("None", "Show the tasks in the columns only.", self.swimlanes, '', frame_swimlanes)
+        self.create_radiobuttion("Project", "Show a row of the columns for each project, by the first project of the tasks.", self.swimlanes, 'project', frame_swimlanes)
+        self.create_radiobuttion("Context", "Show a row of the columns for each context, by the first context of the tasks.", self.swimlanes, 'context', frame_swimlanes)
 
         second_column_frame = tk.Frame(grid_frame)
         second_column_frame.grid(row=row, column=1, padx=10, pady=10, sticky=tk.NW)
@@ -231,6 +2075,17 @@ class CustomizeViewDialog(simpledialog.Dialog):
         fontsize_spinbox = tk.Spinbox(frame_fontsize, from_=4, to=100, textvariable=self.font_size, wrap=True)
         fontsize_spinbox.pack(anchor=tk.W, padx=10, pady=10, fill='x')
 
+        frame_task_ids = tk.LabelFrame(second_column_frame, text="Task IDs: ")
+        frame_task_ids.pack(fill='x')
+        self.create_checkbox("Stable IDs", "Identify the tasks by their id: value, or a hash of their text, instead of their line.\n"
+                             "Adding or removing lines doesn't change the IDs of the other tasks.", self.stable_ids, frame_task_ids)
+
+        frame_large_files = tk.LabelFrame(second_column_frame, text="Large files: ")
+        frame_large_files.pack(fill='x', pady=(10, 0))
+        self.create_checkbox("Windowed editor", "With very large files, only put some thousands of lines around the cursor in the editor,\n"
+                             "the next ones being loaded when scrolling to the top or bottom of the editor.\n"
+                             "The kanban still shows all the tasks.", self.windowed_editor, frame_large_files)
+
         third_column_frame = tk.Frame(grid_frame)
         third_column_frame.grid(row=row, column=2, padx=10, pady=10, sticky=tk.NW)
 
@@ -361,15 +2216,37 @@ class KanbanTxtViewer:
         },
     }
 
-    FONTS = []
-	# gwyrdh edit to minimal text
-    KANBAN_KEY = "k"
-
-    KANBAN_VAL_IN_PROGRESS = "do"
-
-    KANBAN_VAL_VALIDATION = "wt"
-
-    CONFIG_PATH = 'config.json'
+    LIGHT_THEME = 'LIGHT_COLORS'
+    DARK_THEME = 'DARK_COLORS'
+
+    DROP_AREAS_FRAME_BORDER = 4
+
+    # elements of a task card, in display order, and the attribute telling whether they are shown
+    CARD_FIELDS = ['priority', 'content', 'date', 'project', 'context', 'special_kv_data', 'index']
+    CARD_FIELDS_VISIBILITY = {
+        'priority': 'show_priority',
+        'content': 'show_content',
+        'date': 'show_date',
+        'project': 'show_project',
+        'context': 'show_context',
+        'special_kv_data': 'show_special_kv_data',
+        'index': 'show_index',
+    }
+    # modifier bits of event.state
+    EVENT_STATE_SHIFT = 0x0001
+    EVENT_STATE_CONTROL = 0x0004
+    # Tk accepts both spellings, the theme registry keeps the short one
+    COLOR_OPTION_ALIASES = {'background': 'bg', 'foreground': 'fg'}
+    CARD_PACK_OPTIONS = {'padx': 0, 'pady': (0, 1), 'side': "top", 'fill': 'x', 'expand': 1, 'anchor': tk.NW}
+    KANBAN_KEY = KANBAN_KEY
+    KANBAN_VAL_IN_PROGRESS = KANBAN_VAL_IN_PROGRESS
+    KANBAN_VAL_VALIDATION = KANBAN_VAL_VALIDATION
+
+    CONFIG_PATH = os.path.join(get_user_config_dir(), 'config.json')
+    # the config used to be stored in the working directory
+    LEGACY_CONFIG_PATH = 'config.json'
+    PROFILE_LOG_PATH = os.path.join(get_user_config_dir(), 'profile.jsonl')
+    PARSE_CACHE_DIR = os.path.join(get_user_cache_dir(), 'parsed')
     CONFIG_KEY_FONT_SIZE = 'card_font_size'
     CONFIG_KEY_HIDE_PROJECT = 'card_hide_project'
     CONFIG_KEY_HIDE_CONTEXT = 'card_hide_context'
@@ -388,10 +2265,17 @@ class KanbanTxtViewer:
     CONFIG_KEY_HIDE_BUTTON_ADD_DATE = 'hide_button_add_date'
     CONFIG_KEY_HIDE_BUTTON_DELETE = 'hide_button_delete'
     CONFIG_KEY_DARKMODE = 'darkmode'
+    CONFIG_KEY_THEME = 'theme'
     CONFIG_KEY_COL_0_NAME = 'column_0'
     CONFIG_KEY_COL_1_NAME = 'column_1'
     CONFIG_KEY_COL_2_NAME = 'column_2'
     CONFIG_KEY_COL_3_NAME = 'column_3'
+    CONFIG_KEY_STABLE_IDS = 'stable_task_ids'
+    CONFIG_KEY_COLUMN_CARD_LIMITS = 'column_card_limits'
+    CONFIG_KEY_COLLAPSED_COLUMNS = 'collapsed_columns'
+    CONFIG_KEY_SWIMLANES = 'swimlanes'
+    CONFIG_KEY_CUSTOM_SORT = 'custom_sort'
+    CONFIG_KEY_WINDOWED_EDITOR = 'windowed_editor'
 
     CONFIG_DEFAULTS = {
         CONFIG_KEY_ASK_FOR_ADD: True,
@@ -406,6 +2290,7 @@ class KanbanTxtViewer:
         CONFIG_KEY_HIDE_SUBJECT: False,
         CONFIG_KEY_SORT_METHOD: 0,
         CONFIG_KEY_DARKMODE: False,
+        CONFIG_KEY_THEME: 'LIGHT_COLORS',
         CONFIG_KEY_HIDE_BUTTON_ADD_DATE: False,
         CONFIG_KEY_HIDE_BUTTON_DELETE: False,
         CONFIG_KEY_HIDE_BUTTONS_ASSIGN_PRIORITY: False,
@@ -416,13 +2301,54 @@ class KanbanTxtViewer:
         CONFIG_KEY_COL_1_NAME: "In progress",
         CONFIG_KEY_COL_2_NAME: "Validation",
         CONFIG_KEY_COL_3_NAME: "Done",
+        CONFIG_KEY_STABLE_IDS: False,
+        CONFIG_KEY_COLUMN_CARD_LIMITS: [100, 100, 100, 100],
+        CONFIG_KEY_COLLAPSED_COLUMNS: [False, False, False, False],
+        CONFIG_KEY_SWIMLANES: '',
+        CONFIG_KEY_CUSTOM_SORT: [['priority', False], ['creation_date', False], ['project', False]],
+        CONFIG_KEY_WINDOWED_EDITOR: False,
     }
 
-    def __init__(self, file='', darkmode=None) -> None:
-        self.config = None
-        if os.path.exists(self.CONFIG_PATH):
-            with open(self.CONFIG_PATH, "r") as config_file:
-                self.config = json.load(config_file)
+    # in the windowed editor mode, texts of more lines only have a window of
+    # their lines in the editor, moved by pages when scrolling past its ends
+    WINDOWED_EDITOR_MIN_LINES = 20000
+    EDITOR_WINDOW_LINES = 4000
+    EDITOR_PAGE_LINES = 1000
+
+    # number of criteria of the custom sort in the customize view
+    CUSTOM_SORT_LENGTH = 4
+
+    # keys acting on the shown completions, that don't complete the word again
+    COMPLETION_KEYS = ('Up', 'Down', 'Tab', 'Return', 'Escape')
+    # length of the words before completing them
+    COMPLETION_MIN_LENGTH = 2
+
+    # color of each kind of element of the task lines in the editor
+    SYNTAX_COLOR_ROLES = {
+        'done': 'column3',
+        'priority': 'important',
+        'date': 'column1',
+        'kv': 'column0',
+        'project': 'project',
+        'context': 'context',
+    }
+
+    # number of swimlanes expanded when a file is opened, the others only show their title
+    EXPANDED_LANES_NUMBER = 3
+
+    def __init__(self, file='', darkmode=None, profile=False, profile_capture=False, startup_timing=False) -> None:
+        # (phase, time) of the startup, reported with --startup-timing
+        self.startup_marks = [] if startup_timing else None
+        self.mark_startup('imports')
+        self.config = ConfigStore(self.CONFIG_PATH, self.LEGACY_CONFIG_PATH)
+        self.profiler = Profiler(self.PROFILE_LOG_PATH, profile or profile_capture)
+        self.profiler.capture_next = profile_capture
+        self.profiler.on_record = self.show_profile_record
+        self.diagnostics = Diagnostics()
+        self.parse_cache = TaskParseCache(self.PARSE_CACHE_DIR)
+        self.file_writer = TodoFileWriter()
+        # file whose lines are in PREPARSED_TASKS
+        self.parse_cache_file = None
 
         self.COLUMN_0_NAME = self.get_value_from_config_or_default(self.CONFIG_KEY_COL_0_NAME)
         self.COLUMN_1_NAME = self.get_value_from_config_or_default(self.CONFIG_KEY_COL_1_NAME)
@@ -437,6 +2363,7 @@ class KanbanTxtViewer:
         ]
 
         self.card_font_size = self.get_value_from_config_or_default(self.CONFIG_KEY_FONT_SIZE)
+        self.zoom_delta = 0
 
         self.show_project = not self.get_value_from_config_or_default(self.CONFIG_KEY_HIDE_PROJECT)
         self.show_context = not self.get_value_from_config_or_default(self.CONFIG_KEY_HIDE_CONTEXT)
@@ -455,8 +2382,44 @@ class KanbanTxtViewer:
 
         self.ask_for_add = self.get_value_from_config_or_default(self.CONFIG_KEY_ASK_FOR_ADD)
         self.ask_for_delete = self.get_value_from_config_or_default(self.CONFIG_KEY_ASK_FOR_DELETE)
+        self.stable_ids = self.get_value_from_config_or_default(self.CONFIG_KEY_STABLE_IDS)
+        self.task_ids = TaskIdIndex()
+
+        self.windowed_editor = self.get_value_from_config_or_default(self.CONFIG_KEY_WINDOWED_EDITOR)
+        # all the lines of the text when the editor only holds a window of them, else None
+        self.document_lines = None
+        # index in document_lines of the first line of the editor, and number
+        # of lines of the document in the editor
+        self.editor_window_start = 0
+        self.editor_window_length = 0
+        self.editor_paging_id = None
 
         self.sort_method_idx = self.get_value_from_config_or_default(self.CONFIG_KEY_SORT_METHOD)
+        # [criterion name, descending] of the custom sort
+        self.custom_sort = [list(criterion) for criterion in self.get_value_from_config_or_default(self.CONFIG_KEY_CUSTOM_SORT)]
+        self.update_sort_key()
+
+        # maximum number of cards drawn in each column, 0 for no limit
+        self.column_card_limits = list(self.get_value_from_config_or_default(self.CONFIG_KEY_COLUMN_CARD_LIMITS))
+        # number of cards shown in a column, by column name, when more were asked with the show more button
+        self.shown_cards_numbers = {}
+        # collapsed columns draw no card, by column index
+        self.collapsed_columns = list(self.get_value_from_config_or_default(self.CONFIG_KEY_COLLAPSED_COLUMNS))
+        # 'project' or 'context' to show a row of columns by tag, '' for no swimlane
+        self.swimlanes = self.get_value_from_config_or_default(self.CONFIG_KEY_SWIMLANES)
+        self.grouping = GroupingIndex(self.swimlanes)
+        # lane: {'title': label, 'cells': {column name: frame}, or None when the lane is collapsed}
+        self.lane_widgets = {}
+        # lanes showing their cards, None until the lanes of the file are first drawn
+        self.expanded_lanes = None
+
+        # built from the board stats on the first completion after a reload
+        self.tag_trie = None
+        self.completion_popup = None
+        # word being completed, None when no completion is shown
+        self.completion_word = None
+        # whether a completion was picked with the arrows, then Return takes it
+        self.is_completion_chosen = False
 
         self.filter_view_message = None
         self.editor_warning_tooltip = None
@@ -469,15 +2432,28 @@ class KanbanTxtViewer:
         self.dragged_widgets = []
         self.drop_areas = []
         self.drop_areas_frame = None
+        self.drop_canvas = None
         self.drop_area_highlight = None
+        self.drop_area_highlighted = None
+        self.drop_areas_motion_binding = None
 
         if darkmode is None:
             darkmode = self.get_value_from_config_or_default(self.CONFIG_KEY_DARKMODE)
         self.darkmode = darkmode
 
+        self.theme_name = self.choose_theme_name(self.get_value_from_config_or_default(self.CONFIG_KEY_THEME), self.darkmode)
+        self.COLORS = self.THEMES[self.theme_name]
+
+        # widgets colored from the theme, by path: (widget, {option: color role})
+        self.themed_widgets = {}
+        self.themed_card_widgets = {}
+
         self.file = file
 
         self.current_date = date.today()
+        self.today_ordinal = self.current_date.toordinal()
+        self.date_index = TaskDateIndex()
+        self.board_stats = BoardStats()
 
         self.ui_columns = {}
         for col in self.COLUMNS_NAMES:
@@ -486,47 +2462,49 @@ class KanbanTxtViewer:
         self._after_id = -1
 
         self.selected_task_card = None
+        # editor line numbers of the tasks selected with shift/ctrl + click
+        self.selected_lines = set()
+        self.selection_anchor = None
+        self.cards = {}
+        self.column_cards = {}
 
         self.draw_ui(1000, 700, 0, 0)
 
     def draw_ui(self, window_width, window_height, window_x, window_y):
-        # Define theme
-        dark_option = 'LIGHT_COLORS'
-        if self.darkmode: 
-            dark_option = 'DARK_COLORS'
-
-        default_scheme = list(self.THEMES.keys())[0]
-        color_scheme = self.THEMES.get(dark_option, default_scheme)
-
-        self.COLORS = color_scheme
+        self.themed_widgets.clear()
+        self.themed_card_widgets.clear()
 
         # Create main window
         self.main_window = tk.Tk()
+        self.mark_startup('window')
         self.main_window.bind('<Button-1>', self.clear_drop_areas_frame)
-        self.main_window.bind('<Motion>', self.highlight_drop_area)
+        # the drop areas overlay belonged to the previous main window, if any
+        self.drop_areas_frame = None
+        self.drop_areas_motion_binding = None
         self.main_window.bind('<Control-f>', self.activate_search_input)
         self.main_window.bind('<Escape>', self.deactivate_search_input)
         self.main_window.bind('<Control-MouseWheel>', self.on_control_scroll)
         self.main_window.bind('<Alt-v>', self.on_customize_view_button)
+        self.main_window.bind('<Control-Alt-p>', self.toggle_profiling)
+        self.main_window.bind('<Control-Alt-P>', self.capture_next_reload)
+        self.main_window.bind('<Control-Alt-d>', self.open_diagnostics_panel)
+        self.main_window.bind('<Control-Alt-a>', self.open_analytics_panel)
+        # the diagnostics and analytics panels belonged to the previous main window, if any
+        self.diagnostics_panel = None
+        self.analytics_panel = None
 
         self.main_window.title('KanbanTxt')
         icon_path = pathlib.Path('icons8-kanban-64.png')
         if icon_path.exists():
             self.main_window.iconphoto(False, tk.PhotoImage(file=icon_path))
 
-        self.main_window['background'] = self.COLORS['main-background']
+        self.theme_widget(self.main_window, background='main-background')
         self.main_window['relief'] = 'flat'
 #        self.main_window.geometry("%dx%d+%d+%d" % (window_width, window_height, window_x, window_y))
         #Gwyrdh edit to open window set size - was opening small
         self.main_window.geometry('1700x900+1+1')
-        self.FONTS.append(tkFont.Font(name='main', font='Ubuntu',size=10))
-        self.FONTS.append(tkFont.Font(name='h2', font='Ubuntu',size=16))
-        self.FONTS.append(tkFont.Font(name='done-task', font='Ubuntu',size=10,overstrike=1))
-        #self.FONTS.append(tkFont.Font(name='h2', family='Ubuntu', size=14, weight=tkFont.NORMAL))
-        #self.FONTS.append(tkFont.Font(name='done-task', font='Ubuntu', size='10', overstrike=1))
-        #self.FONTS.append(tkFont.Font(name='main', font='Ubuntu', size=10, weight=tkFont.NORMAL))
-        #self.FONTS.append(tkFont.Font(name='h2', family='Ubuntu', size=14, weight=tkFont.NORMAL))
-        #self.FONTS.append(tkFont.Font(name='done-task', font='Ubuntu', size='10', overstrike=1))
+        self.create_fonts()
+        self.schedule_date_refresh()
 
         # Bind shortkey to open or save a new file
         self.main_window.bind('<Control-s>', self.reload_and_create_file)
@@ -538,11 +2516,40 @@ class KanbanTxtViewer:
 
        
         self.draw_editor_panel()
+        self.mark_startup('editor panel')
         self.draw_content_frame()
+        self.draw_profile_status()
+        self.mark_startup('board frame')
 
-        # Load the file provided in arguments if there is one
+        # Load the file provided in arguments if there is one, the cards are
+        # only drawn once the window and the text are displayed
+        self.board_pending = False
         if os.path.isfile(self.file):
-            self.load_txt_file()
+            self.load_txt_file(defer_board=True)
+            self.mark_startup('editor text')
+        self.main_window.after_idle(self.draw_board_after_first_paint)
+
+    def draw_board_after_first_paint(self):
+        self.main_window.update_idletasks()
+        self.mark_startup('first paint')
+        if self.board_pending:
+            self.board_pending = False
+            self.parse_todo_txt(self.get_document_text())
+            self.mark_startup('board')
+        if self.startup_marks is not None:
+            self.report_startup_timing()
+
+    def mark_startup(self, name):
+        if self.startup_marks is not None:
+            self.startup_marks.append((name, time.perf_counter()))
+
+    def report_startup_timing(self):
+        print(f"{'Startup phase':<16}{'ms':>8}{'total ms':>10}")
+        previous_time = STARTUP_TIME
+        for name, mark_time in self.startup_marks:
+            print(f"{name:<16}{(mark_time - previous_time) * 1000:8.1f}{(mark_time - STARTUP_TIME) * 1000:10.1f}")
+            previous_time = mark_time
+        self.startup_marks = None
        	# Gwyrdh added def for quit shortcut
     def quit(self, event=None):
         self.main_window.destroy()
@@ -555,20 +2562,73 @@ class KanbanTxtViewer:
     def deactivate_search_input(self, event):
         if self.filter is not None:
             self.clear_filter()
+        self.clear_task_selection()
         self.text_editor.focus()
 
     def get_cursor_pos(self):
         return self.main_window.winfo_pointerx(), self.main_window.winfo_pointery()
 
     def clear_drop_areas_frame(self, event=None):
-        if self.drop_areas_frame is not None:
-            self.drop_areas_frame.destroy()
-            self.drop_areas_frame = None
+        """Hide the drop areas overlay and stop tracking the mouse motion"""
+        if self.drop_areas_motion_binding is not None:
+            self.main_window.unbind('<Motion>', self.drop_areas_motion_binding)
+            self.drop_areas_motion_binding = None
+        if self.drop_areas_frame is not None and self.drop_areas_frame.winfo_ismapped():
+            self.drop_areas_frame.withdraw()
+        self.drop_area_highlighted = None
+
+    def get_drop_areas_frame(self):
+        """Return the drop areas overlay, creating it on the first drag only"""
+        if self.drop_areas_frame is None:
+            # use a Toplevel window, overridedirect and "-topmost" attribute to trick tkinter into
+            # displaying this window on top in a desired position
+            self.drop_areas_frame = tk.Toplevel(self.main_window, padx=0, pady=0, borderwidth=self.DROP_AREAS_FRAME_BORDER)
+            self.drop_areas_frame.withdraw()
+            self.drop_areas_frame.overrideredirect(True)
+            self.drop_areas_frame.wm_attributes("-topmost", True)
+
+            # canvas to paint drop areas onto
+            self.drop_canvas = tk.Canvas(self.drop_areas_frame, borderwidth=0, highlightthickness=0, bg="white")
+            self.drop_canvas.pack()
+        return self.drop_areas_frame
 
     def on_click(self, event):
-        self.drag_begin_cursor_pos = self.get_cursor_pos()
+        self.drag_begin_cursor_pos = (event.x_root, event.y_root)
+        if event.state & (self.EVENT_STATE_SHIFT | self.EVENT_STATE_CONTROL):
+            self.select_card(event)
+            return
+        self.clear_task_selection()
         self.highlight_task(event)
 
+    def select_card(self, event):
+        """Add a card to the selection (shift: all the cards between the last
+            selected one and this one in the column), or remove it (ctrl)"""
+        self.clear_drop_areas_frame()
+        line = self.show_document_line(self.get_card_frame_line(self.get_task_card_frame_widget(event.widget)))
+        self.sync_task_selection()
+        lines = set(self.selected_lines)
+        anchor_card = self.get_line_card(self.selection_anchor) if self.selection_anchor is not None else None
+        card = self.get_line_card(line)
+        if event.state & self.EVENT_STATE_SHIFT and anchor_card is not None and card is not None \
+                and anchor_card['state'] == card['state']:
+            column_cards = self.column_cards[card['state']]
+            first, last = sorted((column_cards.index(anchor_card), column_cards.index(card)))
+            for column_card in column_cards[first:last + 1]:
+                # with the windowed editor, only the tasks of the window can be selected
+                column_card_line = column_card['index'] + 1 - self.editor_window_start
+                if 0 < column_card_line <= int(self.text_editor.index('end-1c').split('.')[0]):
+                    lines.add(column_card_line)
+        elif line in lines:
+            lines.discard(line)
+        else:
+            lines.add(line)
+        self.selection_anchor = line
+        self.set_task_selection(lines)
+
+        self.text_editor.mark_set('insert', f"{line}.end")
+        self.text_editor.see('insert')
+        self.schedule_update_of_editor_line_colors()
+
     def on_drag_init(self, event):
         dragged_widget_name = event.widget.winfo_name()
         if dragged_widget_name in self.dragged_widgets:
@@ -578,18 +2638,20 @@ class KanbanTxtViewer:
         self.main_window.after(50, self.on_drag, event) # a little delay to give the UI time to refresh highlighted task card
 
     def highlight_drop_area(self, event):
-        if self.drop_areas_frame is None:
-            return
         if len(self.drop_areas) == 0:
             return
-        drop_canvas = self.drop_areas_frame.winfo_children()[0]
-        if self.drop_area_highlight is not None:
-            drop_canvas.delete(self.drop_area_highlight)
-            self.drop_area_highlight = None
 
-        drop_area = self.get_drop_area_from_cursor()
-        if drop_area is not None:
-            self.drop_area_highlight = drop_canvas.create_rectangle(drop_area['x1'], drop_area['y1'], drop_area['x2'], drop_area['y2'], fill="", outline='red', width=3)
+        drop_area = self.get_drop_area_from_cursor(event.x_root, event.y_root)
+        if drop_area is self.drop_area_highlighted:
+            return
+        self.drop_area_highlighted = drop_area
+
+        if drop_area is None:
+            self.drop_canvas.itemconfigure(self.drop_area_highlight, state='hidden')
+        else:
+            self.drop_canvas.coords(self.drop_area_highlight, drop_area['x1'], drop_area['y1'], drop_area['x2'], drop_area['y2'])
+            self.drop_canvas.itemconfigure(self.drop_area_highlight, state='normal')
+            self.drop_canvas.tag_raise(self.drop_area_highlight)
 
     def on_drag(self, event):
         event.widget.config(cursor="fleur")
@@ -602,7 +2664,6 @@ class KanbanTxtViewer:
         # properties of the parent window for drop areas
         # should appear above currently dragged task card, and it should not protrude beyond
         # the border of the main window
-        drop_areas_frame_border = 4
         drop_areas_title_text_pos_y = 10
         drop_areas_pos_x = drop_area_spacing
         drop_areas_pos_y = 2 * drop_areas_title_text_pos_y
@@ -669,42 +2730,50 @@ class KanbanTxtViewer:
         if drop_areas_frame_pos_x_offset >= 0:
             drop_areas_frame_pos_x -= drop_areas_frame_pos_x_offset + drop_area_spacing
 
-        # use a Toplevel window, overridedirect and "-topmost" attribute to trick tkinter into
-        # displaying this window on top in a desired position
-        self.drop_areas_frame = tk.Toplevel(self.main_window, padx=0, pady=0, background=self.COLORS['button'], borderwidth=drop_areas_frame_border)
-        self.drop_areas_frame.geometry(f"{drop_areas_frame_width}x{drop_area_height + drop_area_spacing + drop_areas_title_text_pos_y}+{drop_areas_frame_pos_x}+{drop_areas_frame_pos_y}")
-        self.drop_areas_frame.overrideredirect(True)
-        self.drop_areas_frame.wm_attributes("-topmost", True)
+        drop_areas_frame = self.get_drop_areas_frame()
+        drop_areas_frame.configure(background=self.COLORS['button'])
+        drop_areas_frame.geometry(f"{drop_areas_frame_width}x{drop_area_height + drop_area_spacing + drop_areas_title_text_pos_y}+{drop_areas_frame_pos_x}+{drop_areas_frame_pos_y}")
 
-        # canvas to paint drop areas onto
+        # repaint the drop areas on the reused canvas
         canvas_width = (drop_area_width + drop_area_spacing) * (len(self.drop_areas)) + drop_area_spacing
-        canvas = tk.Canvas(self.drop_areas_frame,
-                           borderwidth=0,
-                           bg="white",
-                           width=canvas_width)
-        canvas.pack()
+        canvas = self.drop_canvas
+        canvas.configure(width=canvas_width)
+        canvas.delete('all')
         for drop_area in self.drop_areas:
             canvas.create_rectangle(drop_area['x1'], drop_area['y1'], drop_area['x2'], drop_area['y2'], fill=drop_area['color'])
             canvas.create_text(drop_area['x1'] + drop_area_width / 2, drop_area['y1'] + drop_area_height / 2, text=drop_area['name'], fill='black')
         canvas.create_text(canvas_width / 2, drop_areas_title_text_pos_y, text=drop_areas_title, fill='black')
+        self.drop_area_highlight = canvas.create_rectangle(0, 0, 0, 0, fill="", outline='red', width=3, state='hidden')
+        self.drop_area_highlighted = None
+
+        drop_areas_frame.deiconify()
+        drop_areas_frame.lift()
+        drop_areas_frame.update_idletasks()
 
-    def is_cursor_in_box(self, box_x1, box_y1, box_x2, box_y2):
-        cursor_pos_x, cursor_pos_y = self.get_cursor_pos()
+        # the overlay does not move while dragging, so translate the drop areas to
+        # screen coordinates once instead of querying the canvas on every mouse move
+        canvas_offset_x = canvas.winfo_rootx()
+        canvas_offset_y = canvas.winfo_rooty()
+        for drop_area in self.drop_areas:
+            drop_area['screen_box'] = (
+                drop_area['x1'] + canvas_offset_x,
+                drop_area['y1'] + canvas_offset_y,
+                drop_area['x2'] + canvas_offset_x,
+                drop_area['y2'] + canvas_offset_y,
+            )
+
+        # only track the mouse while a drag is in progress
+        if self.drop_areas_motion_binding is None:
+            self.drop_areas_motion_binding = self.main_window.bind('<Motion>', self.highlight_drop_area, add='+')
+
+    def is_cursor_in_box(self, cursor_pos, box_x1, box_y1, box_x2, box_y2):
+        cursor_pos_x, cursor_pos_y = cursor_pos
         return box_x1 < cursor_pos_x < box_x2 and box_y1 < cursor_pos_y < box_y2
 
-    def get_drop_area_from_cursor(self):
-        if self.drop_areas_frame is not None and len(self.drop_areas) > 0:
-            drop_canvas = self.drop_areas_frame.winfo_children()[0]
-            for i in range(len(self.drop_areas)):
-                canvas_offset_x = drop_canvas.winfo_rootx()
-                canvas_offset_y = drop_canvas.winfo_rooty()
-
-                drop_top_left_x = self.drop_areas[i]['x1'] + canvas_offset_x
-                drop_top_left_y = self.drop_areas[i]['y1'] + canvas_offset_y
-                drop_bottom_right_x = self.drop_areas[i]['x2'] + canvas_offset_x
-                drop_bottom_right_y = self.drop_areas[i]['y2'] + canvas_offset_y
-                if self.is_cursor_in_box(drop_top_left_x, drop_top_left_y, drop_bottom_right_x, drop_bottom_right_y):
-                    return self.drop_areas[i]
+    def get_drop_area_from_cursor(self, cursor_x_pos, cursor_y_pos):
+        for drop_area in self.drop_areas:
+            if 'screen_box' in drop_area and self.is_cursor_in_box((cursor_x_pos, cursor_y_pos), *drop_area['screen_box']):
+                return drop_area
         return None
 
     def on_drop(self, event):
@@ -714,16 +2783,16 @@ class KanbanTxtViewer:
 
         self.dragged_widgets.remove(dragged_widget_name)
         event.widget.config(cursor="hand2")
-        if self.drop_areas_frame is None:
+        if self.drop_areas_frame is None or not self.drop_areas_frame.winfo_ismapped():
             return
 
-        drop_area = self.get_drop_area_from_cursor()
-        if drop_area is not None:
-            drop_area['functor']()
-
+        drop_area = self.get_drop_area_from_cursor(event.x_root, event.y_root)
         self.drop_areas.clear()
         self.clear_drop_areas_frame()
 
+        if drop_area is not None:
+            drop_area['functor']()
+
     def on_customize_view_button(self, event=None):
         show_project_var = tk.IntVar(value=self.show_project)
         show_context_var = tk.IntVar(value=self.show_context)
@@ -735,8 +2804,18 @@ class KanbanTxtViewer:
 
         ask_for_add_var = tk.IntVar(value=self.ask_for_add)
         ask_for_delete_var = tk.IntVar(value=self.ask_for_delete)
+        stable_ids_var = tk.IntVar(value=self.stable_ids)
+        windowed_editor_var = tk.IntVar(value=self.windowed_editor)
+        out_card_limits = [tk.StringVar(value=limit) for limit in self.column_card_limits]
+        out_swimlanes = tk.StringVar(value=self.swimlanes)
 
         out_sort_method = tk.StringVar(value=self.sort_method_idx)
+        CustomizeViewDialog = get_customize_view_dialog_class()
+        out_custom_sort = []
+        for i in range(self.CUSTOM_SORT_LENGTH):
+            name, descending = self.custom_sort[i] if i < len(self.custom_sort) else (None, False)
+            text = SORT_CRITERIA[name]['text'] if name in SORT_CRITERIA else CustomizeViewDialog.NO_SORT_CRITERION
+            out_custom_sort.append((tk.StringVar(value=text), tk.IntVar(value=descending)))
 
         out_fontsize = tk.StringVar(value=self.card_font_size)
 
@@ -762,6 +2841,7 @@ class KanbanTxtViewer:
                             out_show_special_kv_data=show_special_kv_data_var,
                             out_show_index=show_index,
                             out_sort_method=out_sort_method,
+                            out_custom_sort=out_custom_sort,
                             out_fontsize=out_fontsize,
                             out_col0_name=out_col0_name,
                             out_col1_name=out_col1_name,
@@ -775,8 +2855,23 @@ class KanbanTxtViewer:
                             out_hide_buttons_assign_priority=hide_buttons_assign_priority,
                             out_hide_buttons_move_to_column=hide_buttons_move_to_column,
                             out_hide_buttons_move_line_up_down=hide_buttons_move_line_up_down,
+                            out_stable_ids=stable_ids_var,
+                            out_windowed_editor=windowed_editor_var,
+                            out_card_limits=out_card_limits,
+                            out_swimlanes=out_swimlanes,
                             )
 
+        previous_card_fields_visibility = {}
+        for field, attribute in self.CARD_FIELDS_VISIBILITY.items():
+            previous_card_fields_visibility[field] = bool(getattr(self, attribute))
+        previous_sort_method_idx = self.sort_method_idx
+        previous_custom_sort = list(self.custom_sort)
+        previous_font_size = self.card_font_size
+        previous_stable_ids = bool(self.stable_ids)
+        previous_windowed_editor = bool(self.windowed_editor)
+        previous_column_card_limits = list(self.column_card_limits)
+        previous_swimlanes = self.swimlanes
+
         self.show_date = show_date_var.get()
         self.show_priority = show_priority_var.get()
         self.show_content = show_content_var.get()
@@ -787,8 +2882,20 @@ class KanbanTxtViewer:
 
         self.ask_for_delete = ask_for_delete_var.get()
         self.ask_for_add = ask_for_add_var.get()
+        self.stable_ids = stable_ids_var.get()
+        self.windowed_editor = windowed_editor_var.get()
 
         self.sort_method_idx = int(out_sort_method.get())
+        criteria_names = {criterion['text']: name for name, criterion in SORT_CRITERIA.items()}
+        self.custom_sort = [[criteria_names[criterion_var.get()], bool(descending_var.get())]
+                            for criterion_var, descending_var in out_custom_sort if criterion_var.get() in criteria_names]
+        self.swimlanes = out_swimlanes.get()
+
+        for i, limit_var in enumerate(out_card_limits):
+            try:
+                self.column_card_limits[i] = max(0, int(limit_var.get()))
+            except ValueError:
+                pass
 
         self.card_font_size = int(out_fontsize.get())
 
@@ -807,23 +2914,9 @@ class KanbanTxtViewer:
         ]
 
         are_new_column_names_unique = len(new_column_names) == len(set(new_column_names))
-        has_any_column_changed = False
         if are_new_column_names_unique:
-            for i, new_name in enumerate(new_column_names):
-                old_name = self.COLUMNS_NAMES[i]
-                if old_name != new_name:
-                    self.ui_columns[new_name] = self.ui_columns[old_name]
-                    del self.ui_columns[old_name]
-                    self.progress_bars[new_name] = self.progress_bars[old_name]
-                    del self.progress_bars[old_name]
-                    has_any_column_changed = True
-
-            if has_any_column_changed:
-                self.COLUMNS_NAMES = new_column_names
-                self.COLUMN_0_NAME = new_column_names[0]
-                self.COLUMN_1_NAME = new_column_names[1]
-                self.COLUMN_2_NAME = new_column_names[2]
-                self.COLUMN_3_NAME = new_column_names[3]
+            if new_column_names != self.COLUMNS_NAMES:
+                self.rename_columns(new_column_names)
                 self.store_in_config(self.CONFIG_KEY_COL_0_NAME, self.COLUMN_0_NAME)
                 self.store_in_config(self.CONFIG_KEY_COL_1_NAME, self.COLUMN_1_NAME)
                 self.store_in_config(self.CONFIG_KEY_COL_2_NAME, self.COLUMN_2_NAME)
@@ -839,8 +2932,13 @@ class KanbanTxtViewer:
 
         self.store_in_config(self.CONFIG_KEY_ASK_FOR_ADD, self.ask_for_add)
         self.store_in_config(self.CONFIG_KEY_ASK_FOR_DELETE, self.ask_for_delete)
+        self.store_in_config(self.CONFIG_KEY_STABLE_IDS, self.stable_ids)
+        self.store_in_config(self.CONFIG_KEY_WINDOWED_EDITOR, self.windowed_editor)
+        self.store_in_config(self.CONFIG_KEY_COLUMN_CARD_LIMITS, self.column_card_limits)
+        self.store_in_config(self.CONFIG_KEY_SWIMLANES, self.swimlanes)
 
         self.store_in_config(self.CONFIG_KEY_SORT_METHOD, self.sort_method_idx)
+        self.store_in_config(self.CONFIG_KEY_CUSTOM_SORT, self.custom_sort)
 
         self.store_in_config(self.CONFIG_KEY_FONT_SIZE, self.card_font_size)
 
@@ -853,49 +2951,170 @@ class KanbanTxtViewer:
             self.store_in_config(self.CONFIG_KEY_HIDE_BUTTONS_MOVE_TO_COLUMN, self.hide_buttons_move_to_column)
         ]
         has_any_editor_widget_changed = any(editor_widget_change_state)
-        if has_any_column_changed or has_any_editor_widget_changed:
-            self.recreate_main_window()
+        if has_any_editor_widget_changed:
+            self.update_memo_visibility()
+            self.update_editor_toolbar_visibility()
         self.save_config_file()
 
-        self.reload_ui_from_text()
+        # apply the changes to the board at the smallest possible scope
+        if self.card_font_size != previous_font_size:
+            self.update_card_fonts()
+
+        changed_card_fields = []
+        for field, attribute in self.CARD_FIELDS_VISIBILITY.items():
+            if bool(getattr(self, attribute)) != previous_card_fields_visibility[field]:
+                changed_card_fields.append(field)
+        if len(changed_card_fields) > 0:
+            self.relayout_cards(changed_card_fields)
+
+        if self.column_card_limits != previous_column_card_limits:
+            self.shown_cards_numbers = {}
+        is_sort_changed = self.sort_method_idx != previous_sort_method_idx or (
+            self.sort_method_idx == CUSTOM_SORT_METHOD and self.custom_sort != previous_custom_sort)
+        if is_sort_changed:
+            self.update_sort_key()
+        if is_sort_changed or self.column_card_limits != previous_column_card_limits:
+            self.sort_cards()
+
+        if bool(self.stable_ids) != previous_stable_ids or self.swimlanes != previous_swimlanes:
+            # the index labels of all the cards change, or all the cards move to other frames
+            self.task_ids = TaskIdIndex()
+            self.grouping = GroupingIndex(self.swimlanes)
+            self.expanded_lanes = None
+            self.reload_ui_from_text()
+        elif bool(self.windowed_editor) != previous_windowed_editor and self.filter is None:
+            self.clear_task_selection()
+            self.reload_ui_from_text()
+            self.text_editor.edit_reset()
+
+    @classmethod
+    def choose_theme_name(cls, theme_name, darkmode):
+        """The theme from the config is only used if it agrees with the requested mode"""
+        if theme_name not in cls.THEMES or (theme_name == cls.LIGHT_THEME) == bool(darkmode):
+            theme_name = cls.DARK_THEME if darkmode else cls.LIGHT_THEME
+        return theme_name
 
     def get_value_from_config_or_default(self, key):
-        value = None
-        if self.config is not None:
-            value = self.config.get(key)
+        value = self.config.get(key)
         if value is None:
             value = self.CONFIG_DEFAULTS[key]
         return value
 
     def store_in_config(self, key, value):
-        value_changed = True
-        if self.config is None:
-            self.config = {}
-        if self.config.get(key, None) == value:
-            value_changed = False
-        self.config[key] = value
-        return value_changed
+        return self.config.set(key, value)
 
     def save_config_file(self):
-        if self.config is None:
-            return
-        try:
-            with open(self.CONFIG_PATH, "w") as f:
-                json.dump(self.config, f, sort_keys=True, indent=4)
-        except Exception as error:
+        """Schedule the write of the config, changes made in the next moments
+            are written along"""
+        if self.config.error is not None:
+            self.config.error = None
             tk.messagebox.showwarning(title="Error writing config file", message=f"Can't save the file '{self.CONFIG_PATH}', make sure you have the right to write here!")
+        self.config.schedule_flush()
+
+    def create_fonts(self):
+        """Create the named fonts shared by the widgets. The sizes of the card
+            fonts follow the card font size, so zooming only reconfigures them"""
+        self.fonts = {
+            'main': tkFont.Font(name='main', font='Ubuntu', size=10),
+            'h2': tkFont.Font(name='h2', font='Ubuntu', size=16),
+            'done-task': tkFont.Font(name='done-task', font='Ubuntu', size=10, overstrike=1),
+            'card-priority': tkFont.Font(name='card-priority', family='Ubuntu', weight=tkFont.BOLD),
+            'card-tag': tkFont.Font(name='card-tag', family='Ubuntu'),
+            'card-small': tkFont.Font(name='card-small', family='Ubuntu'),
+        }
+        self.update_card_fonts()
+
+    def update_card_fonts(self):
+        self.fonts['card-priority'].configure(size=self.card_font_size + 8)
+        self.fonts['card-tag'].configure(size=self.card_font_size - 1)
+        self.fonts['card-small'].configure(size=self.card_font_size - 2)
+
+    def get_theme_color(self, role):
+        """Resolve a color role: a key of COLORS, a (key, index) pair for
+            color scales, a function computing the color from COLORS, or a
+            literal Tk color"""
+        if callable(role):
+            return role()
+        if isinstance(role, tuple):
+            key, index = role
+            return self.COLORS[key][index]
+        return self.COLORS.get(role, role)
+
+    def register_widget_colors(self, registry, widget, roles):
+        roles = {self.COLOR_OPTION_ALIASES.get(option, option): role for option, role in roles.items()}
+        path = str(widget)
+        if path in registry:
+            registry[path][1].update(roles)
+        else:
+            registry[path] = (widget, roles)
+        widget.configure(**{option: self.get_theme_color(role) for option, role in roles.items()})
+        return widget
+
+    def theme_widget(self, widget, **roles):
+        """Color a widget from the current theme and remember which roles it
+            uses, so a theme switch can restyle it in place"""
+        return self.register_widget_colors(self.themed_widgets, widget, roles)
+
+    def theme_card_widget(self, widget, **roles):
+        """Same as theme_widget, for the widgets of task cards, which are
+            forgotten as a whole when the cards are destroyed"""
+        return self.register_widget_colors(self.themed_card_widgets, widget, roles)
+
+    def get_widget_color_role(self, widget, option):
+        for registry in (self.themed_widgets, self.themed_card_widgets):
+            entry = registry.get(str(widget))
+            if entry is not None and option in entry[1]:
+                return entry[1][option]
+        return widget[option]
+
+    def configure_editor_tags(self):
+        self.text_editor.tag_configure('pair', background=self.COLORS['done-card-background'])
+        self.text_editor.tag_configure('current_pos', foreground='black', background=self.COLORS['project'], selectbackground=self.COLORS["column0"])
+        self.text_editor.tag_configure('insert', background='red')
+        self.text_editor.tag_configure('selected_task', foreground='black', background=self.COLORS['context'])
+        # the tasks selection and current line, set later, are drawn over these colors
+        self.editor_highlighter.configure_tags({kind: self.COLORS[role] for kind, role in self.SYNTAX_COLOR_ROLES.items()})
+
+    def apply_theme(self, theme_name):
+        """Restyle every themed widget in place with the colors of another theme"""
+        previous_colors = self.COLORS
+        self.theme_name = theme_name
+        self.COLORS = self.THEMES[theme_name]
+        self.darkmode = theme_name != self.LIGHT_THEME
+
+        changed_roles = set()
+        for key, color in self.COLORS.items():
+            if previous_colors.get(key) != color:
+                changed_roles.add(key)
+
+        for registry in (self.themed_widgets, self.themed_card_widgets):
+            for path, (widget, roles) in list(registry.items()):
+                options = {}
+                for option, role in roles.items():
+                    key = role[0] if isinstance(role, tuple) else role
+                    if callable(role) or key in changed_roles:
+                        options[option] = self.get_theme_color(role)
+                if len(options) == 0:
+                    continue
+                try:
+                    widget.configure(**options)
+                except tk.TclError:
+                    # the widget has been destroyed since it was registered
+                    del registry[path]
+
+        self.configure_editor_tags()
 
     def draw_editor_panel(self):
         self.widgets_for_disable_in_filter_mode.clear()
 
         # EDITION FRAME
-        edition_frame = tk.Frame(self.main_window, bg=self.COLORS['editor-background'], width=20)
+        edition_frame = self.theme_widget(tk.Frame(self.main_window, width=20), bg='editor-background')
         edition_frame.grid(row=0, column=0, sticky=tk.NSEW)
         self.main_window.grid_rowconfigure(0, weight=1)
         self.main_window.grid_columnconfigure(0, weight=1)
 
         # HEADER
-        editor_header = tk.Frame(edition_frame, bg=self.COLORS['editor-background'])
+        editor_header = self.theme_widget(tk.Frame(edition_frame), bg='editor-background')
         editor_header.pack(side='top', fill='both', expand=0, padx=10, pady=0)
 		# gwyrdh added buttons up down date and delete to save space
         load_button = self.create_button(
@@ -903,8 +3122,8 @@ class KanbanTxtViewer:
             text="🗁",
             # gwyrdh change from 2
             bordersize=1,
-            color=self.COLORS['button'],
-            activetextcolor=self.COLORS['main-background'],
+            color='button',
+            activetextcolor='main-background',
             command=self.open_file_dialog,
             tooltip="Open file",
             disable_in_filter_view=True
@@ -915,8 +3134,8 @@ class KanbanTxtViewer:
             editor_header,
             text="⟳",
             bordersize=1,
-            color=self.COLORS['button'],
-            activetextcolor=self.COLORS['main-background'],
+            color='button',
+            activetextcolor='main-background',
             command=self.reload_and_create_file,
             tooltip="Reload UI and save file"
         )
@@ -926,8 +3145,8 @@ class KanbanTxtViewer:
             editor_header,
             text="+ date",
             bordersize=1,
-            color=self.COLORS['button'],
-            activetextcolor=self.COLORS['main-background'],
+            color='button',
+            activetextcolor='main-background',
             command=self.add_date
         )
         date_button.pack(side="right", padx=(10,0), pady=10, anchor=tk.NE)
@@ -936,8 +3155,8 @@ class KanbanTxtViewer:
             editor_header,
             text="Delete",
             bordersize=1,
-            color=self.COLORS['button'],
-            activetextcolor=self.COLORS['main-background'],
+            color='button',
+            activetextcolor='main-background',
             command=self.remove_line
         )
         delete_button.pack(side="right", padx=(10,0), pady=10, anchor=tk.NE)
@@ -946,8 +3165,8 @@ class KanbanTxtViewer:
             editor_header,
             text="↑",
             bordersize=1,
-            color=self.COLORS['button'],
-            activetextcolor=self.COLORS['main-background'],
+            color='button',
+            activetextcolor='main-background',
             command=self.move_line_up
         )
         up_button.pack(side="right", padx=(10,0), pady=10, anchor=tk.NE)
@@ -956,29 +3175,23 @@ class KanbanTxtViewer:
             editor_header,
             text="↓",
             bordersize=1,
-            color=self.COLORS['button'],
-            activetextcolor=self.COLORS['main-background'],
+            color='button',
+            activetextcolor='main-background',
             command=self.move_line_down
         )
         down_button.pack(side="right", padx=(10,0), pady=10, anchor=tk.NE)
 
         # Light mode / dark mode switch
-        button_color = self.COLORS['button']
-
-        darkmode_button_border = tk.Frame(
-            editor_header,
-            bg=button_color
-        )
+        darkmode_button_border = self.theme_widget(tk.Frame(editor_header), bg='button')
         darkmode_button_border.pack(side="left", padx=(10,0), pady=10, anchor=tk.NE)
         darkmode_button = tk.Label(
             darkmode_button_border, 
             text='🔘', 
             relief='flat', 
-            bg=self.COLORS['editor-background'], 
-            fg=button_color,
             # Gwyrdh font change
             #font=tkFont.nametofont(font))
             font=('Ubuntu', 10))
+        self.theme_widget(darkmode_button, bg='editor-background', fg='button')
         darkmode_button.pack(side="left", padx=2, pady=2)
         darkmode_button.bind("<Button-1>", self.on_switch_darkmode)
 
@@ -986,11 +3199,10 @@ class KanbanTxtViewer:
             darkmode_button_border, 
             text='🌙', 
             relief='flat', 
-            bg=button_color, 
-            fg=self.COLORS['editor-background'],
             # Gwyrdh font change
             #font=tkFont.nametofont(font))
             font=('Ubuntu', 12))
+        self.theme_widget(darkmode_button, bg='button', fg='editor-background')
         darkmode_button.pack(side="left", padx=2, pady=2)
         darkmode_button.bind("<Button-1>", self.on_switch_darkmode)
         # END Light mode / dark mode switch
@@ -999,57 +3211,45 @@ class KanbanTxtViewer:
                                               "👁",
                                               command=self.on_customize_view_button,
                                               bordersize=1,
-                                              color=self.COLORS['button'],
-                                              activetextcolor=self.COLORS['main-background'],
+                                              color='button',
+                                              activetextcolor='main-background',
                                               tooltip="Customize view")
         show_hide_button.pack(side="left", padx=(10,0), pady=10, anchor=tk.NE)
         #END HEADER
 
         # Separator
-        tk.Frame(edition_frame, height=1, bg=self.COLORS['main-text']).pack(side='top', fill='x')
+        self.theme_widget(tk.Frame(edition_frame, height=1), bg='main-text').pack(side='top', fill='x')
 
         # MEMO
-        cheat_sheet = tk.Label(edition_frame, text='------ Memo ------\n'
-            f'{self.KANBAN_KEY}:{self.KANBAN_VAL_IN_PROGRESS} \t—  {self.COLUMN_1_NAME}\n'
-            f'{self.KANBAN_KEY}:{self.KANBAN_VAL_VALIDATION} \t—  {self.COLUMN_2_NAME}\n'
-            f'x \t\t—  {self.COLUMN_3_NAME}\n'
-            'F5,  Ctrl + s \t—  refresh and save\n'
-            'Alt + ↑ / ↓ \t—  move line up / down\n'
-            'Alt + v \t\t—  customize view\n'
-            'Ctrl + f \t\t—  filter tasks\n'
-            'ESC \t\t—  close filter/customize view\n',
-            bg=self.COLORS['editor-background'],
+        self.cheat_sheet = tk.Label(edition_frame, text=self.get_memo_text(),
             anchor=tk.NW,
             justify='left',
-            fg=self.COLORS['main-text'],
             font=tkFont.nametofont('main'),
         )
-        if not self.hide_memo:
-            cheat_sheet.pack(side="top", fill="x", padx=10)
+        self.theme_widget(self.cheat_sheet, bg='editor-background', fg='main-text')
         # MEMO END
 
         # Separator
-        tk.Frame(edition_frame, height=1, bg=self.COLORS['main-text']).pack(side='top', fill='x')
+        self.memo_separator = self.theme_widget(tk.Frame(edition_frame, height=1), bg='main-text')
+        self.memo_separator.pack(side='top', fill='x')
+        self.update_memo_visibility()
 
-        self.filter_frame = tk.Frame(edition_frame, bg=self.COLORS['editor-background'])
+        self.filter_frame = self.theme_widget(tk.Frame(edition_frame), bg='editor-background')
         self.filter_frame.pack(side='top', fill='both', expand=0, padx=10, pady=0)
 
         filter_label = tk.Label(self.filter_frame, text='Filter:',
-            bg=self.COLORS['editor-background'],
             anchor=tk.NW,
             justify='left',
-            fg=self.COLORS['main-text'],
             font=tkFont.nametofont('main'))
+        self.theme_widget(filter_label, bg='editor-background', fg='main-text')
         filter_label.pack(side="left", padx=(10,0), anchor=tk.W)
 
         filter_text_var = tk.StringVar(self.filter_frame)
         self.filter_entry_box = tk.Entry(self.filter_frame,
             textvariable=filter_text_var,
             bd=0,
-            font=(main, 12),
-            bg=self.COLORS['done-card-background'],
-            fg=self.COLORS['main-text'],
-            insertbackground=self.COLORS['main-text'])
+            font=(main, 12))
+        self.theme_widget(self.filter_entry_box, bg='done-card-background', fg='main-text', insertbackground='main-text')
         self.filter_entry_box.pack(side="left", padx=(10,0), anchor=tk.W)
         self.filter_entry_box.bind('<Return>', self.apply_filter)
         self.widgets_for_disable_in_filter_mode.append(self.filter_entry_box)
@@ -1059,8 +3259,8 @@ class KanbanTxtViewer:
             text="apply",
             # gwyrdh reduce border size
             bordersize=1,
-            color=self.COLORS['button'],
-            activetextcolor=self.COLORS['main-background'],
+            color='button',
+            activetextcolor='main-background',
             command=self.apply_filter,
             tooltip="Apply search filter",
             disable_in_filter_view=True
@@ -1072,8 +3272,8 @@ class KanbanTxtViewer:
             # gwyrdh change text to clear
             text="clear",
             bordersize=1,
-            color=self.COLORS['button'],
-            activetextcolor=self.COLORS['main-background'],
+            color='button',
+            activetextcolor='main-background',
             command=self.clear_filter,
             tooltip="Close search results mode",
             disable_in_filter_view=True
@@ -1085,24 +3285,19 @@ class KanbanTxtViewer:
         self.use_regex_checkbox = tk.Checkbutton(self.filter_frame,
                                                  text='use regex',
                                                  variable=self.use_regex_val,
-                                                 fg=self.COLORS['button'],
-                                                 bg=self.COLORS['editor-background'],
-                                                 selectcolor=self.COLORS['done-card-background']
                                                  )
+        self.theme_widget(self.use_regex_checkbox, fg='button', bg='editor-background', selectcolor='done-card-background')
         # gwyrdh removed to save space
         # self.use_regex_checkbox.pack(side="left", padx=(10, 0), anchor=tk.W)
         # user_regex_hovertip = Hovertip(self.use_regex_checkbox, "If selected, uses a regular expression for matching each line; otherwise uses simple search, case insensitive.")
         self.widgets_for_disable_in_filter_mode.append(self.use_regex_checkbox)
 
         # Separator
-        tk.Frame(edition_frame, height=1, bg=self.COLORS['main-text']).pack(side='top', fill='x')
+        self.theme_widget(tk.Frame(edition_frame, height=1), bg='main-text').pack(side='top', fill='x')
 
         # EDITOR
         self.text_editor = tk.Text(
             edition_frame, 
-            bg=self.COLORS['editor-background'], 
-            insertbackground=self.COLORS['editor-text'], 
-            fg=self.COLORS['editor-text'], 
             relief="flat", 
             width=40,
             height=10,
@@ -1113,155 +3308,129 @@ class KanbanTxtViewer:
             spacing3=10,
             insertwidth=3,
         )
+        self.theme_widget(self.text_editor, bg='editor-background', insertbackground='editor-text', fg='editor-text')
         self.text_editor.pack(side="top", fill="both", expand=1, padx=10, pady=10)
-        self.text_editor.tag_configure('pair', background=self.COLORS['done-card-background'])
-        self.text_editor.tag_configure('current_pos', foreground='black', background=self.COLORS['project'], selectbackground=self.COLORS["column0"])
-        self.text_editor.tag_configure('insert', background='red')
+        self.editor_highlighter = EditorHighlighter(self.text_editor)
+        self.text_editor.configure(yscrollcommand=self.on_editor_scrolled)
+        self.configure_editor_tags()
 
         # EDITOR TOOLBAR
-        editor_toolbar = tk.Frame(edition_frame, bg=self.COLORS['editor-background'])
+        editor_toolbar = self.theme_widget(tk.Frame(edition_frame), bg='editor-background')
         editor_toolbar.pack(side='top', padx=10, pady=10, fill='both')
 
-        # Move to todo
-        if not self.hide_buttons_move_to_column:
-            self.create_button(
+        # every button is created, the hidden ones are only removed from the grid
+        # so that they can be shown again from the customize view
+        self.editor_toolbar_buttons = {
+            'hide_buttons_move_to_column': [],
+            'hide_buttons_assign_priority': [],
+            'hide_button_add_date': [],
+            'hide_buttons_move_line_up_down': [],
+            'hide_button_delete': [],
+        }
+        self.move_to_column_buttons = []
+
+        # Move to todo, In progress, Validation and Done
+        move_functors = [self.move_to_todo, self.move_to_in_progress, self.move_to_validation, self.move_to_done]
+        for idx, move_functor in enumerate(move_functors):
+            move_button = self.create_button(
                 editor_toolbar, 
                 '✅→⚫', 
-                self.COLORS["column0"], 
-                command=self.move_to_todo,
-                tooltip=f"Move task to {self.COLUMN_0_NAME}"
-            ).grid(row=0, sticky='ew', column=0, padx=5, pady=5)
+                f"column{idx}",
+                command=move_functor,
+                tooltip=f"Move task to {self.COLUMNS_NAMES[idx]}"
+            )
+            move_button.grid(row=0, sticky='ew', column=idx, padx=5, pady=5)
+            self.editor_toolbar_buttons['hide_buttons_move_to_column'].append(move_button)
+            self.move_to_column_buttons.append(move_button)
 
         # Cycle through priorities
-        if not self.hide_buttons_assign_priority:
-            self.create_button(
-                editor_toolbar,
-                '⧉ ↻',
-                self.COLORS['priority_color_scale'][4],
-                command=self.change_priority,
-                tooltip="Change priority to higher"
-            ).grid(row=0, sticky='ew', column=4, padx=5, pady=5)
-
-        # Move to In progress
-        if not self.hide_buttons_move_to_column:
-            self.create_button(
-                editor_toolbar,
-                '✅→⚫',
-                self.COLORS["column1"],
-                command=self.move_to_in_progress,
-                tooltip=f"Move task to {self.COLUMN_1_NAME}"
-            ).grid(row=0, sticky='ew', column=1, padx=5, pady=5)
-
-        # Move to Validation
-        if not self.hide_buttons_move_to_column:
-            self.create_button(
-                editor_toolbar,
-                '✅→⚫',
-                self.COLORS["column2"],
-                command=self.move_to_validation,
-                tooltip=f"Move task to {self.COLUMN_2_NAME}"
-            ).grid(row=0, sticky='ew', column=2, padx=5, pady=5)
-
-        # Move to Done
-        if not self.hide_buttons_move_to_column:
-            self.create_button(
-                editor_toolbar,
-                '✅→⚫',
-                self.COLORS["column3"],
-                command=self.move_to_done,
-                tooltip=f"Move task to {self.COLUMN_3_NAME}"
-            ).grid(row=0, sticky='ew', column=3, padx=5, pady=5)
+        priority_button = self.create_button(
+            editor_toolbar,
+            '⧉ ↻',
+            ('priority_color_scale', 4),
+            command=self.change_priority,
+            tooltip="Change priority to higher"
+        )
+        priority_button.grid(row=0, sticky='ew', column=4, padx=5, pady=5)
+        self.editor_toolbar_buttons['hide_buttons_assign_priority'].append(priority_button)
 
         # Set prios A..E
-        if not self.hide_buttons_assign_priority:
-            self.create_button(
-                editor_toolbar,
-                f'⧉ A',
-                self.COLORS['priority_color_scale'][0],
-                command=self.change_priority_to_A,
-                tooltip="Set priority to A"
-            ).grid(row=3, sticky='ew', column=0, padx=5, pady=5)
-
-            self.create_button(
-                editor_toolbar,
-                f'⧉ B',
-                self.COLORS['priority_color_scale'][1],
-                command=self.change_priority_to_B,
-                tooltip="Set priority to B"
-            ).grid(row=3, sticky='ew', column=1, padx=5, pady=5)
-    
-            self.create_button(
-                editor_toolbar,
-                f'⧉ C',
-                self.COLORS['priority_color_scale'][2],
-                command=self.change_priority_to_C,
-                tooltip="Set priority to C"
-            ).grid(row=3, sticky='ew', column=2, padx=5, pady=5)
-    
-            self.create_button(
-                editor_toolbar,
-                f'⧉ D',
-                self.COLORS['priority_color_scale'][3],
-                command=self.change_priority_to_D,
-                tooltip="Set priority to D"
-            ).grid(row=3, sticky='ew', column=3, padx=5, pady=5)
-    
-            self.create_button(
-                editor_toolbar,
-                f'⧉ E',
-                self.COLORS['priority_color_scale'][4],
-                command=self.change_priority_to_E,
-                tooltip="Set priority to E"
-            ).grid(row=3, sticky='ew', column=4, padx=5, pady=5)
-    
-            self.create_button(
+        priority_functors = [
+            self.change_priority_to_A,
+            self.change_priority_to_B,
+            self.change_priority_to_C,
+            self.change_priority_to_D,
+            self.change_priority_to_E,
+        ]
+        for idx, priority_functor in enumerate(priority_functors):
+            priority = chr(ord('A') + idx)
+            priority_button = self.create_button(
                 editor_toolbar,
-                f'⧉ ☒',
-                self.COLORS['important'],
-                command=lambda: self.change_priority(None, ''),
-                tooltip="Remove priority"
-            ).grid(row=2, sticky='ew', column=4, padx=5, pady=5)
+                f'⧉ {priority}',
+                ('priority_color_scale', idx),
+                command=priority_functor,
+                tooltip=f"Set priority to {priority}"
+            )
+            priority_button.grid(row=3, sticky='ew', column=idx, padx=5, pady=5)
+            self.editor_toolbar_buttons['hide_buttons_assign_priority'].append(priority_button)
+
+        priority_button = self.create_button(
+            editor_toolbar,
+            f'⧉ ☒',
+            'important',
+            command=lambda: self.change_priority(None, ''),
+            tooltip="Remove priority"
+        )
+        priority_button.grid(row=2, sticky='ew', column=4, padx=5, pady=5)
+        self.editor_toolbar_buttons['hide_buttons_assign_priority'].append(priority_button)
     
         # Add date
-        if not self.hide_button_add_date:
-            self.create_button(
-                editor_toolbar, 
-                '+ date', 
-                self.COLORS['button'], 
-                command=self.add_date
-            ).grid(row=2, sticky='ew', column=0, padx=5, pady=5)
-
-        if not self.hide_buttons_move_line_up_down:
-            # Move line up
-            self.create_button(
-                editor_toolbar, 
-                '↑', 
-                self.COLORS['button'], 
-                command=self.move_line_up,
-                tooltip="Move line up",
-                disable_in_filter_view=True
-            ).grid(row=2, sticky='ew', column=1, padx=5, pady=5)
-    
-            # Move line down
-            self.create_button(
-                editor_toolbar, 
-                '↓', 
-                self.COLORS['button'], 
-                command=self.move_line_down,
-                tooltip="Move line down",
-                disable_in_filter_view=True
-            ).grid(row=2, sticky='ew', column=2, padx=5, pady=5)
-
-        if not self.hide_button_delete:
-            # Delete line
-            self.create_button(
-                editor_toolbar, 
-                'Delete', 
-                self.COLORS['button'], 
-                command=self.remove_line,
-                tooltip="Remove current line",
-                disable_in_filter_view=True
-            ).grid(row=2, sticky='ew', column=3, padx=5, pady=5)
+        date_button = self.create_button(
+            editor_toolbar, 
+            '+ date', 
+            'button',
+            command=self.add_date
+        )
+        date_button.grid(row=2, sticky='ew', column=0, padx=5, pady=5)
+        self.editor_toolbar_buttons['hide_button_add_date'].append(date_button)
+
+        # Move line up
+        up_button = self.create_button(
+            editor_toolbar, 
+            '↑', 
+            'button',
+            command=self.move_line_up,
+            tooltip="Move line up",
+            disable_in_filter_view=True
+        )
+        up_button.grid(row=2, sticky='ew', column=1, padx=5, pady=5)
+        self.editor_toolbar_buttons['hide_buttons_move_line_up_down'].append(up_button)
+
+        # Move line down
+        down_button = self.create_button(
+            editor_toolbar, 
+            '↓', 
+            'button',
+            command=self.move_line_down,
+            tooltip="Move line down",
+            disable_in_filter_view=True
+        )
+        down_button.grid(row=2, sticky='ew', column=2, padx=5, pady=5)
+        self.editor_toolbar_buttons['hide_buttons_move_line_up_down'].append(down_button)
+
+        # Delete line
+        delete_button = self.create_button(
+            editor_toolbar, 
+            'Delete', 
+            'button',
+            command=self.remove_line,
+            tooltip="Remove current line",
+            disable_in_filter_view=True
+        )
+        delete_button.grid(row=2, sticky='ew', column=3, padx=5, pady=5)
+        self.editor_toolbar_buttons['hide_button_delete'].append(delete_button)
+
+        self.update_editor_toolbar_visibility()
 
         editor_toolbar.columnconfigure(0, weight=1, uniform='toolbar-item')
         editor_toolbar.columnconfigure(1, weight=1, uniform='toolbar-item')
@@ -1283,13 +3452,19 @@ class KanbanTxtViewer:
 
         # Bind navigation keys for proper tasks highlights
         # todo: make this more efficient, no need to update on every left/right, also no need to update editor colors
-        self.text_editor.bind('<Up>', self.schedule_update_of_editor_line_colors)
-        self.text_editor.bind('<Down>', self.schedule_update_of_editor_line_colors)
+        self.text_editor.bind('<Up>', self.on_up_down_pressed)
+        self.text_editor.bind('<Down>', self.on_up_down_pressed)
         self.text_editor.bind('<Right>', self.schedule_update_of_editor_line_colors)
         self.text_editor.bind('<Left>', self.schedule_update_of_editor_line_colors)
         self.text_editor.bind('<Control-End>', self.schedule_update_of_editor_line_colors)
         self.text_editor.bind('<Control-Home>', self.schedule_update_of_editor_line_colors)
-        self.text_editor.bind('<Button-1>', self.schedule_update_of_editor_line_colors)
+        self.text_editor.bind('<Button-1>', self.on_editor_click)
+        self.text_editor.bind('<Control-Button-1>', self.on_editor_control_click)
+
+        # Completion of the projects, contexts and keys
+        self.text_editor.bind('<KeyRelease>', self.update_tag_completion, add='+')
+        self.text_editor.bind('<Escape>', self.on_editor_escape)
+        self.text_editor.bind('<Button-1>', self.hide_tag_completion, add='+')
 
         # Shortkeys
         # gwyrdh changed order to make more sense
@@ -1301,6 +3476,63 @@ class KanbanTxtViewer:
         self.text_editor.bind('<Control-Key-4>', self.move_to_done)
         self.text_editor.bind('<Control-Key-5>', self.change_priority)    
 
+    def get_memo_text(self):
+        return ('------ Memo ------\n'
+            f'{self.KANBAN_KEY}:{self.KANBAN_VAL_IN_PROGRESS} \t—  {self.COLUMN_1_NAME}\n'
+            f'{self.KANBAN_KEY}:{self.KANBAN_VAL_VALIDATION} \t—  {self.COLUMN_2_NAME}\n'
+            f'x \t\t—  {self.COLUMN_3_NAME}\n'
+            'F5,  Ctrl + s \t—  refresh and save\n'
+            'Alt + ↑ / ↓ \t—  move line up / down\n'
+            'Alt + v \t\t—  customize view\n'
+            'Ctrl + f \t\t—  filter tasks\n'
+            'ESC \t\t—  close filter/customize view\n')
+
+    def update_memo_visibility(self):
+        if self.hide_memo:
+            self.cheat_sheet.pack_forget()
+        else:
+            self.cheat_sheet.pack(side="top", fill="x", padx=10, before=self.memo_separator)
+
+    def update_editor_toolbar_visibility(self):
+        for hide_attribute, buttons in self.editor_toolbar_buttons.items():
+            for button in buttons:
+                if getattr(self, hide_attribute):
+                    button.grid_remove()
+                else:
+                    button.grid()
+
+    def rename_columns(self, new_column_names):
+        """Rename the columns of the kanban, only updating the widgets showing
+            the column names"""
+        old_column_names = self.COLUMNS_NAMES
+        renaming = dict(zip(old_column_names, new_column_names))
+        self.ui_columns = {renaming[name]: ui_column for name, ui_column in self.ui_columns.items()}
+        self.progress_bars = {renaming[name]: progress_bar for name, progress_bar in self.progress_bars.items()}
+        self.column_cards = {renaming[name]: cards for name, cards in self.column_cards.items()}
+        self.board_stats.rename_columns(renaming)
+        self.grouping.rename_columns(renaming)
+        for lane_widgets in self.lane_widgets.values():
+            if lane_widgets['cells'] is not None:
+                lane_widgets['cells'] = {renaming[name]: cell for name, cell in lane_widgets['cells'].items()}
+        self.shown_cards_numbers = {renaming[name]: number for name, number in self.shown_cards_numbers.items()}
+        for card in self.cards.values():
+            card['state'] = renaming[card['state']]
+
+        self.COLUMNS_NAMES = new_column_names
+        self.COLUMN_0_NAME = new_column_names[0]
+        self.COLUMN_1_NAME = new_column_names[1]
+        self.COLUMN_2_NAME = new_column_names[2]
+        self.COLUMN_3_NAME = new_column_names[3]
+
+        for idx, (old_name, new_name) in enumerate(renaming.items()):
+            if old_name == new_name:
+                continue
+            self.update_column_title(new_name)
+            if self.progress_bars[new_name]['count'] is None:
+                self.progress_bars[new_name]['label'].configure(text=new_name + ': -')
+            self.move_to_column_buttons[idx].tooltip.text = f"Move task to {new_name}"
+        self.cheat_sheet.configure(text=self.get_memo_text())
+
     def draw_content_frame(self):
         # Create content view that will display kanban
 
@@ -1308,11 +3540,11 @@ class KanbanTxtViewer:
         # Use canvas to make content view scrollable
         self.content_canvas = tk.Canvas(
             self.main_window, 
-            bg=self.COLORS['main-background'], 
             bd=0, 
             highlightthickness=0, 
             relief=tk.FLAT
         )
+        self.theme_widget(self.content_canvas, bg='main-background')
         self.content_canvas.grid(row=0, column=1, sticky=tk.NSEW, padx=10, pady=10)
         
         # Give more space to the kanban view
@@ -1320,7 +3552,7 @@ class KanbanTxtViewer:
         self.main_window.grid_columnconfigure(1, weight=30)
 
         # The frame inside the canvas. It manage the widget displayed inside the canvas
-        self.content_frame = tk.Frame(self.content_canvas, bg=self.COLORS['main-background'])
+        self.content_frame = self.theme_widget(tk.Frame(self.content_canvas), bg='main-background')
 
 
         content_scrollbar = tk.Scrollbar(
@@ -1339,7 +3571,7 @@ class KanbanTxtViewer:
 
         # Prepare progress bars and kanban itself
         # gwyrdh increased height 
-        self.progress_bar = tk.Frame(self.content_frame, height=30, bg=self.COLORS['done-card-background'])
+        self.progress_bar = self.theme_widget(tk.Frame(self.content_frame, height=30), bg='done-card-background')
         self.progress_bar.pack(side='top', fill='x', padx=10, pady=10)
         self.progress_bars = {}
 
@@ -1349,15 +3581,21 @@ class KanbanTxtViewer:
         column_number = 0
 
         # Frame containing the kanban
-        self.kanban_frame = tk.Frame(self.content_frame, bg=self.COLORS['main-background'])
+        self.kanban_frame = self.theme_widget(tk.Frame(self.content_frame), bg='main-background')
         self.kanban_frame.pack(fill='both')
 
+        # Frame containing the swimlanes, below the column titles
+        self.lanes_frame = self.theme_widget(tk.Frame(self.content_frame), bg='main-background')
+        for column_number in range(len(self.ui_columns)):
+            self.lanes_frame.grid_columnconfigure(column_number, weight=1, uniform="lanes")
+        column_number = 0
+
         # Create each column and its associated progress bar
         for idx, (key, column) in enumerate(self.ui_columns.items()):
-            column_color = self.COLORS[f'column{idx}-column']
+            column_color = f'column{idx}-column'
 
             # Create the kanban column
-            ui_column = tk.Frame(self.kanban_frame, bg=column_color)
+            ui_column = self.theme_widget(tk.Frame(self.kanban_frame), bg=column_color)
             ui_column.grid(
                 row=1, column=column_number, padx=10, pady=0, sticky='nwe')
             self.kanban_frame.grid_columnconfigure(
@@ -1365,37 +3603,57 @@ class KanbanTxtViewer:
 
             top_border = tk.Frame(
                 ui_column, 
-                bg=self.COLORS[f'column{idx}'],
                 height=8
             )
+            self.theme_widget(top_border, bg=f'column{idx}')
             top_border.pack(fill='x', side="top", anchor=tk.W)
 
-            title_color = self.COLORS[f'column{idx}']
-            if title_color == self.COLORS[f'column{idx}-column']:
-                title_color = self.COLORS['main-background']
+            def get_title_color(idx=idx):
+                title_color = self.COLORS[f'column{idx}']
+                if title_color == self.COLORS[f'column{idx}-column']:
+                    title_color = self.COLORS['main-background']
+                return title_color
             label = tk.Label(
                 ui_column, 
                 text=self.COLUMNS_NAMES[idx], 
-                fg=title_color, 
-                bg=ui_column['bg'], 
                 anchor=tk.W, 
                 # gwyrdh edit font
                 font=('Ubuntu', 16)
                 #font=tkFont.nametofont('h2')
             )
+            self.theme_widget(label, fg=get_title_color, bg=column_color)
             label.pack(padx=10, pady=(3, 10), fill='x', side="top", anchor=tk.W)
+            label.configure(cursor='hand2')
+            # by index, the column may be renamed
+            label.bind('<Button-1>', lambda event, idx=idx: self.toggle_column_collapse(idx))
+            LazyTooltip(label, "Collapse or expand the column")
+            ui_column.title = label
 
-            ui_column_content = tk.Frame(ui_column, bg=ui_column['bg'], height=0)
+            ui_column_content = self.theme_widget(tk.Frame(ui_column, height=0), bg=column_color)
             ui_column_content.pack(side='top', padx=10, pady=(0,10), fill='x')
 
+            # below the cards, the button drawing the next cards of the column
+            ui_column_footer = self.theme_widget(tk.Frame(ui_column, height=0), bg=column_color)
+            ui_column_footer.pack(side='top', padx=10, fill='x')
+            ui_column.show_more_button = self.create_button(
+                ui_column_footer,
+                text="Show more",
+                color=f'column{idx}',
+                activetextcolor=column_color,
+                # by index, the column may be renamed
+                command=lambda idx=idx: self.show_more_cards(self.COLUMNS_NAMES[idx]),
+            )
+
             self.ui_columns[key] = ui_column
             self.ui_columns[key].content = ui_column_content
+            self.ui_columns[key].footer = ui_column_footer
+            self.update_column_title(key)
 
             
             # Create the progress bar associated to the column
-            self.progress_bars[key] = {}
-            self.progress_bars[key]['bar'] = tk.Frame(
-                self.progress_bar, bg=self.COLORS[f'column{idx}'])
+            self.progress_bars[key] = {'count': None}
+            self.progress_bars[key]['bar'] = self.theme_widget(
+                tk.Frame(self.progress_bar), bg=f'column{idx}')
             self.progress_bars[key]['bar'].place(
                 relx=sub_bar_pos, relwidth=0.25, relheight=1)
             
@@ -1405,9 +3663,8 @@ class KanbanTxtViewer:
             self.progress_bars[key]['label'] = tk.Label(
                 self.progress_bars[key]['bar'], 
                 text=bar_label_text, 
-                fg=self.COLORS['main-background'], 
-                bg=self.progress_bars[key]['bar']['bg'], 
                 font=('Ubuntu', 10))
+            self.theme_widget(self.progress_bars[key]['label'], fg='main-background', bg=f'column{idx}')
             self.progress_bars[key]['label'].pack(side='left', padx=5)
             
             sub_bar_pos += 0.25
@@ -1432,6 +3689,280 @@ class KanbanTxtViewer:
         # resize kanban frame when window is resied
         self.content_canvas.bind('<Configure>', self.on_window_resize)
     
+    def draw_profile_status(self):
+        """Strip at the bottom of the window showing the last profiled action"""
+        self.profile_status = self.theme_widget(
+            tk.Label(self.main_window, anchor='w', padx=10, font=self.fonts['card-small']),
+            bg='editor-background', fg='main-text')
+        self.profile_status.grid(row=1, column=0, columnspan=3, sticky='ew')
+        if self.profiler.last_record is not None:
+            self.show_profile_record(self.profiler.last_record)
+        else:
+            self.profile_status.config(text="Profiling: waiting for the next refresh")
+        if not self.profiler.enabled:
+            self.profile_status.grid_remove()
+
+    def show_profile_record(self, record):
+        phases = " · ".join(f"{name} {ms:.1f}" for name, ms in record['phases'].items())
+        counts = record['counts']
+        text = f"{record['action']}: {record['total_ms']:.1f} ms ({phases})"
+        if 'tasks' in counts:
+            text += f" | {counts['tasks']} tasks"
+        text += f" | widgets +{counts.get('widgets created', 0)} -{counts.get('widgets destroyed', 0)}"
+        if 'cprofile' in record:
+            text += f" | cProfile: {record['cprofile']}"
+        if self.profiler.log_error is not None:
+            text += f" | log error: {self.profiler.log_error}"
+        self.profile_status.config(text=text)
+
+    def toggle_profiling(self, event=None):
+        self.profiler.enabled = not self.profiler.enabled
+        if self.profiler.enabled:
+            self.profile_status.grid()
+        else:
+            self.profile_status.grid_remove()
+
+    def capture_next_reload(self, event=None):
+        """Record the next refresh with cProfile, enabling the profiling if needed"""
+        if not self.profiler.enabled:
+            self.toggle_profiling()
+        self.profiler.capture_next = True
+        self.profile_status.config(text="Profiling: the next refresh will be recorded with cProfile")
+
+    def open_diagnostics_panel(self, event=None):
+        """Show the window reporting the widgets and memory in use, creating it
+            on the first use only"""
+        if self.diagnostics_panel is not None:
+            self.diagnostics_panel.deiconify()
+            self.diagnostics_panel.lift()
+            return
+
+        self.diagnostics_panel = self.theme_widget(tk.Toplevel(self.main_window), bg='editor-background')
+        self.diagnostics_panel.title('KanbanTxt - Diagnostics')
+        self.diagnostics_panel.protocol('WM_DELETE_WINDOW', self.diagnostics_panel.withdraw)
+
+        toolbar = self.theme_widget(tk.Frame(self.diagnostics_panel), bg='editor-background')
+        toolbar.pack(side='top', fill='x', padx=10, pady=10)
+        self.create_button(
+            toolbar,
+            text="Snapshot",
+            color='main-text',
+            activetextcolor='editor-background',
+            command=self.show_diagnostics_snapshot,
+            tooltip="Count the widgets and memory in use now"
+        ).pack(side='left', padx=(0, 10))
+        self.create_button(
+            toolbar,
+            text="Diff since last snapshot",
+            color='main-text',
+            activetextcolor='editor-background',
+            command=self.show_diagnostics_diff,
+            tooltip="Take a snapshot and compare it to the previous one"
+        ).pack(side='left', padx=(0, 10))
+        self.create_button(
+            toolbar,
+            text="Stress",
+            color='main-text',
+            activetextcolor='editor-background',
+            command=self.on_stress_button,
+            tooltip="Reload the board and switch all the themes N times, then show the diff"
+        ).pack(side='left')
+        self.stress_iterations_entry = self.theme_widget(
+            tk.Entry(toolbar, width=6, relief='flat'),
+            bg='done-card-background', fg='main-text', insertbackground='main-text')
+        self.stress_iterations_entry.insert(0, '100')
+        self.stress_iterations_entry.pack(side='left', padx=5)
+
+        self.diagnostics_text = self.theme_widget(
+            tk.Text(self.diagnostics_panel, width=90, height=30, relief='flat', wrap='none'),
+            bg='editor-background', fg='editor-text')
+        self.diagnostics_text.pack(side='top', fill='both', expand=1, padx=10, pady=(0, 10))
+        self.show_diagnostics_snapshot()
+
+    def show_diagnostics_text(self, text):
+        self.diagnostics_text.config(state='normal')
+        self.diagnostics_text.delete('1.0', 'end')
+        self.diagnostics_text.insert('1.0', text)
+        self.diagnostics_text.config(state='disabled')
+
+    def take_diagnostics_snapshot(self):
+        snapshot = self.diagnostics.take_snapshot(self.main_window, len(self.cards))
+        previous = self.diagnostics.last_snapshot
+        self.diagnostics.last_snapshot = snapshot
+        return snapshot, previous
+
+    def get_diagnostics_report(self, snapshot):
+        text = self.diagnostics.report(snapshot)
+        if self.parse_cache.error is not None:
+            text += f"\n\nCould not write the parse cache: {self.parse_cache.error}"
+        return text
+
+    def show_diagnostics_snapshot(self):
+        snapshot, previous = self.take_diagnostics_snapshot()
+        self.show_diagnostics_text(self.get_diagnostics_report(snapshot))
+
+    def show_diagnostics_diff(self):
+        snapshot, previous = self.take_diagnostics_snapshot()
+        text = self.get_diagnostics_report(snapshot)
+        if previous is not None:
+            text = "Since last snapshot:\n" + self.diagnostics.diff_report(snapshot, previous) + "\n\nNow:\n" + text
+        self.show_diagnostics_text(text)
+
+    def on_stress_button(self):
+        try:
+            iterations = int(self.stress_iterations_entry.get())
+        except ValueError:
+            self.stress_iterations_entry.bell()
+            return
+        self.take_diagnostics_snapshot()
+        self.run_stress(iterations)
+        self.show_diagnostics_diff()
+
+    def run_stress(self, iterations):
+        """Reload the board and go through all the themes, iterations times"""
+        theme_name = self.theme_name
+        theme_names = list(self.THEMES.keys())
+        for i in range(iterations):
+            self.reload_ui_from_text()
+            for name in theme_names:
+                self.apply_theme(name)
+            self.apply_theme(theme_name)
+
+    def run_stress_report(self, iterations):
+        """Print the diagnostics before and after a stress run, then quit"""
+        snapshot, previous = self.take_diagnostics_snapshot()
+        print(self.diagnostics.report(snapshot))
+        self.run_stress(iterations)
+        snapshot, previous = self.take_diagnostics_snapshot()
+        print(f"\nAfter {iterations} reloads and theme switches:")
+        print(self.diagnostics.diff_report(snapshot, previous))
+        self.quit()
+
+    def open_analytics_panel(self, event=None):
+        """Show the window with the cycle times and throughput of the todo list
+            and its done files, creating it on the first use only"""
+        if self.analytics_panel is not None:
+            self.analytics_panel.deiconify()
+            self.analytics_panel.lift()
+            self.show_analytics()
+            return
+
+        self.analytics_panel = self.theme_widget(tk.Toplevel(self.main_window), bg='editor-background')
+        self.analytics_panel.title('KanbanTxt - Analytics')
+        self.analytics_panel.protocol('WM_DELETE_WINDOW', self.analytics_panel.withdraw)
+
+        toolbar = self.theme_widget(tk.Frame(self.analytics_panel), bg='editor-background')
+        toolbar.pack(side='top', fill='x', padx=10, pady=10)
+        self.create_button(
+            toolbar,
+            text="Refresh",
+            color='main-text',
+            activetextcolor='editor-background',
+            command=self.show_analytics,
+            tooltip="Scan the todo list and its done files again"
+        ).pack(side='left', padx=(0, 10))
+        self.create_button(
+            toolbar,
+            text="Export CSV",
+            color='main-text',
+            activetextcolor='editor-background',
+            command=self.export_analytics_csv,
+            tooltip="Save the metrics shown here as a CSV file"
+        ).pack(side='left')
+
+        self.analytics_text = self.theme_widget(
+            tk.Text(self.analytics_panel, width=90, height=30, relief='flat', wrap='none'),
+            bg='editor-background', fg='editor-text')
+        self.analytics_text.pack(side='top', fill='both', expand=1, padx=10, pady=(0, 10))
+        self.show_analytics()
+
+    def get_done_files(self):
+        """The done files next to the opened todo list, like done.txt"""
+        if not os.path.isfile(self.file):
+            return []
+        folder = os.path.dirname(os.path.abspath(self.file))
+        opened = os.path.abspath(self.file)
+        return sorted(
+            os.path.join(folder, name) for name in os.listdir(folder)
+            if 'done' in name.casefold() and name.endswith('.txt')
+            and os.path.join(folder, name) != opened)
+
+    def compute_analytics(self):
+        """Scan the todo list with its done files and aggregate them"""
+        start = time.perf_counter()
+        history = TaskHistory()
+        if self.filter is not None:
+            history.add_text(self.merge_filtered_with_original())
+        else:
+            history.add_text(self.get_document_text())
+        unreadable_files = []
+        for path in self.get_done_files():
+            try:
+                with open(path, 'r', encoding='utf-8') as done_file:
+                    history.add_text(done_file.read())
+            except (OSError, UnicodeDecodeError) as error:
+                unreadable_files.append((path, error))
+        analytics = history.compute(self.today_ordinal)
+        analytics['seconds'] = time.perf_counter() - start
+        analytics['backend'] = 'numpy' if get_numpy() is not None else 'array'
+        analytics['unreadable_files'] = unreadable_files
+        return analytics
+
+    def show_analytics(self):
+        self.analytics = self.compute_analytics()
+        analytics = self.analytics
+        lines = [
+            f"{analytics['tasks']} tasks, {analytics['done']} done"
+            f" (computed in {analytics['seconds'] * 1000:.0f} ms with {analytics['backend']})",
+        ]
+        for path, error in analytics['unreadable_files']:
+            lines.append(f"Could not read {pathlib.Path(path).name}: {error}")
+        lines += ["", "Cycle time by project (creation to completion):"]
+        for project, count, mean in analytics['cycle_times']:
+            lines.append(f"  {project:<30} {count:>8} done   {mean:>7.1f} days")
+        lines += ["", "Cycle time histogram:"]
+        largest = max((count for label, count in analytics['cycle_time_histogram']), default=0)
+        for label, count in analytics['cycle_time_histogram']:
+            bar = '#' * round(40 * count / largest) if largest else ''
+            lines.append(f"  {label:>11} {count:>8} {bar}")
+        lines += ["", f"Last weeks (throughput, rolling {TaskHistory.ROLLING_WEEKS} weeks mean, work in progress):"]
+        for week_start, throughput, rolling, wip in analytics['weeks'][-12:]:
+            lines.append(f"  {date.fromordinal(week_start).isoformat()} {throughput:>8} {rolling:>9.1f} {wip:>8}")
+
+        self.analytics_text.config(state='normal')
+        self.analytics_text.delete('1.0', 'end')
+        self.analytics_text.insert('1.0', '\n'.join(lines))
+        self.analytics_text.config(state='disabled')
+
+    def export_analytics_csv(self):
+        """Save the analytics as metric,key,value rows"""
+        from tkinter import filedialog
+        import csv
+        path = filedialog.asksaveasfilename(
+            parent=self.analytics_panel,
+            defaultextension='.csv',
+            filetypes=[('CSV file', '*.csv')],
+            title='Export the analytics')
+        if not path:
+            return
+
+        analytics = self.analytics
+        with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['metric', 'key', 'value'])
+            writer.writerow(['tasks', '', analytics['tasks']])
+            writer.writerow(['done', '', analytics['done']])
+            for project, count, mean in analytics['cycle_times']:
+                writer.writerow(['cycle_time_count', project, count])
+                writer.writerow(['cycle_time_mean_days', project, f"{mean:.2f}"])
+            for label, count in analytics['cycle_time_histogram']:
+                writer.writerow(['cycle_time_histogram', label, count])
+            for week_start, throughput, rolling, wip in analytics['weeks']:
+                week = date.fromordinal(week_start).isoformat()
+                writer.writerow(['throughput', week, throughput])
+                writer.writerow(['throughput_rolling_mean', week, f"{rolling:.2f}"])
+                writer.writerow(['work_in_progress', week, wip])
+
 
     def create_button(
         self,
@@ -1445,412 +3976,790 @@ class KanbanTxtViewer:
         tooltip=None,
         disable_in_filter_view=False
     ):
-        """Create a button with a border and no background"""
-        button_frame = tk.Frame(
-            parent,
-            bg=color
-        )
+        """Create a button with a border and no background, the colors are
+            color roles of the theme (see get_theme_color)"""
+        button_frame = self.theme_widget(tk.Frame(parent), bg=color)
         button = tk.Button(
             button_frame,
             text=text,
             relief='flat',
-            bg=parent['bg'],
-            fg=color,
-            activebackground=color,
-            activeforeground=activetextcolor,
             borderwidth=0,
             #font=tkFont.nametofont('main'),
             font=('Ubuntu', 10),
             command=command)
+        self.theme_widget(
+            button,
+            bg=self.get_widget_color_role(parent, 'bg'),
+            fg=color,
+            activebackground=color,
+            activeforeground=activetextcolor)
         button.pack(padx=bordersize, pady=bordersize, fill='both')
         if disable_in_filter_view:
             self.widgets_for_disable_in_filter_mode.append(button)
+        button_frame.tooltip = None
         if tooltip is not None:
-            hovertip = Hovertip(button, tooltip)
+            button_frame.tooltip = LazyTooltip(button, tooltip)
         return button_frame
 
 
     def fread(self, filename):
         """Read file and close the file."""
         with open(filename, 'r', encoding='utf8') as f:
-            return f.read()
+            text = f.read()
+        self.file_writer.remember(filename, text)
+        return text
 
     def fwrite(self, filename, text):
-        """Write content to file and close the file."""
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(text)
+        """Write content to file, only the changed lines when possible (see
+            TodoFileWriter)"""
+        self.file_writer.write(filename, text)
 
+    @profiled('reload')
     def parse_todo_txt(self, p_todo_txt):
         """Parse a todo txt content and return data as a dictionary"""
         tasks = {}
         for col in self.COLUMNS_NAMES:
             tasks[col] = []
 
+        self.sync_task_selection()
+
         # Erase the columns content
+        self.profiler.lap('teardown')
+        if self.profiler.is_recording():
+            for ui_column in self.ui_columns.values():
+                self.profiler.count('widgets destroyed', self.count_widgets(ui_column.content))
+        self.themed_card_widgets.clear()
+        self.cards = {}
+        self.column_cards = {}
+        for col in self.COLUMNS_NAMES:
+            self.column_cards[col] = []
         for ui_column_name, ui_column in self.ui_columns.items():
             ui_column.content.pack_forget()
             for widget in ui_column.content.winfo_children():
                 widget.destroy()
+        for widget in self.lanes_frame.winfo_children():
+            widget.destroy()
+        self.lane_widgets = {}
 
+        self.profiler.lap('parse')
         todo_list = p_todo_txt.split("\n")
 
         cards_data = []
         for index, task_txt in enumerate(todo_list):
             if len(task_txt) != 0:
-                task_data = re.match(
-                    r'^(?P<isDone>x )? '
-                    r'?(?P<priority>\([A-Z]\))? '
-                    r'?(?P<dates>\d\d\d\d-\d\d-\d\d( \d\d\d\d-\d\d-\d\d)?)? '
-                    r'?(?P<subject>.+)',
-                    task_txt)
-
-                # special key-vals, context or project tags may occur basically everywhere in the line,
-                # so don't try to fit it into the structured regex above, just make a new search
-                special_kv_r = re.compile(r'(?P<key>[^:\s]+):(?P<val>[^:\s]+)')
-                special_kv_data = [m.groupdict() for m in special_kv_r.finditer(task_txt)]
-
-                project_r = re.compile(r' (?P<project>\+\S+)')
-                project_data = [m.groupdict() for m in project_r.finditer(task_txt)]
-
-                context_r = re.compile(r' (?P<context>@\S+)')
-                context_data = [m.groupdict() for m in context_r.finditer(task_txt)]
-
-                task = task_data.groupdict()
-                task['is_important'] = False
-
-                subject = task.get('subject', '???')
-
-                # remove any special key-val strings, project and context tags from the subject text for clarity
-                subject = re.sub(special_kv_r, "", subject)
-                subject = re.sub(project_r, "", subject)
-                subject = re.sub(context_r, "", subject)
-
-                category = self.COLUMN_0_NAME
-
-                category_map = {
-                    self.KANBAN_VAL_IN_PROGRESS: self.COLUMN_1_NAME,
-                    self.KANBAN_VAL_VALIDATION: self.COLUMN_2_NAME,
-                }
-
-                for i in range(0, len(special_kv_data)):
-                    kv = special_kv_data[i]
-                    if kv['key'] == self.KANBAN_KEY:
-                        v = kv['val']
-                        if v in category_map.keys():
-                            category = category_map[v]
-                            break
-
-                if task.get("isDone"):
-                    category = self.COLUMN_3_NAME
-
-                priority = None
-                if task.get("priority"):
-                    priority = task['priority'][1]  # get only letter without parenthesis
-
-                tasks[category].append(task)
-
-                start_date = None
-                end_date = None
-                if task.get('dates'):
-                    dates = []
-                    dates = task.get('dates').split(' ')
-                    if len(dates) == 1:
-                        start_date = date.fromisoformat(dates[0])
-                    elif len(dates) == 2:
-                        start_date = date.fromisoformat(dates[1])
-                        end_date = date.fromisoformat(dates[0])
-
-                card_bg = self.COLORS['card-background']
-                font=tkFont.nametofont('main'),
-                #font = 'main'
-                #font=('Ubuntu',8)
-                # gwyrdh working on apply done styling
-                #if category == 'Done':
-                if category == self.COLUMN_3_NAME:
-                	#gwyrdh done card background
-                    card_bg = self.COLORS['column0-column']
-                    #card_bg = self.COLORS['done-card-background']
-                    # gwyrdh set font in code
-                    #font = ('Ubuntu',16)
-                    #font=("Ubuntu", self.card_font_size + 4)
-                    font = 'done-task'
-                    #font=tkFont.nametofont('done-task')
-                    #font=tkFont.nametofont('h2')
-
-                card_parent = self.ui_columns[category].content
-
-                cards_data.append({
-                    'parent': card_parent,
-                    'subject': subject,
-                    'bg': card_bg,
-                    'font': font,
-                    'project': project_data,
-                    'context': context_data,
-                    'start_date': start_date,
-                    'end_date': end_date,
-                    'state': category,
-                    'name': "task#" + str(index + 1),
-                    'special_kv_data': special_kv_data,
-                    'priority': priority,
-                    'index': index,
-                    'raw_txt': task_txt
-                })
-
-        sort_method = SORT_METHODS[self.sort_method_idx]
-        cards_data.sort(key=sort_method['f'], reverse=sort_method['rev'])
+                card = self.create_card_data(index, task_txt)
+                tasks[card['state']].append(card)
+                cards_data.append(card)
+
+        self.date_index.build(cards_data)
+        self.board_stats.build(cards_data, self.COLUMNS_NAMES)
+        if self.tag_trie is not None:
+            # a reload changes a few tags at most, rebuilding the trie is much slower
+            self.tag_trie.update(self.board_stats.get_completion_counts())
+        if self.stable_ids:
+            self.task_ids.update(todo_list if self.filter is None else self.non_filtered_content.split('\n'))
+
+        self.profiler.lap('sort')
+        cards_data.sort(key=get_card_sort_key, reverse=self.sort_reverse)
+
+        self.profiler.lap('draw cards')
+        shown_cards_numbers = {col: self.get_shown_cards_number(col) for col in self.COLUMNS_NAMES}
         for card in cards_data:
             index = card['index']
             if self.filter is not None:
                 index = self.non_filtered_content_line_mapping[index]
-            self.draw_card(
-                card['parent'],
-                card['subject'],
-                card['bg'],
-                card['font'],
-                project=card['project'],
-                context=card['context'],
-                start_date=card['start_date'],
-                end_date=card['end_date'],
-                state=card['state'],
-                name=card['name'],
-                special_kv_data=card['special_kv_data'],
-                priority=card['priority'],
-                index=index,
-            )
-
-        # Compute proportion for each column tasks and update progress bars
-        tasks_number = {}
+            card['display_index'] = index
+            card['id'] = self.task_ids.get_id(index) if self.stable_ids else None
+            self.column_cards[card['state']].append(card)
+            self.cards[card['name']] = card
+            # the next cards are drawn with the show more button
+            if not self.swimlanes and len(self.column_cards[card['state']]) <= shown_cards_numbers[card['state']]:
+                self.draw_card(card)
         for col in self.COLUMNS_NAMES:
-            tasks_number[col] = len(tasks[col])
-
-        total_tasks = 0
-
-        for key, number in tasks_number.items():
-            total_tasks += number
-
-        if total_tasks > 0:
-            percentages = {}
-            for col in self.COLUMNS_NAMES:
-                percentages[col] = tasks_number[col] / total_tasks
+            self.update_show_more_button(col)
+        if self.swimlanes:
+            self.lanes_frame.pack(fill='both')
+            self.draw_lanes(cards_data)
+        else:
+            self.lanes_frame.pack_forget()
 
-            bar_x = 0
+        if self.profiler.is_recording():
+            self.profiler.count('tasks', len(cards_data))
+            for ui_column in self.ui_columns.values():
+                self.profiler.count('widgets created', self.count_widgets(ui_column.content))
 
-            for key, progress_bar in self.progress_bars.items():
-                progress_bar['bar'].place(relx=bar_x, relwidth=percentages[key], relheight=1)
-                label_text = f"{tasks_number[key]}"
-                progress_bar['label'].config(text=label_text)
-                bar_x += percentages[key]
+        # Compute proportion for each column tasks and update progress bars
+        self.profiler.lap('progress bars')
+        self.update_progress_bars(self.board_stats.columns)
 
+        self.profiler.lap('layout')
         for ui_column_name, ui_column in self.ui_columns.items():
             tmp_frame = tk.Frame(ui_column.content, width=0, height=0)
             tmp_frame.pack()
             ui_column.content.update()
             tmp_frame.destroy()
-            ui_column.content.pack(side='top', padx=10, pady=(0,10), fill='x')
+            ui_column.content.pack(side='top', padx=10, pady=(0,10), fill='x', before=ui_column.footer)
         
+        self.profiler.lap('editor colors')
         self.update_editor_line_colors()
 
+        self.profiler.lap('layout')
         self.main_window.update()
 
         return tasks;
 
+    def update_progress_bars(self, tasks_number):
+        """Show the number of tasks of each column, in proportion of all the
+            tasks. Nothing is redrawn if no number changed."""
+        if all(progress_bar['count'] == tasks_number[key] for key, progress_bar in self.progress_bars.items()):
+            return
 
-    def draw_card(
-        self,
-        parent,
-        subject,
-        bg,
-        # gwyrdh no change here
-        font='main',
-        #font=('Ubuntu',6),
-        project=None,
-        context=None,
-        start_date=None,
-        end_date=None,
-        state=None,
-        name="",
-        special_kv_data=None,
-        priority=None,
-        index=None
-    ):
-        def bind_highlight_and_drag_n_drop(widget):
-            widget.bind('<Button-1>', self.on_click)
-            widget.bind('<B1-Motion>', self.on_drag_init)
-            widget.bind('<ButtonRelease>', self.on_drop)
+        total_tasks = 0
 
-        def get_widget_name(subject_name):
-            ret_name = str(get_widget_name.counter) + subject_name
-            get_widget_name.counter += 1
-            return ret_name
-        get_widget_name.counter = 0
+        for key, number in tasks_number.items():
+            total_tasks += number
 
-        # Create the card frame
-        ui_card_highlight = tk.Frame(parent, bd=2, bg=self.COLORS['column1-column'], height=200, name="highlightFrame"+name)
-        ui_card = tk.Frame(ui_card_highlight, bd=0, bg=bg, height=200, cursor='hand2', name=get_widget_name(name))
+        if total_tasks > 0:
+            percentages = {}
+            for col in self.COLUMNS_NAMES:
+                percentages[col] = tasks_number[col] / total_tasks
+
+            bar_x = 0
+
+            for key, progress_bar in self.progress_bars.items():
+                progress_bar['bar'].place(relx=bar_x, relwidth=percentages[key], relheight=1)
+                if progress_bar['count'] != tasks_number[key]:
+                    label_text = f"{tasks_number[key]}"
+                    progress_bar['label'].config(text=label_text)
+                    progress_bar['count'] = tasks_number[key]
+                    self.update_column_title(key)
+                bar_x += percentages[key]
 
-        subject_padx = 10
 
-        # If needed, add a color border for priority marking
-        if priority is not None and self.show_priority:
-            prio_color = self.get_priority_color(priority)
-            important_border = tk.Frame(ui_card, bg=prio_color, width="3", name=get_widget_name(name))
-            bind_highlight_and_drag_n_drop(important_border)
-            important_border.pack(side="left", fill='y')
+    def create_card_data(self, index, task_txt):
+        """The data of the card of a task line, index being the editor line index"""
+        task = parse_task_line(task_txt)
+        category = self.COLUMNS_NAMES[task['column']]
+
+        card_bg = 'card-background'
+        font=tkFont.nametofont('main'),
+        #font = 'main'
+        #font=('Ubuntu',8)
+        # gwyrdh working on apply done styling
+        #if category == 'Done':
+        if category == self.COLUMN_3_NAME:
+        	#gwyrdh done card background
+            card_bg = 'column0-column'
+            #card_bg = self.COLORS['done-card-background']
+            # gwyrdh set font in code
+            #font = ('Ubuntu',16)
+            #font=("Ubuntu", self.card_font_size + 4)
+            font = 'done-task'
+            #font=tkFont.nametofont('done-task')
+            #font=tkFont.nametofont('h2')
+
+        card = {
+            'subject': task['subject'],
+            'bg': card_bg,
+            'font': font,
+            'project': task['project'],
+            'context': task['context'],
+            'start_ordinal': task['start_ordinal'],
+            'end_ordinal': task['end_ordinal'],
+            'state': category,
+            'name': "task#" + str(index + 1),
+            'special_kv_data': task['special_kv_data'],
+            'priority': task['priority'],
+            'index': index,
+            'raw_txt': task_txt
+        }
+        card['sort_key'] = self.sort_key(card)
+        return card
+
+    def count_widgets(self, widget):
+        """Number of widgets inside widget, at any depth"""
+        children = widget.winfo_children()
+        return len(children) + sum(self.count_widgets(child) for child in children)
+
+    def get_card_duration_string(self, card):
+        """Days from the creation to the completion of a task, or to today if
+            it is not done"""
+        end_ordinal = card['end_ordinal']
+        if end_ordinal is None:
+            end_ordinal = self.today_ordinal
+        return "%d days" % (end_ordinal - card['start_ordinal'])
+
+    def schedule_date_refresh(self):
+        """Refresh today's date right after the next midnight"""
+        now = datetime.now()
+        next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        delay = int((next_midnight - now).total_seconds() * 1000) + 1000
+        self.main_window.after(delay, self.on_date_changed)
+
+    def on_date_changed(self):
+        self.current_date = date.today()
+        self.today_ordinal = self.current_date.toordinal()
+        # only the age of the open tasks depend on today's date
+        for ordinal, index in self.date_index.creation:
+            card = self.cards.get(f"task#{index + 1}")
+            if card is not None and card['end_ordinal'] is None and 'date' in card.get('fields', {}):
+                for widget, pack_options in card['fields']['date']:
+                    widget.config(text=self.get_card_duration_string(card))
+        self.schedule_date_refresh()
+
+    def get_card_widget_name(self, card):
+        widget_name = str(card['widget_counter']) + card['name']
+        card['widget_counter'] += 1
+        return widget_name
+
+    def bind_highlight_and_drag_n_drop(self, widget):
+        widget.bind('<Button-1>', self.on_click)
+        widget.bind('<B1-Motion>', self.on_drag_init)
+        widget.bind('<ButtonRelease>', self.on_drop)
+
+    def has_card_field_data(self, card, field):
+        if field == 'priority':
+            return card['priority'] is not None
+        if field == 'date':
+            return card['start_ordinal'] is not None
+        if field == 'index':
+            return card['index'] is not None
+        if field in ('project', 'context', 'special_kv_data'):
+            return card[field] is not None and len(card[field]) > 0
+        return True
+
+    def is_card_field_visible(self, card, field):
+        return getattr(self, self.CARD_FIELDS_VISIBILITY[field]) and self.has_card_field_data(card, field)
+
+    def create_card_field(self, card, field):
+        """Create the widgets showing one element of a task card, returns a
+            list of (widget, pack options) in packing order"""
+        ui_card = card['frame']
+        bg = card['bg']
+        widgets = []
+
+        if field == 'priority':
+            # A color border for priority marking
+            prio_color = self.get_priority_color_role(card['priority'])
+            important_border = tk.Frame(ui_card, width="3", name=self.get_card_widget_name(card))
+            self.theme_card_widget(important_border, bg=prio_color)
+            widgets.append((important_border, {'side': "left", 'fill': 'y'}))
             important_label = tk.Label(
                 ui_card,
-                text=priority,
-                fg=prio_color,
-                bg=ui_card['bg'],
+                text=card['priority'],
                 anchor=tk.W,
-                font=tkFont.Font(family='Ubuntu', size=self.card_font_size + 8, weight=tkFont.BOLD),
-                name=get_widget_name(name)
+                font=self.fonts['card-priority'],
+                name=self.get_card_widget_name(card)
             )
-            important_label.pack(side="left", anchor=tk.NW, padx=0, pady=(5,0))
-            bind_highlight_and_drag_n_drop(important_label)
-            subject_padx = 0
+            self.theme_card_widget(important_label, fg=prio_color, bg=bg)
+            widgets.append((important_label, {'side': "left", 'anchor': tk.NW, 'padx': 0, 'pady': (5,0)}))
 
-        if self.show_content:
+        elif field == 'content':
             card_label = tk.Label(
                 ui_card, 
-                text=subject, 
-                fg=self.COLORS['main-text'], 
-                bg=ui_card['bg'], 
+                text=card['subject'], 
                 anchor=tk.W, 
                 wraplength=200, 
                 justify='left',
                 # gwyrdh remove font size from self.card
                 #font=(font, self.card_font_size),
                 font=('Ubuntu',11),
-                name=get_widget_name(name)
+                name=self.get_card_widget_name(card)
             )
+            self.theme_card_widget(card_label, fg='main-text', bg=bg)
 
             # Adapt elide length when width change
             card_label.bind("<Configure>", self.on_card_width_changed)
-            bind_highlight_and_drag_n_drop(card_label)
-            card_label.pack(padx=subject_padx, pady=5, fill='x', side="top", anchor=tk.W)
-
-        # If needed, show the task duration
-        if start_date and self.show_date:
-            duration = 0
-            if not end_date:
-                end_date = self.current_date
-
-            duration = end_date.toordinal() - start_date.toordinal()
-            duration_string = "%d days" % (duration)
+            widgets.append((card_label, {'padx': 10, 'pady': 5, 'fill': 'x', 'side': "top", 'anchor': tk.W}))
 
+        elif field == 'date':
+            # The task duration
             duration_label = tk.Label(
                 ui_card, 
-                text = duration_string,
-                fg=self.COLORS[state], 
-                bg=ui_card['bg'], 
+                text = self.get_card_duration_string(card),
                 anchor=tk.W, 
                 justify='left',
-                font=("Ubuntu", self.card_font_size - 2),
+                font=self.fonts['card-small'],
                 wraplength=85,
-                name=get_widget_name(name)
+                name=self.get_card_widget_name(card)
             )
-            if (project or context) and (len(project) > 0 or len(context) > 0):
-                duration_label.pack(side="top", anchor=tk.NW, padx=10, pady=0)
+            self.theme_card_widget(duration_label, fg=f"column{self.COLUMNS_NAMES.index(card['state'])}", bg=bg)
+            if self.has_card_field_data(card, 'project') or self.has_card_field_data(card, 'context'):
+                widgets.append((duration_label, {'side': "top", 'anchor': tk.NW, 'padx': 10, 'pady': 0}))
             else:
-                duration_label.pack(side="top", anchor=tk.NW, padx=10, pady=(0,2))
-            bind_highlight_and_drag_n_drop(duration_label)
-
-        # Add project and context tags if needed
-        if project and len(project) > 0 and self.show_project:
-            project_string = ", ".join([p["project"] for p in project])
-            project_label = tk.Label(
-                ui_card, 
-                text=project_string, 
-                fg=self.COLORS["project"], 
-                bg=ui_card['bg'], 
-                anchor=tk.E,
-                name=get_widget_name(name),
+                widgets.append((duration_label, {'side': "top", 'anchor': tk.NW, 'padx': 10, 'pady': (0,2)}))
+
+        elif field in ('project', 'context', 'special_kv_data'):
+            # project, context and special k-v tags
+            if field == 'special_kv_data':
+                text = ", ".join([f"{special_kv_data_entry['key']}:{special_kv_data_entry['val']}" for
+                                  special_kv_data_entry in card[field]])
+                color = 'kv-data'
+                font = self.fonts['card-small']
+            else:
+                text = ", ".join([tag[field] for tag in card[field]])
+                color = field
                 # gwyrdh change to -1
-                font=('Ubuntu', self.card_font_size - 1),
-                wraplength=200,
-                justify='left',
-            )
-            project_label.pack(padx=10, pady=2, fill='x', side="top", anchor=tk.E)
-            bind_highlight_and_drag_n_drop(project_label)
-
-        if context and len(context) > 0 and self.show_context:
-            context_string = ", ".join([c["context"] for c in context])
-            context_label = tk.Label(
+                font = self.fonts['card-tag']
+            tags_label = tk.Label(
                 ui_card, 
-                text=context_string, 
-                fg=self.COLORS['context'], 
-                bg=ui_card['bg'], 
+                text=text, 
                 anchor=tk.E,
-                name=get_widget_name(name),
-                font=('Ubuntu', self.card_font_size - 1),
+                name=self.get_card_widget_name(card),
+                font=font,
                 wraplength=200,
                 justify='left',
             )
-            context_label.pack(padx=10, pady=2, fill='x', side="top", anchor=tk.E)
-            bind_highlight_and_drag_n_drop(context_label)
-
-        if special_kv_data is not None and len(special_kv_data) > 0 and self.show_special_kv_data:
-            special_kv_data_string = ", ".join([f"{special_kv_data_entry['key']}:{special_kv_data_entry['val']}" for
-                                                special_kv_data_entry in special_kv_data])
-            special_kv_entry_label = tk.Label(
-                ui_card,
-                text=special_kv_data_string,
-                fg=self.COLORS['kv-data'],
-                bg=ui_card['bg'],
-                anchor=tk.E,
-                name=get_widget_name(name),
-                font=('Ubuntu', self.card_font_size - 2),
-                wraplength=200,
-                justify='left',
-            )
-            special_kv_entry_label.pack(padx=10, pady=2, fill='x', side="top", anchor=tk.E)
-            bind_highlight_and_drag_n_drop(special_kv_entry_label)
-
-        if index is not None and self.show_index:
-            index_string = f"#{index}"
+            self.theme_card_widget(tags_label, fg=color, bg=bg)
+            if field != 'special_kv_data':
+                tags = list(dict.fromkeys(tag[field] for tag in card[field]))
+                LazyTooltip(tags_label, lambda tags=tags: '\n'.join(self.board_stats.get_tag_text(tag) for tag in tags))
+            widgets.append((tags_label, {'padx': 10, 'pady': 2, 'fill': 'x', 'side': "top", 'anchor': tk.E}))
+
+        elif field == 'index':
+            index_string = f"#{card['display_index'] if card['id'] is None else card['id']}"
             index_va = tk.StringVar(value=index_string)
             index_label = tk.Entry(
                 ui_card,
-                fg=self.COLORS['kv-data'],
-                bg=ui_card['bg'],
-                name=get_widget_name(name),
-                font=('Ubuntu', self.card_font_size - 2),
+                name=self.get_card_widget_name(card),
+                font=self.fonts['card-small'],
                 textvariable=index_va,
                 borderwidth=0,
                 state="readonly",
-                readonlybackground=ui_card['bg'],
             )
-            index_label.pack(padx=0, pady=2, side="top", anchor=tk.W)
+            self.theme_card_widget(index_label, fg='kv-data', bg=bg, readonlybackground=bg)
+            widgets.append((index_label, {'padx': 0, 'pady': 2, 'side': "top", 'anchor': tk.W}))
+            return widgets
+
+        for widget, pack_options in widgets:
+            self.bind_highlight_and_drag_n_drop(widget)
+        return widgets
+
+    def layout_card_fields(self, card):
+        """Pack the visible elements of a card in order, creating the widgets
+            of an element the first time it is shown"""
+        visible_fields = [field for field in self.CARD_FIELDS if self.is_card_field_visible(card, field)]
+
+        for field_widgets in card['fields'].values():
+            for widget, pack_options in field_widgets:
+                widget.pack_forget()
+
+        for field in visible_fields:
+            if field not in card['fields']:
+                card['fields'][field] = self.create_card_field(card, field)
+            for widget, pack_options in card['fields'][field]:
+                if field == 'content' and 'priority' in visible_fields:
+                    pack_options = dict(pack_options, padx=0)
+                widget.pack(**pack_options)
+
+    def draw_card(self, card):
+        """Create the widgets of a task card from its parsed data"""
+        card['widget_counter'] = 0
+        card['fields'] = {}
+
+        # Create the card frame
+        ui_card_highlight = tk.Frame(self.get_card_parent(card), bd=2, height=200, name="highlightFrame"+card['name'])
+        is_selected = card['index'] + 1 - self.editor_window_start in self.selected_lines
+        self.theme_card_widget(ui_card_highlight, bg='context' if is_selected else 'column1-column')
+        ui_card = tk.Frame(ui_card_highlight, bd=0, height=200, cursor='hand2', name=self.get_card_widget_name(card))
+        self.theme_card_widget(ui_card, bg=card['bg'])
+        card['highlight'] = ui_card_highlight
+        card['frame'] = ui_card
+
+        self.layout_card_fields(card)
 
         ui_card.pack(padx=1, pady=(0, 10), side="top", fill='x', expand=1, anchor=tk.NW)
-        ui_card_highlight.pack(padx=0, pady=(0, 1), side="top", fill='x', expand=1, anchor=tk.NW)
-        bind_highlight_and_drag_n_drop(ui_card)
+        ui_card_highlight.pack(**self.CARD_PACK_OPTIONS)
+        self.bind_highlight_and_drag_n_drop(ui_card)
 
+        self.cards[card['name']] = card
         return ui_card
 
+    def relayout_cards(self, fields):
+        """Show or hide some elements on the existing cards"""
+        for card in self.cards.values():
+            if 'highlight' not in card:
+                continue
+            for field in fields:
+                if self.has_card_field_data(card, field):
+                    self.layout_card_fields(card)
+                    break
+
+    def sort_cards(self):
+        """Reorder the existing cards in their columns without recreating them,
+            only the cards now among the first ones of a column are drawn"""
+        for card in self.cards.values():
+            card['sort_key'] = self.sort_key(card)
+        for cards in self.column_cards.values():
+            cards.sort(key=get_card_sort_key, reverse=self.sort_reverse)
+        for group in self.grouping.groups.values():
+            for cards in group.values():
+                cards.sort(key=get_card_sort_key, reverse=self.sort_reverse)
+        for column_name in self.column_cards:
+            self.layout_column_cards(column_name)
+
+    def layout_column_cards(self, column_name):
+        """Pack the shown cards of a column in order, drawing the missing ones
+            and destroying the widgets of the others. With swimlanes, the
+            column of each expanded lane is laid out."""
+        for lane in self.get_expanded_lanes():
+            cards = self.get_cell_cards(column_name, lane)
+            shown_cards_number = self.get_shown_cards_number(column_name, lane)
+            for card in cards[shown_cards_number:]:
+                if 'highlight' in card:
+                    self.undraw_card(card)
+            for card in cards[:shown_cards_number]:
+                if 'highlight' in card:
+                    card['highlight'].pack_forget()
+            for card in cards[:shown_cards_number]:
+                if 'highlight' in card:
+                    card['highlight'].pack(**self.CARD_PACK_OPTIONS)
+                else:
+                    self.draw_card(card)
+        self.update_show_more_button(column_name)
+
+    def toggle_column_collapse(self, column_index):
+        """Collapse a column to its title, destroying its cards, or expand it"""
+        column_name = self.COLUMNS_NAMES[column_index]
+        self.collapsed_columns[column_index] = not self.collapsed_columns[column_index]
+        self.store_in_config(self.CONFIG_KEY_COLLAPSED_COLUMNS, list(self.collapsed_columns))
+        self.save_config_file()
+        self.layout_column_cards(column_name)
+        self.update_column_title(column_name)
+        if not self.collapsed_columns[column_index]:
+            self.update_editor_line_colors()
+
+    def update_column_title(self, column_name):
+        """The name of a column, with its number of tasks when it is collapsed"""
+        column_index = self.COLUMNS_NAMES.index(column_name)
+        if self.collapsed_columns[column_index]:
+            text = f"\u25b8 {column_name} ({self.board_stats.columns.get(column_name, 0)})"
+        else:
+            text = f"\u25be {column_name}"
+        self.ui_columns[column_name].title.configure(text=text)
+
+    def get_shown_cards_number(self, column_name, lane=None):
+        """Number of cards drawn at most in a column, the next ones are shown
+            with the show more button. With swimlanes, all the cards of the
+            expanded lanes are drawn."""
+        if self.collapsed_columns[self.COLUMNS_NAMES.index(column_name)]:
+            return 0
+        if self.swimlanes:
+            return sys.maxsize if lane in (self.expanded_lanes or ()) else 0
+        limit = self.column_card_limits[self.COLUMNS_NAMES.index(column_name)]
+        if limit <= 0:
+            return sys.maxsize
+        return self.shown_cards_numbers.get(column_name, limit)
+
+    def show_more_cards(self, column_name):
+        """Draw the next page of cards of a column"""
+        column_index = self.COLUMNS_NAMES.index(column_name)
+        if self.collapsed_columns[column_index]:
+            return
+        limit = self.column_card_limits[column_index]
+        self.shown_cards_numbers[column_name] = self.get_shown_cards_number(column_name) + limit
+        self.draw_shown_cards(column_name)
+
+    def draw_shown_cards(self, column_name, lane=None):
+        """Draw the cards of a column missing among the shown ones, and hide
+            the first card past them"""
+        cards = self.get_cell_cards(column_name, lane)
+        shown_cards_number = self.get_shown_cards_number(column_name, lane)
+        for card in cards[:shown_cards_number]:
+            # the drawn cards are packed in order, a missing card goes after them
+            if 'highlight' not in card:
+                self.draw_card(card)
+        for card in cards[shown_cards_number:shown_cards_number + 1]:
+            if 'highlight' in card:
+                self.undraw_card(card)
+        self.update_show_more_button(column_name)
+
+    def update_show_more_button(self, column_name):
+        ui_column = self.ui_columns[column_name]
+        is_collapsed = self.collapsed_columns[self.COLUMNS_NAMES.index(column_name)]
+        hidden_cards_number = len(self.column_cards[column_name]) - self.get_shown_cards_number(column_name)
+        if hidden_cards_number <= 0 or self.swimlanes or is_collapsed:
+            ui_column.show_more_button.pack_forget()
+            return
+        page = min(hidden_cards_number, self.column_card_limits[self.COLUMNS_NAMES.index(column_name)])
+        ui_column.show_more_button.winfo_children()[0].config(text=f"Show {page} more ({hidden_cards_number} hidden)")
+        ui_column.show_more_button.pack(side='top', fill='x', pady=(0, 10))
+
+    def get_card_position(self, card, cards):
+        """Index where to insert a card in the sorted cards of a column"""
+        card_key = card['sort_key']
+        for position, other_card in enumerate(cards):
+            other_key = other_card['sort_key']
+            # like a stable sort, equal keys stay in the order of the lines
+            if card_key == other_key:
+                if card['index'] < other_card['index']:
+                    return position
+            elif (card_key > other_key) == self.sort_reverse:
+                return position
+        return len(cards)
+
+    def update_sort_key(self):
+        """Set the key function and direction of the chosen sort"""
+        if self.sort_method_idx == CUSTOM_SORT_METHOD:
+            self.sort_key = compile_custom_sort(self.custom_sort)
+            self.sort_reverse = False
+        else:
+            sort_method = SORT_METHODS[self.sort_method_idx]
+            self.sort_key = sort_method['f']
+            self.sort_reverse = sort_method['rev']
+
+    def insert_card(self, card):
+        """Put a card at its sorted position in its column, drawing it if it
+            is among the shown cards of the column"""
+        cards = self.column_cards[card['state']]
+        position = self.get_card_position(card, cards)
+        cards.insert(position, card)
+        self.cards[card['name']] = card
+        lane = self.get_card_lane(card)
+        if self.swimlanes:
+            cards = self.grouping.get_cards(lane, card['state'])
+            position = self.get_card_position(card, cards)
+            cards.insert(position, card)
+            if lane in self.lane_widgets:
+                self.update_lane_title(lane)
+            else:
+                self.draw_lane(lane)
+                self.layout_lanes()
+        if position >= self.get_shown_cards_number(card['state'], lane):
+            if 'highlight' in card:
+                self.undraw_card(card)
+        else:
+            if 'highlight' not in card:
+                self.draw_card(card)
+            if position + 1 < len(cards) and 'highlight' in cards[position + 1]:
+                card['highlight'].pack(**self.CARD_PACK_OPTIONS, before=cards[position + 1]['highlight'])
+            elif position > 0:
+                card['highlight'].pack(**self.CARD_PACK_OPTIONS, after=cards[position - 1]['highlight'])
+        self.draw_shown_cards(card['state'], lane)
+
+    def forget_card_widgets(self, widgets):
+        for widget in widgets:
+            self.themed_card_widgets.pop(str(widget), None)
+            if widget is self.selected_task_card:
+                self.selected_task_card = None
+            widget.destroy()
+
+    def undraw_card(self, card):
+        """Destroy the widgets of a card, keeping its data"""
+        field_widgets = [widget for widgets in card['fields'].values() for widget, pack_options in widgets]
+        self.forget_card_widgets(field_widgets + [card['frame'], card['highlight']])
+        for key in ('widget_counter', 'fields', 'highlight', 'frame'):
+            del card[key]
+
+    def destroy_card(self, card):
+        self.column_cards[card['state']].remove(card)
+        del self.cards[card['name']]
+        lane = self.get_card_lane(card)
+        if self.swimlanes:
+            self.grouping.remove(card)
+        if 'highlight' in card:
+            self.undraw_card(card)
+        if self.swimlanes and self.grouping.count(lane) == 0:
+            self.destroy_lane(lane)
+            return
+        self.draw_shown_cards(card['state'], lane)
+        if self.swimlanes:
+            self.update_lane_title(lane)
+
+    def get_card_lane(self, card):
+        """The swimlane of a card, None without swimlanes"""
+        return self.grouping.get_key(card) if self.swimlanes else None
+
+    def get_cell_cards(self, column_name, lane=None):
+        """The sorted cards of a column, or of a column in a swimlane"""
+        if self.swimlanes:
+            return self.grouping.get_cards(lane, column_name)
+        return self.column_cards[column_name]
+
+    def get_card_parent(self, card):
+        """The frame the widgets of a card are drawn in"""
+        if self.swimlanes:
+            return self.lane_widgets[self.get_card_lane(card)]['cells'][card['state']]
+        return self.ui_columns[card['state']].content
+
+    def get_expanded_lanes(self):
+        """The swimlanes showing their cards, [None] for the board without
+            swimlanes"""
+        if not self.swimlanes:
+            return [None]
+        return [lane for lane, lane_widgets in self.lane_widgets.items() if lane_widgets['cells'] is not None]
+
+    def draw_lanes(self, cards):
+        """Group the sorted cards by tag and draw a swimlane for each tag,
+            only the expanded swimlanes draw their cards"""
+        self.grouping.build(cards, self.COLUMNS_NAMES)
+        lanes = self.grouping.get_sorted_keys()
+        if self.expanded_lanes is None:
+            self.expanded_lanes = set(lanes[:self.EXPANDED_LANES_NUMBER])
+        for lane in lanes:
+            self.draw_lane(lane)
+        self.layout_lanes()
+
+    def draw_lane(self, lane):
+        title = tk.Label(self.lanes_frame, anchor=tk.W, font=('Ubuntu', 14), cursor='hand2')
+        self.theme_card_widget(title, fg='main-text', bg='main-background')
+        title.bind('<Button-1>', lambda event, lane=lane: self.toggle_lane(lane))
+        self.lane_widgets[lane] = {'title': title, 'cells': None}
+        self.update_lane_title(lane)
+        if lane in self.expanded_lanes:
+            self.draw_lane_cells(lane)
+
+    def draw_lane_cells(self, lane):
+        """Create the column frames of a swimlane and draw its cards"""
+        cells = {}
+        for idx, column_name in enumerate(self.COLUMNS_NAMES):
+            cells[column_name] = self.theme_card_widget(tk.Frame(self.lanes_frame, height=0), bg=f'column{idx}-column')
+        self.lane_widgets[lane]['cells'] = cells
+        for column_name in self.COLUMNS_NAMES:
+            self.draw_shown_cards(column_name, lane)
+
+    def layout_lanes(self):
+        """Grid the swimlanes in the order of their tags"""
+        for row, lane in enumerate(self.grouping.get_sorted_keys()):
+            lane_widgets = self.lane_widgets[lane]
+            lane_widgets['title'].grid(row=2 * row, column=0, columnspan=len(self.COLUMNS_NAMES), padx=10, pady=(10, 2), sticky='we')
+            if lane_widgets['cells'] is not None:
+                for column_number, cell in enumerate(lane_widgets['cells'].values()):
+                    cell.grid(row=2 * row + 1, column=column_number, padx=10, sticky='nwe', ipadx=10, ipady=5)
+
+    def update_lane_title(self, lane):
+        """The tag of a swimlane, with its number of tasks"""
+        arrow = '\u25be' if lane in self.expanded_lanes else '\u25b8'
+        name = lane or f"(no {self.swimlanes})"
+        self.lane_widgets[lane]['title'].configure(text=f"{arrow} {name} ({self.grouping.count(lane)})")
+
+    def toggle_lane(self, lane):
+        """Collapse a swimlane to its title, destroying its cards, or expand it"""
+        if lane in self.expanded_lanes:
+            self.expanded_lanes.discard(lane)
+            self.collapse_lane(lane)
+        else:
+            self.expanded_lanes.add(lane)
+            self.draw_lane_cells(lane)
+            self.layout_lanes()
+            self.update_editor_line_colors()
+        self.update_lane_title(lane)
+
+    def collapse_lane(self, lane):
+        """Destroy the cards and column frames of a swimlane"""
+        cells = self.lane_widgets[lane]['cells']
+        if cells is None:
+            return
+        for column_name in self.COLUMNS_NAMES:
+            for card in self.grouping.get_cards(lane, column_name):
+                if 'highlight' in card:
+                    self.undraw_card(card)
+        self.forget_card_widgets(cells.values())
+        self.lane_widgets[lane]['cells'] = None
+
+    def destroy_lane(self, lane):
+        """Remove a swimlane without task left"""
+        self.collapse_lane(lane)
+        self.forget_card_widgets([self.lane_widgets.pop(lane)['title']])
+        self.grouping.discard(lane)
+        self.layout_lanes()
+
+    @profiled('patch')
+    def patch_cards(self, replaced_lines):
+        """Update the cards of the given editor lines (number: new text) in
+            place. Returns False, without changing anything, if the kanban has
+            to be reloaded instead because a task line appeared or disappeared"""
+        for line, text in replaced_lines.items():
+            if not text or self.get_line_card(line) is None:
+                return False
+
+        self.profiler.lap('patch cards')
+        for line, text in replaced_lines.items():
+            card = self.get_line_card(line)
+            new_card = self.create_card_data(card['index'], text)
+            new_card['display_index'] = card['display_index']
+            new_card['id'] = card['id']
+            if self.stable_ids:
+                self.task_ids.replace(card['display_index'], text)
+                new_card['id'] = self.task_ids.get_id(card['display_index'])
+            if (card['start_ordinal'], card['end_ordinal']) != (new_card['start_ordinal'], new_card['end_ordinal']):
+                self.date_index.remove(card)
+                self.date_index.add(new_card)
+            self.board_stats.remove(card)
+            self.board_stats.add(new_card)
+            if self.tag_trie is not None:
+                self.tag_trie.remove_card(card)
+                self.tag_trie.add_card(new_card)
+
+            if new_card['state'] != card['state'] or self.get_card_lane(new_card) != self.get_card_lane(card):
+                # widgets can't move to another parent, the card is recreated in its new column or lane
+                self.destroy_card(card)
+                self.insert_card(new_card)
+            else:
+                # restyle the card and move it if its sort position changed
+                self.column_cards[card['state']].remove(card)
+                if self.swimlanes:
+                    self.grouping.remove(card)
+                if 'highlight' in card:
+                    field_widgets = [widget for widgets in card['fields'].values() for widget, pack_options in widgets]
+                    self.forget_card_widgets(field_widgets)
+                    for key in ('widget_counter', 'highlight', 'frame'):
+                        new_card[key] = card[key]
+                    new_card['fields'] = {}
+                    self.layout_card_fields(new_card)
+                self.insert_card(new_card)
+
+        self.profiler.lap('progress bars')
+        self.update_progress_bars(self.board_stats.columns)
+        self.profiler.lap('editor colors')
+        self.update_editor_lines_colors(replaced_lines)
+        return True
+
+    def refresh_after_edit(self, transaction):
+        """Show the edits of a committed transaction on the kanban and save"""
+        is_replacing_only = not (transaction.deleted_lines or transaction.inserted_lines or transaction.appended_lines)
+        if not is_replacing_only or not self.patch_cards(transaction.replaced_lines):
+            self.reload_and_save()
+            return
+
+        if self.filter is not None:
+            self.non_filtered_content = self.merge_filtered_with_original()
+        else:
+            self.non_filtered_content = self.get_document_text()
+        if self.file:
+            self.fwrite(self.file, self.non_filtered_content)
+
     def on_control_scroll(self, event):
-        delta = (event.delta/120)
-        new_font_size = self.card_font_size + int(delta)
+        # accumulate the wheel deltas so that high resolution wheels and
+        # touchpads, sending small deltas, zoom continuously as well
+        self.zoom_delta += event.delta / 120
+        delta = int(self.zoom_delta)
+        self.zoom_delta -= delta
+        new_font_size = self.card_font_size + delta
         if new_font_size <= 4:
             new_font_size = 4
         if new_font_size != self.card_font_size:
             self.card_font_size = new_font_size
-            self.reload_ui_from_text()
+            self.update_card_fonts()
             self.store_in_config(self.CONFIG_KEY_FONT_SIZE, new_font_size)
             self.save_config_file()
         return "break"
 
     def open_file_dialog(self, event=None):
         """Open a dialog to select a file to load"""
+        from tkinter import filedialog
         self.file = filedialog.askopenfilename(
             initialdir='.', 
             filetypes=[("todo list file", "*todo.txt"), ("txt file", "*.txt")],
             title='Choose a todo list to display')
         self.load_txt_file()
 
+    @profiled('filter')
     def apply_filter(self, event=None):
-        self.filter_frame.configure(bg=self.COLORS['project'])
-        self.clear_filter_button.configure(bg='red')
+        self.profiler.lap('filter')
+        self.clear_task_selection()
+        self.theme_widget(self.filter_frame, bg='project')
+        self.theme_widget(self.clear_filter_button, bg='red')
         self.filter = self.filter_entry_box.get()
         non_filtered_lines = self.non_filtered_content.split('\n')
         self.non_filtered_content_line_mapping = []
@@ -1870,6 +4779,7 @@ class KanbanTxtViewer:
 
         filtered_text = '\n'.join(filtered_content)
         self.reload_ui_from_text(filtered_text, f"KanbanTxt - {pathlib.Path(self.file).name} !! FILTER VIEW ACTIVE !!")
+        self.profiler.lap('filter')
         self.text_editor.edit_reset()
         self.text_editor.mark_set('insert', "1.0")
         self.schedule_update_of_editor_line_colors()
@@ -1884,6 +4794,7 @@ class KanbanTxtViewer:
                 widget.config(state='disabled')
 
     def clear_filter(self):
+        self.clear_task_selection()
         self.non_filtered_content = self.merge_filtered_with_original()
         self.filter = None
         if self.filter_view_message is not None:
@@ -1895,8 +4806,8 @@ class KanbanTxtViewer:
             else:
                 widgets.config(state='disabled')
 
-        self.filter_frame.configure(bg=self.COLORS['editor-background'])
-        self.clear_filter_button.configure(bg=self.COLORS['main-text'])
+        self.theme_widget(self.filter_frame, bg='editor-background')
+        self.theme_widget(self.clear_filter_button, bg='main-text')
 
         if self.non_filtered_content is not None:
             editor_insert_address = self.text_editor.index(tk.INSERT)
@@ -1906,7 +4817,7 @@ class KanbanTxtViewer:
             line_number_to_select = 0
             if self.non_filtered_content_line_mapping is not None and selected_line <= len(self.non_filtered_content_line_mapping):
                 line_number_to_select = self.non_filtered_content_line_mapping[selected_line-1]
-            self.text_editor.mark_set('insert', f"{line_number_to_select + 1}.0")
+            self.text_editor.mark_set('insert', f"{self.show_document_line(line_number_to_select + 1)}.0")
             self.schedule_update_of_editor_line_colors(None)
             self.text_editor.see('insert')
             self.reload_and_save()
@@ -1924,25 +4835,151 @@ class KanbanTxtViewer:
                 non_filtered_content[target_index] = filtered_content[i]
         return '\n'.join(non_filtered_content)
 
-    def load_txt_file(self):
+    def load_txt_file(self, defer_board=False):
+        """Load the file in the editor and the kanban. With defer_board, only
+            the editor is filled and the cards are left for later"""
         if os.path.isfile(self.file):
+            self.clear_task_selection()
+            # the identifiers and pages shown of the previous file don't apply to this one
+            self.task_ids = TaskIdIndex()
+            self.shown_cards_numbers = {}
+            self.expanded_lanes = None
+            # the editor window starts on the last lines, with the cursor
+            self.editor_window_start = sys.maxsize
             content = self.fread(self.file)
+            self.load_parse_cache(content)
             title = f"KanbanTxt - {pathlib.Path(self.file).name}"
             self.non_filtered_content = content
-            self.reload_ui_from_text(content, title)
-    
-    def reload_ui_from_text(self, text=None, title=None):
-        if text is None:
-            text = self.text_editor.get("1.0", "end-1c")
+            if defer_board:
+                self.set_editor_text(content)
+                self.main_window.title(title)
+                self.board_pending = True
+            else:
+                self.reload_ui_from_text(content, title)
+
+    def load_parse_cache(self, content):
+        """Take the lines parsed in a previous run of the file being loaded"""
+        self.save_parse_cache()
+        PREPARSED_TASKS.clear()
+        PREPARSED_TASKS.update(self.parse_cache.load(self.file, content))
+        self.parse_cache_file = self.file
+
+    def save_parse_cache(self):
+        if self.parse_cache_file is not None and os.path.isfile(self.parse_cache_file):
+            self.parse_cache.save(self.parse_cache_file)
+
+    def set_editor_text(self, text):
+        """Put a text in the editor. In the windowed editor mode, a large text
+            is kept in document_lines and only the lines of the current window
+            are put in the editor"""
+        if self.windowed_editor and self.filter is None and text.count('\n') >= self.WINDOWED_EDITOR_MIN_LINES:
+            self.document_lines = text.split('\n')
+            self.editor_window_start = self.get_editor_window_start(self.editor_window_start)
+            lines = self.document_lines[self.editor_window_start:self.editor_window_start + self.EDITOR_WINDOW_LINES]
+            self.editor_window_length = len(lines)
+            text = '\n'.join(lines)
+        else:
+            self.document_lines = None
+            self.editor_window_start = 0
         self.text_editor.delete('1.0', 'end')
         self.text_editor.insert(tk.INSERT, text)
+        # the tags of the selected tasks went with the previous text
+        for line in self.selected_lines:
+            self.text_editor.tag_add('selected_task', f"{line}.0", f"{line}.0 lineend +1c")
         self.text_editor.focus()
         self.text_editor.mark_set('insert', 'end')
         self.text_editor.see('insert')
+
+    def get_document_text(self):
+        """The whole text being edited, with the edits of the editor window"""
+        if self.document_lines is None:
+            return self.text_editor.get("1.0", "end-1c")
+        self.sync_editor_window()
+        return '\n'.join(self.document_lines)
+
+    def sync_editor_window(self):
+        """Put the lines of the editor window back in document_lines"""
+        lines = self.text_editor.get("1.0", "end-1c").split('\n')
+        self.document_lines[self.editor_window_start:self.editor_window_start + self.editor_window_length] = lines
+        self.editor_window_length = len(lines)
+
+    def get_editor_window_start(self, start):
+        return max(0, min(start, len(self.document_lines) - self.EDITOR_WINDOW_LINES))
+
+    def move_editor_window(self, start):
+        """Put the window of lines of the document beginning at the start
+            index in the editor. The edits are kept, as well as the cursor,
+            the selected tasks and the top visible line when they are still
+            in the window. The undo history is cleared, its positions being
+            those of the previous window."""
+        start = self.get_editor_window_start(start)
+        if start == self.editor_window_start:
+            return
+        previous_start = self.editor_window_start
+        self.sync_task_selection()
+        selected_lines = {line + previous_start for line in self.selected_lines}
+        top_line = int(self.text_editor.index('@0,0').split('.')[0]) + previous_start
+        cursor_line, cursor_column = [int(i) for i in self.text_editor.index(tk.INSERT).split('.')]
+        cursor_line += previous_start
+        self.sync_editor_window()
+
+        lines = self.document_lines[start:start + self.EDITOR_WINDOW_LINES]
+        self.editor_window_start = start
+        self.editor_window_length = len(lines)
+        self.selected_lines = {line - start for line in selected_lines if 0 < line - start <= len(lines)}
+        if self.selection_anchor is not None:
+            self.selection_anchor += previous_start - start
+        self.text_editor.delete('1.0', 'end')
+        self.text_editor.insert('1.0', '\n'.join(lines))
+        for line in self.selected_lines:
+            self.text_editor.tag_add('selected_task', f"{line}.0", f"{line}.0 lineend +1c")
+        self.text_editor.edit_reset()
+        cursor_line = min(max(cursor_line - start, 1), len(lines))
+        self.text_editor.mark_set('insert', f"{cursor_line}.{cursor_column}")
+        self.text_editor.yview(f"{min(max(top_line - start, 1), len(lines))}.0")
+        self.update_editor_line_colors()
+
+    def show_document_line(self, line):
+        """The editor line of a line number of the document, the editor
+            window being moved around it if it is out of the window"""
+        if self.document_lines is not None and not 0 < line - self.editor_window_start <= self.editor_window_length:
+            self.move_editor_window(line - 1 - self.EDITOR_WINDOW_LINES // 2)
+        return line - self.editor_window_start
+
+    def get_line_card(self, line):
+        """The card of an editor line, None if it is not a task"""
+        return self.cards.get(f"task#{line + self.editor_window_start}")
+
+    def on_editor_scrolled(self, first, last):
+        """Page the next lines of the document in when the editor window is
+            scrolled to its top or bottom"""
+        if self.document_lines is None or self.editor_paging_id is not None:
+            return
+        window_end = self.editor_window_start + self.editor_window_length
+        if (float(first) <= 0 and self.editor_window_start > 0) or (float(last) >= 1 and window_end < len(self.document_lines)):
+            self.editor_paging_id = self.main_window.after_idle(self.page_editor_window)
+
+    def page_editor_window(self):
+        self.editor_paging_id = None
+        if self.document_lines is None:
+            return
+        first, last = self.text_editor.yview()
+        if first <= 0:
+            self.move_editor_window(self.editor_window_start - self.EDITOR_PAGE_LINES)
+        elif last >= 1:
+            self.move_editor_window(self.editor_window_start + self.EDITOR_PAGE_LINES)
+    
+    @profiled('reload')
+    def reload_ui_from_text(self, text=None, title=None):
+        self.profiler.lap('editor')
+        if text is None:
+            text = self.get_document_text()
+        self.set_editor_text(text)
         todo_cards = self.parse_todo_txt(text)
         if title is not None:
             self.main_window.title(title)
 
+    @profiled('save')
     def reload_and_save(self, event=None):
         """Reload the kanban and save the editor content in the current todo.txt
             file """
@@ -1952,10 +4989,12 @@ class KanbanTxtViewer:
         if was_filter_active:
             self.clear_filter()
 
-        self.non_filtered_content = self.text_editor.get("1.0", "end-1c")
+        self.non_filtered_content = self.get_document_text()
 
         if self.file:
+            self.profiler.lap('write')
             self.fwrite(self.file, self.non_filtered_content)
+            self.profiler.lap(None)
 
         if was_filter_active:
             self.apply_filter()
@@ -1970,6 +5009,7 @@ class KanbanTxtViewer:
         """In case no file were open, open a dialog to choose where to save the 
             current data"""
         if not os.path.isfile(self.file):
+            from tkinter import filedialog
             new_file = filedialog.asksaveasfile(
                 initialdir='.',
                 defaultextension='.todo.txt',
@@ -2003,11 +5043,14 @@ class KanbanTxtViewer:
     def hide_content(self):
         self.progress_bar.pack_forget()
         self.kanban_frame.pack_forget()
+        self.lanes_frame.pack_forget()
 
 
     def display_content(self):
         self.progress_bar.pack(side='top', fill='x', padx=10, pady=10)
         self.kanban_frame.pack(fill='both')
+        if self.swimlanes:
+            self.lanes_frame.pack(fill='both')
 
 
     def on_card_width_changed(self, event):
@@ -2038,54 +5081,150 @@ class KanbanTxtViewer:
         self.content_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
 
     def on_switch_darkmode(self, event):
-        """Switch from light and dark mode, destroy the UI and recreate it to
-            apply the modification"""
-        if self.filter is not None:
-            return
-        self.darkmode = not self.darkmode
-        self.recreate_main_window()
-
-    def recreate_main_window(self):
-        window_geometry = self.main_window.geometry()
-        window_state = self.main_window.state()
-        width, height, x, y = re.split("[x+]", window_geometry)
-
-        self.main_window.destroy()
-        self.draw_ui(int(width), int(height), int(x), int(y))
-        self.main_window.state(window_state)
+        """Cycle through the themes, restyling the existing widgets in place"""
+        theme_names = list(self.THEMES.keys())
+        next_theme_idx = (theme_names.index(self.theme_name) + 1) % len(theme_names)
+        self.apply_theme(theme_names[next_theme_idx])
         self.store_in_config(self.CONFIG_KEY_DARKMODE, self.darkmode)
+        self.store_in_config(self.CONFIG_KEY_THEME, self.theme_name)
         self.save_config_file()
 
+    def on_editor_click(self, event=None):
+        if not event.state & (self.EVENT_STATE_SHIFT | self.EVENT_STATE_CONTROL):
+            self.clear_task_selection()
+        self.schedule_update_of_editor_line_colors(event)
+
+    def on_editor_control_click(self, event):
+        """Add the clicked line to the selection of tasks, or remove it"""
+        line = int(self.text_editor.index(f"@{event.x},{event.y}").split('.')[0])
+        self.selection_anchor = line
+        self.sync_task_selection()
+        self.set_task_selection(self.selected_lines ^ {line})
+        self.text_editor.mark_set('insert', f"{line}.end")
+        self.schedule_update_of_editor_line_colors(event)
+        return "break"
+
+    def set_task_selection(self, lines):
+        lines = set(lines)
+        changed_lines = self.selected_lines ^ lines
+        self.selected_lines = lines
+        for line in changed_lines:
+            self.show_task_selection(line)
+
+    def clear_task_selection(self):
+        self.selection_anchor = None
+        if self.selected_lines:
+            self.set_task_selection(set())
+
+    def show_task_selection(self, line):
+        if line in self.selected_lines:
+            self.text_editor.tag_add('selected_task', f"{line}.0", f"{line}.0 lineend +1c")
+        else:
+            self.text_editor.tag_remove('selected_task', f"{line}.0", f"{line}.0 lineend +1c")
+        card = self.get_line_card(line)
+        if card is not None and 'highlight' in card:
+            self.theme_card_widget(card['highlight'], bg=self.get_card_highlight_role(card['highlight']))
+
+    def sync_task_selection(self):
+        """Update the selected lines from the editor tags, which follow the
+            lines when the text is edited"""
+        lines = set()
+        ranges = self.text_editor.tag_ranges('selected_task')
+        for start, end in zip(ranges[0::2], ranges[1::2]):
+            first_line = int(str(start).split('.')[0])
+            last_line, last_column = [int(i) for i in str(end).split('.')]
+            if last_column == 0:
+                last_line -= 1
+            lines.update(range(first_line, last_line + 1))
+        self.selected_lines = lines
+
+    def get_card_highlight_role(self, highlight_frame):
+        if highlight_frame is self.selected_task_card:
+            return 'project'
+        if self.get_card_frame_line(highlight_frame) - self.editor_window_start in self.selected_lines:
+            return 'context'
+        return 'column3-column'
+
+    def get_card_frame_line(self, highlight_frame):
+        """Line number of the task of a card in the document"""
+        return int(highlight_frame.winfo_name().replace("highlightFrametask#", ""))
+
+    def get_selected_lines(self):
+        """Numbers of the editor lines the task actions apply to: the selected
+            tasks and the lines of the selected text, or the current line"""
+        self.sync_task_selection()
+        lines = set(self.selected_lines)
+        if self.text_editor.tag_ranges(tk.SEL):
+            first_line = int(self.text_editor.index(tk.SEL_FIRST).split('.')[0])
+            last_line, last_column = [int(i) for i in self.text_editor.index(tk.SEL_LAST).split('.')]
+            if last_column == 0 and last_line > first_line:
+                last_line -= 1
+            if last_line > first_line:
+                lines.update(range(first_line, last_line + 1))
+        if not lines:
+            lines.add(int(self.text_editor.index(tk.INSERT).split('.')[0]))
+        return sorted(lines)
+
+    def edit_transaction(self, reload=True):
+        """Start a batch of line edits of the document, see EditTransaction"""
+        return EditTransaction(self, reload)
+
+    def apply_to_selected_lines(self, transform, reload=True):
+        """Replace each selected line by transform(line) and reload the kanban
+            and save once for all of them"""
+        lines = self.get_selected_lines()
+        with self.edit_transaction(reload) as transaction:
+            for line in lines:
+                task = transaction.get_line(line)
+                # blank lines are not tasks, but a single one can be turned into a task
+                if len(lines) > 1 and not task.strip():
+                    continue
+                transaction.replace_line(line, transform(task))
+
+    def swap_lines(self, first_line, second_line):
+        """Exchange two lines of the editor, without refreshing the kanban"""
+        with self.edit_transaction(reload=False) as transaction:
+            first_text = transaction.get_line(first_line)
+            transaction.replace_line(first_line, transaction.get_line(second_line))
+            transaction.replace_line(second_line, first_text)
+
     def move_line_up(self, event=None):
         if self.filter is not None:
             return
-        current_line = self.text_editor.get("insert linestart", "insert lineend")
-        self.text_editor.delete("insert linestart", "insert lineend + 1c")
-        self.text_editor.insert("insert linestart -1l", current_line + '\n')
+        line = int(self.text_editor.index(tk.INSERT).split('.')[0])
+        if line > 1:
+            self.swap_lines(line - 1, line)
+        # with the shortcut, the key binding of the editor moves the cursor up too
         if event:
-            self.text_editor.mark_set('insert', 'insert linestart -1l')
+            self.text_editor.mark_set('insert', f"{line}.0")
         else:
-            self.text_editor.mark_set('insert', 'insert linestart -2l')
+            self.text_editor.mark_set('insert', f"{max(line - 1, 1)}.0")
 
         self.update_editor_line_colors()
 
     def move_line_down(self, event=None):
         if self.filter is not None:
             return
-        current_line = self.text_editor.get("insert linestart", "insert lineend")
-        self.text_editor.delete("insert linestart", "insert lineend + 1c")
-        self.text_editor.insert("insert linestart +1l", current_line + '\n')
+        line = int(self.text_editor.index(tk.INSERT).split('.')[0])
+        last_line = int(self.text_editor.index('end-1c').split('.')[0])
+        if line < last_line:
+            self.swap_lines(line, line + 1)
+        # with the shortcut, the key binding of the editor moves the cursor down too
         if event:
-            self.text_editor.mark_set('insert', 'insert lineend')
+            self.text_editor.mark_set('insert', f"{line}.end")
         else:
-            self.text_editor.mark_set('insert', 'insert lineend +1l')
+            self.text_editor.mark_set('insert', f"{min(line + 1, last_line)}.end")
 
         self.update_editor_line_colors()
 
     def remove_line(self, event=None):
         if self.filter is not None:
             return
-        self.text_editor.delete("insert linestart", "insert lineend + 1c")
+        lines = self.get_selected_lines()
+        self.clear_task_selection()
+        with self.edit_transaction(reload=False) as transaction:
+            for line in lines:
+                transaction.delete_line(line)
 
     def set_state(self, task, newState):
         task = re.sub(rf'\s{self.KANBAN_KEY}:[^\s^:]+', '', task)
@@ -2117,29 +5256,13 @@ class KanbanTxtViewer:
         return result
 
     def set_editor_line_state(self, new_state):
-        current_line = self.text_editor.get("insert linestart", "insert lineend")
-        current_line = self.set_state(current_line, new_state)
-
-        # if edit is made in the last line, temporarily add a newline at the end, to avoid
-        # line shifting when deleting and inserting the current_line
-        cursor_address = self.text_editor.index(tk.INSERT)
-        cursor_line = int(cursor_address.split('.')[0])
-        last_line_address = self.text_editor.index('end')
-        last_line = int(last_line_address.split('.')[0])
-        is_in_last_line = cursor_line == last_line - 1
-        if is_in_last_line:
-            self.text_editor.insert("end", "\n")
-        self.text_editor.delete("insert linestart", "insert lineend + 1c")
-        self.text_editor.insert("insert linestart", current_line + '\n')
-        self.text_editor.mark_set('insert', 'insert linestart -1l')
-        if is_in_last_line:
-            self.text_editor.delete("end-1l linestart", "end-1l lineend + 1c")
-        self.reload_and_save()
+        self.apply_to_selected_lines(lambda task: self.set_state(task, new_state))
 
-    def set_editor_line_priority(self, new_priority_override=None):
-        current_line = self.text_editor.get("insert linestart", "insert lineend")
+    def get_new_priority(self, task, new_priority_override=None):
+        """The priority prefix to give to a task, without override the priority
+            is raised by one, from (E) up to (A) then no priority"""
         if new_priority_override is None:
-            priority_match = re.match(r'^(?P<isDone>x )?(?P<priority>\([A-Z]\))?', current_line)
+            priority_match = re.match(r'^(?P<isDone>x )?(?P<priority>\([A-Z]\))?', task)
             highest_prio = 'A'
             lowest_prio = 'E'
             new_priority = f"({lowest_prio}) "
@@ -2158,23 +5281,11 @@ class KanbanTxtViewer:
                 new_priority = f"({new_priority_override}) "
             else:
                 new_priority = f""
+        return new_priority
 
-        current_line = self.set_priority(current_line, new_priority)
-        # if edit is made in the last line, temporarily add a newline at the end, to avoid
-        # line shifting when deleting and inserting the current_line
-        cursor_address = self.text_editor.index(tk.INSERT)
-        cursor_line = int(cursor_address.split('.')[0])
-        last_line_address = self.text_editor.index('end')
-        last_line = int(last_line_address.split('.')[0])
-        is_in_last_line = cursor_line == last_line - 1
-        if is_in_last_line:
-            self.text_editor.insert("end", "\n")
-        self.text_editor.delete("insert linestart", "insert lineend + 1c")
-        self.text_editor.insert("insert linestart", current_line + '\n')
-        self.text_editor.mark_set('insert', 'insert linestart -1l')
-        if is_in_last_line:
-            self.text_editor.delete("end-1l linestart", "end-1l lineend + 1c")
-        self.reload_and_save()
+    def set_editor_line_priority(self, new_priority_override=None):
+        self.apply_to_selected_lines(
+            lambda task: self.set_priority(task, self.get_new_priority(task, new_priority_override)))
 
     def move_to_todo(self, event=None):
     	# gwyrdh changed from ' ' 
@@ -2209,27 +5320,24 @@ class KanbanTxtViewer:
         #font.setStrikeOut(True)
         #font=('Ubuntu', 6)
         # font=tkFont.nametofont('done-task')
-		# gwyrdh added to remove priority
-        self.change_priority(None, "")
-    	# gwyrdh added add date to X
-        current_line = self.text_editor.get("insert linestart", "insert lineend")
-        match = re.match(r'x|\([A-C]\) ', current_line)
+        def mark_as_done(task):
+            # gwyrdh added to remove priority
+            task = self.set_priority(task, "")
+            # gwyrdh added add date to X
+            task = self.add_date_to_task(task)
+            return self.set_state(task, 'x')
+
+        self.apply_to_selected_lines(mark_as_done)
+
+    def add_date_to_task(self, task):
+        match = re.match(r'x|\([A-C]\) ', task)
         insert_index = 0
         if match:
             insert_index = match.end()
-        
-        self.text_editor.insert("insert linestart +%dc" % (insert_index), str(self.current_date) + " ")
-        
-        self.set_editor_line_state('x')
+        return task[:insert_index] + str(self.current_date) + " " + task[insert_index:]
 
     def add_date(self, event=None):
-        current_line = self.text_editor.get("insert linestart", "insert lineend")
-        match = re.match(r'x|\([A-C]\) ', current_line)
-        insert_index = 0
-        if match:
-            insert_index = match.end()
-        
-        self.text_editor.insert("insert linestart +%dc" % (insert_index), str(self.current_date) + " ")
+        self.apply_to_selected_lines(self.add_date_to_task, reload=False)
     
 
     def on_window_resize(self, event):
@@ -2296,8 +5404,10 @@ class KanbanTxtViewer:
         return not allow_delete
 
     def show_task_deletion_warning(self):
+        # with stable IDs, the other tasks keep their IDs
+        ids_warning = "" if self.stable_ids else "This will make an impact on the tasks IDs.\n"
         return tk.messagebox.askyesno(default=tk.messagebox.NO, title="Deleting task", message="You are about to delete a task.\n"
-                                                                                               "This will make an impact on the tasks IDs.\n\n"
+                                                                                               f"{ids_warning}\n"
                                                                                                "Do you want to proceed with removal?")
 
     def on_backspace_pressed(self, event=None):
@@ -2313,6 +5423,8 @@ class KanbanTxtViewer:
             return "break"
 
     def on_whitespace_pressed(self, event=None):
+        if event is not None and event.keysym == 'Tab' and self.accept_tag_completion():
+            return "break"
         # don't allow to replace the whole line with whitespace in filter view
         if self.text_editor.tag_ranges(tk.SEL):
             text_left_begin = self.text_editor.get("insert linestart", tk.SEL_FIRST)
@@ -2341,13 +5453,19 @@ class KanbanTxtViewer:
             return "break"
 
     def on_return_pressed(self, event=None):
+        if self.is_completion_chosen and self.accept_tag_completion():
+            return "break"
+        self.hide_tag_completion()
         cursor_pos = self.text_editor.index(tk.INSERT)
 
         if self.filter is None:
-            if self.ask_for_add:
+            # adding a line in the middle only matters for the IDs based on the lines
+            if self.ask_for_add and not self.stable_ids:
                 end_pos = self.text_editor.index(tk.END)
                 cursor_line = int(cursor_pos.split('.')[0])
                 end_line = int(end_pos.split('.')[0])
+                if self.document_lines is not None:
+                    end_line += len(self.document_lines) - self.editor_window_start - self.editor_window_length
                 response = False
                 if cursor_line != end_line - 1:
                     response = tk.messagebox.askyesnocancel(title="Add new task", message="You are creating new task in the middle of the txt file.\n"
@@ -2358,6 +5476,8 @@ class KanbanTxtViewer:
                 elif response is False:  # do not move, stay here
                     pass
                 elif response is True:  # move to the end
+                    if self.document_lines is not None:
+                        self.show_document_line(len(self.document_lines))
                     self.text_editor.mark_set(tk.INSERT, tk.END)
             self.main_window.after(100, self.reload_and_save)
             return
@@ -2369,6 +5489,87 @@ class KanbanTxtViewer:
         self.flash_editor_warning_tooltip("Can't add new tasks when the filter view is active!")
         return "break"
 
+    def on_up_down_pressed(self, event):
+        if self.move_tag_completion(-1 if event.keysym == 'Up' else 1):
+            return "break"
+        self.schedule_update_of_editor_line_colors(event)
+
+    def on_editor_escape(self, event=None):
+        if self.completion_word is not None:
+            self.hide_tag_completion()
+            return "break"
+
+    def get_tag_trie(self):
+        if self.tag_trie is None:
+            self.tag_trie = TagTrie()
+            self.tag_trie.build(self.board_stats.get_completion_counts())
+        return self.tag_trie
+
+    def update_tag_completion(self, event=None):
+        """Show the most used projects, contexts or keys starting like the
+            word before the cursor, below it"""
+        if event is not None and event.keysym in self.COMPLETION_KEYS:
+            return
+        word = re.search(r'\S*$', self.text_editor.get('insert linestart', 'insert')).group()
+        completions = []
+        if len(word) >= self.COMPLETION_MIN_LENGTH and ':' not in word:
+            completions = [completion for completion in self.get_tag_trie().complete(word) if completion != word]
+        cursor_box = self.text_editor.bbox('insert')
+        if not completions or cursor_box is None:
+            self.hide_tag_completion()
+            return
+
+        if self.completion_popup is None:
+            self.completion_popup = tk.Toplevel(self.main_window)
+            self.completion_popup.overrideredirect(True)
+            self.completion_listbox = tk.Listbox(self.completion_popup, borderwidth=1, activestyle='none', exportselection=False)
+            self.theme_widget(self.completion_listbox, bg='editor-background', fg='editor-text',
+                              selectbackground='project', selectforeground='editor-background')
+            self.completion_listbox.pack(fill='both', expand=1)
+            self.completion_listbox.bind('<ButtonRelease-1>', lambda event: self.accept_tag_completion())
+        listbox = self.completion_listbox
+        listbox.delete(0, 'end')
+        listbox.insert('end', *completions)
+        listbox.configure(height=len(completions), width=max(len(completion) for completion in completions) + 2)
+        listbox.selection_set(0)
+        x, y, width, height = cursor_box
+        self.completion_popup.geometry(f"+{self.text_editor.winfo_rootx() + x}+{self.text_editor.winfo_rooty() + y + height}")
+        self.completion_popup.deiconify()
+        self.completion_popup.lift()
+        self.completion_word = word
+        self.is_completion_chosen = False
+
+    def hide_tag_completion(self, event=None):
+        if self.completion_word is not None:
+            self.completion_popup.withdraw()
+            self.completion_word = None
+            self.is_completion_chosen = False
+
+    def move_tag_completion(self, step):
+        """Select the previous or next completion, False if none is shown"""
+        if self.completion_word is None:
+            return False
+        listbox = self.completion_listbox
+        selection = listbox.curselection()
+        position = min(max((selection[0] if selection else 0) + step, 0), listbox.size() - 1)
+        listbox.selection_clear(0, 'end')
+        listbox.selection_set(position)
+        listbox.see(position)
+        self.is_completion_chosen = True
+        return True
+
+    def accept_tag_completion(self):
+        """Replace the word before the cursor by the selected completion,
+            False if none is shown"""
+        if self.completion_word is None:
+            return False
+        selection = self.completion_listbox.curselection()
+        completion = self.completion_listbox.get(selection[0] if selection else 0)
+        self.text_editor.delete(f"insert -{len(self.completion_word)}c", 'insert')
+        self.text_editor.insert('insert', completion)
+        self.hide_tag_completion()
+        return True
+
     def schedule_update_of_editor_line_colors(self, event=None):
         self.main_window.after(100, self.update_editor_line_colors)
 
@@ -2376,27 +5577,40 @@ class KanbanTxtViewer:
         nb_line = int(self.text_editor.index('end-1c').split('.')[0])
 
         selected_line = int(self.text_editor.index(tk.INSERT).split('.')[0])
-        task_card_found = False
-        columns = self.kanban_frame.winfo_children()
-        for column in columns:
-            if task_card_found:
-                break
-            task_cards = column.winfo_children()[2].winfo_children()
-            for task_card in task_cards:
-                if task_card.winfo_name().endswith(f"task#{selected_line}"):
-                    self.highlight_selected_task_card(task_card)
-                    task_card_found = True
-                    break
-        if not task_card_found:
+        selected_card = self.get_line_card(selected_line)
+        if selected_card is not None and 'highlight' in selected_card:
+            self.highlight_selected_task_card(selected_card['highlight'])
+        else:
             self.highlight_selected_task_card(None)
 
         for line_idx in range(nb_line + 1):
-            self.text_editor.tag_remove('pair', str(line_idx) + '.0', str(line_idx) + '.0 lineend +1c')
-            self.text_editor.tag_remove('current_pos', str(line_idx) + '.0', str(line_idx) + '.0 lineend +1c')
-            if line_idx == selected_line:
-                self.text_editor.tag_add('current_pos', str(line_idx) + '.0', str(line_idx) + '.0 lineend +1c')
-            elif line_idx % 2 == 0:
-                self.text_editor.tag_add('pair', str(line_idx) + '.0', str(line_idx) + '.0 lineend +1c')
+            self.color_editor_line(line_idx, selected_line)
+
+    def update_editor_lines_colors(self, lines):
+        """Same as update_editor_line_colors, for the given editor lines
+            only, and the lines on which the cursor was and is"""
+        selected_line = int(self.text_editor.index(tk.INSERT).split('.')[0])
+        selected_card = self.get_line_card(selected_line)
+        if selected_card is not None and 'highlight' in selected_card:
+            self.highlight_selected_task_card(selected_card['highlight'])
+        else:
+            self.highlight_selected_task_card(None)
+
+        lines = set(lines)
+        lines.add(selected_line)
+        current_pos_ranges = self.text_editor.tag_ranges('current_pos')
+        for start in current_pos_ranges[::2]:
+            lines.add(int(str(start).split('.')[0]))
+        for line_idx in lines:
+            self.color_editor_line(line_idx, selected_line)
+
+    def color_editor_line(self, line_idx, selected_line):
+        self.text_editor.tag_remove('pair', str(line_idx) + '.0', str(line_idx) + '.0 lineend +1c')
+        self.text_editor.tag_remove('current_pos', str(line_idx) + '.0', str(line_idx) + '.0 lineend +1c')
+        if line_idx == selected_line:
+            self.text_editor.tag_add('current_pos', str(line_idx) + '.0', str(line_idx) + '.0 lineend +1c')
+        elif line_idx % 2 == 0:
+            self.text_editor.tag_add('pair', str(line_idx) + '.0', str(line_idx) + '.0 lineend +1c')
 
     def get_task_card_frame_widget(self, any_subwidget):
         # get first parent which starts with "highlightFrame" in its name
@@ -2417,29 +5631,35 @@ class KanbanTxtViewer:
         selected_highlight_frame = self.get_task_card_frame_widget(selected_widget)
 
         if self.selected_task_card is not None:
+            previous_task_card = self.selected_task_card
+            self.selected_task_card = None
             try:
-                self.selected_task_card.configure(background=self.COLORS[f'column3-column'])
+                self.theme_card_widget(previous_task_card, bg=self.get_card_highlight_role(previous_task_card))
             except:
-                self.selected_task_card = None
+                pass
 
         if selected_highlight_frame is not None:
-            selected_highlight_frame.configure(background=self.COLORS['project'])
+            self.theme_card_widget(selected_highlight_frame, bg='project')
             self.selected_task_card = selected_highlight_frame
 
     def highlight_task(self, event):
         self.clear_drop_areas_frame()
         selected_widget = event.widget
         self.highlight_selected_task_card(selected_widget)
-        searched_task_line = selected_widget.winfo_name()[1:].replace("task#", "")
-        self.text_editor.mark_set('insert', searched_task_line + ".end")
+        selected_task_card_frame = self.get_task_card_frame_widget(selected_widget)
+        searched_task_line = self.show_document_line(self.get_card_frame_line(selected_task_card_frame))
+        self.text_editor.mark_set('insert', f"{searched_task_line}.end")
         self.text_editor.see('insert')
         self.schedule_update_of_editor_line_colors()
 
-    def get_priority_color(self, current_priority):
+    def get_priority_color_role(self, current_priority):
         index = ord(current_priority) - ord('A')
         if index >= len(self.COLORS['priority_color_scale']) or index < 0:
             index = -1
-        return self.COLORS['priority_color_scale'][index]
+        return ('priority_color_scale', index)
+
+    def get_priority_color(self, current_priority):
+        return self.get_theme_color(self.get_priority_color_role(current_priority))
 
     def add_custom_tooltip(self, widget, text):
         x, y, _, _ = widget.bbox("insert")
@@ -2469,19 +5689,67 @@ class KanbanTxtViewer:
             self.editor_warning_tooltip = None
 
 
+def export_board(args):
+    """Export the file given in arguments without opening a window"""
+    config = ConfigStore(KanbanTxtViewer.CONFIG_PATH, KanbanTxtViewer.LEGACY_CONFIG_PATH)
+
+    def get_value_from_config_or_default(key):
+        value = config.get(key)
+        if value is None:
+            value = KanbanTxtViewer.CONFIG_DEFAULTS[key]
+        return value
+
+    darkmode = args.darkmode
+    if darkmode is None:
+        darkmode = get_value_from_config_or_default(KanbanTxtViewer.CONFIG_KEY_DARKMODE)
+    theme_name = KanbanTxtViewer.choose_theme_name(get_value_from_config_or_default(KanbanTxtViewer.CONFIG_KEY_THEME), darkmode)
+    column_names = [get_value_from_config_or_default(key) for key in (
+        KanbanTxtViewer.CONFIG_KEY_COL_0_NAME,
+        KanbanTxtViewer.CONFIG_KEY_COL_1_NAME,
+        KanbanTxtViewer.CONFIG_KEY_COL_2_NAME,
+        KanbanTxtViewer.CONFIG_KEY_COL_3_NAME,
+    )]
+    exporter = BoardExporter(column_names, KanbanTxtViewer.THEMES[theme_name], date.today().toordinal(),
+                             title=f"KanbanTxt - {pathlib.Path(args.file).name}")
+    formats = [(args.export_html, exporter.iter_html), (args.export_jsonl, exporter.iter_jsonl)]
+    formats = [(path, iter_chunks) for path, iter_chunks in formats if path]
+    # the file is read and parsed once for all the formats
+    tasks_copies = itertools.tee(iter_file_tasks(args.file), len(formats))
+    exporter.write([(path, iter_chunks(tasks)) for (path, iter_chunks), tasks in zip(formats, tasks_copies)])
+
+
 def main(args):
     
-    app = KanbanTxtViewer(args.file, args.darkmode)
+    app = KanbanTxtViewer(args.file, args.darkmode, args.profile, args.profile_capture, args.startup_timing)
     if os.name == 'nt':
         app.main_window.state('zoomed')
+    if args.diagnostics:
+        app.open_diagnostics_panel()
+    if args.stress:
+        app.main_window.after_idle(app.run_stress_report, args.stress)
     app.main_window.mainloop()
+    app.config.flush()
+    app.save_parse_cache()
     
 
 if __name__ == '__main__':
     if os.name == 'nt':
+        import ctypes
         ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('KanbanTxt')
     arg_parser = argparse.ArgumentParser(description='Display a todo.txt file as a kanban and allow to edit it')
     arg_parser.add_argument('--file', help='Path to a todo.txt file', required=False, default='', type=str)
     arg_parser.add_argument('--darkmode', help='Is the UI should use dark theme', required=False, default=None, action='store_true')
+    arg_parser.add_argument('--profile', help='Time each refresh of the kanban and log it', required=False, default=False, action='store_true')
+    arg_parser.add_argument('--profile-capture', help='Like --profile, and record the first refresh with cProfile', required=False, default=False, action='store_true')
+    arg_parser.add_argument('--diagnostics', help='Open the diagnostics panel reporting the widgets and memory in use', required=False, default=False, action='store_true')
+    arg_parser.add_argument('--stress', help='Reload the kanban and switch the themes N times, print the widgets and memory growth and quit', required=False, default=0, type=int, metavar='N')
+    arg_parser.add_argument('--startup-timing', help='Print the time taken by each step of the startup, up to the kanban display', required=False, default=False, action='store_true')
+    arg_parser.add_argument('--export-html', help='Write the kanban of --file as a HTML page at PATH (- for the standard output), without opening the window', required=False, default=None, type=str, metavar='PATH')
+    arg_parser.add_argument('--export-jsonl', help='Write the tasks of --file as JSON lines at PATH (- for the standard output), without opening the window', required=False, default=None, type=str, metavar='PATH')
     args = arg_parser.parse_args()
-    main(args)
+    if args.export_html or args.export_jsonl:
+        if not os.path.isfile(args.file):
+            arg_parser.error('--export-html and --export-jsonl need an existing --file')
+        export_board(args)
+    else:
+        main(args)